@@ -0,0 +1,111 @@
+"""
+Measures the per-request overhead of `AuthMiddleware`, calling the ASGI apps directly (no server, no HTTP parsing).
+
+    python -m benchmarks.bench_asgi [--key-size 4096] [--count 2000]
+
+The overhead is the p50 latency minus the one of the bare app.
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import (
+    AUDIENCE,
+    ISSUER,
+    StaticJwksProvider,
+    create_token_creator,
+    create_tokens,
+    percentile,
+    print_table,
+)
+from pyauth0 import TokenVerifier
+from pyauth0.asgi import AuthMiddleware
+
+
+async def _bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def _scope(path: str, token: str = None) -> dict:
+    headers = [(b"host", b"localhost"), (b"accept", b"*/*")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode("latin-1")))
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": headers,
+        "state": {},
+    }
+
+
+async def _measure(app, scopes: list) -> list:
+    latencies = []
+    for scope in scopes:
+        started = time.perf_counter()
+        await app(dict(scope), _receive, _send)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def main(key_size: int, count: int):
+    token_creator = create_token_creator(key_size)
+    jwks_provider = StaticJwksProvider({"keys": [token_creator.jwk()]})
+    tokens = create_tokens(token_creator, count)
+    token_verifier = TokenVerifier(ISSUER, AUDIENCE, jwks_provider=jwks_provider)
+    cached_token_verifier = TokenVerifier(
+        ISSUER, AUDIENCE, jwks_provider=jwks_provider, token_cache_size=count
+    )
+    app = AuthMiddleware(_bare_app, token_verifier, public_paths=["/health"])
+    cached_app = AuthMiddleware(_bare_app, cached_token_verifier)
+    # warm up the key index and the token cache
+    await _measure(app, [_scope("/", tokens[0])])
+    await _measure(cached_app, [_scope("/", token) for token in tokens])
+
+    scenarios = {
+        "bare app": (_bare_app, [_scope("/", token) for token in tokens]),
+        "public path": (app, [_scope("/health", token) for token in tokens]),
+        "missing token": (app, [_scope("/")] * count),
+        "verified token": (app, [_scope("/", token) for token in tokens]),
+        "cached token": (cached_app, [_scope("/", token) for token in tokens]),
+    }
+    rows = []
+    baseline = None
+    for name, (scenario_app, scopes) in scenarios.items():
+        started = time.perf_counter()
+        latencies = await _measure(scenario_app, scopes)
+        elapsed = time.perf_counter() - started
+        p50 = percentile(latencies, 50)
+        if baseline is None:
+            baseline = p50
+        rows.append(
+            (
+                name,
+                len(scopes),
+                f"{len(scopes) / elapsed:.0f}",
+                f"{p50 * 1_000_000:.1f}",
+                f"{percentile(latencies, 99) * 1_000_000:.1f}",
+                f"{(p50 - baseline) * 1_000_000:.1f}",
+            )
+        )
+    print_table(
+        ["scenario", "requests", "requests/s", "p50 us", "p99 us", "overhead us"], rows
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--key-size", type=int, default=2048)
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.key_size, args.count))
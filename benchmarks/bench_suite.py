@@ -0,0 +1,278 @@
+"""
+Performance baselines of token minting, verification and provider caching, run offline against a local mock server.
+
+    python -m benchmarks.bench_suite [--key-size 2048] [--count 2000] [--output bench_results.json]
+    python -m benchmarks.bench_suite --compare bench_results.json --output bench_results_new.json
+
+Each scenario reports tokens/sec and the p50/p99 latency of one operation (a token, a batch or a request),
+the results are saved as JSON, so that two runs on the same machine can be compared.
+Cold scenarios create a new verifier or provider per operation, sharing the http client, so that
+they measure the JWKS and token fetches rather than the TCP connections.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import time
+import typing
+
+import pytest_httpserver
+
+from benchmarks.common import AUDIENCE, create_token_creator, percentile, print_table
+from pyauth0 import TokenProvider, TokenVerifier
+from pyauth0.backends import default_backend
+from pyauth0.http_client import create_async_client
+from pyauth0.token_creator import TokenCreator
+from test.testutils.mock_server import MockServer
+
+BATCH_SIZE = 100
+CONCURRENCY = 50
+
+
+def _result(name: str, tokens: int, elapsed: float, latencies: list) -> dict:
+    return {
+        "name": name,
+        "tokens": tokens,
+        "tokens_per_sec": round(tokens / elapsed, 1),
+        "p50_us": round(percentile(latencies, 50) * 1_000_000, 1),
+        "p99_us": round(percentile(latencies, 99) * 1_000_000, 1),
+    }
+
+
+async def _measure(name: str, operations: list, tokens_per_operation: int = 1) -> dict:
+    """
+    Runs the operations (coroutine functions) one after the other
+    """
+    latencies = []
+    started = time.perf_counter()
+    for operation in operations:
+        operation_started = time.perf_counter()
+        await operation()
+        latencies.append(time.perf_counter() - operation_started)
+    elapsed = time.perf_counter() - started
+    return _result(name, len(operations) * tokens_per_operation, elapsed, latencies)
+
+
+def _bench_mint(token_creator: TokenCreator, issuer: str, count: int) -> list:
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        token_started = time.perf_counter()
+        token_creator.create_token(
+            issuer, subject=f"user-{i}", audience=AUDIENCE, expires_in=3600
+        )
+        latencies.append(time.perf_counter() - token_started)
+    mint = _result("mint", count, time.perf_counter() - started, latencies)
+
+    latencies = []
+    started = time.perf_counter()
+    for offset in range(0, count, BATCH_SIZE):
+        batch_started = time.perf_counter()
+        token_creator.create_tokens(
+            issuer,
+            subjects=[f"user-{i}" for i in range(offset, offset + BATCH_SIZE)],
+            audience=AUDIENCE,
+            expires_in=3600,
+        )
+        latencies.append(time.perf_counter() - batch_started)
+    mint_batch = _result(
+        "mint_batch",
+        len(latencies) * BATCH_SIZE,
+        time.perf_counter() - started,
+        latencies,
+    )
+    return [mint, mint_batch]
+
+
+async def _bench_verify(
+    issuer: str, tokens: list, http_client, cold_count: int
+) -> list:
+    def create_verifier(**kwargs) -> TokenVerifier:
+        return TokenVerifier(
+            issuer, AUDIENCE, jwks_cache_ttl=600, http_client=http_client, **kwargs
+        )
+
+    async def verify_cold(token: str):
+        async with create_verifier() as token_verifier:
+            await token_verifier.verify(token)
+
+    results = [
+        await _measure(
+            "verify_cold",
+            [lambda token=token: verify_cold(token) for token in tokens[:cold_count]],
+        )
+    ]
+
+    async with create_verifier(token_cache_size=len(tokens)) as token_verifier:
+        await token_verifier.verify(tokens[0])
+        token_verifier.token_cache.clear()
+        results.append(
+            await _measure(
+                "verify_warm",
+                [lambda token=token: token_verifier.verify(token) for token in tokens],
+            )
+        )
+        # second pass, all the tokens are in the verified token cache
+        results.append(
+            await _measure(
+                "verify_cached",
+                [lambda token=token: token_verifier.verify(token) for token in tokens],
+            )
+        )
+
+    async with create_verifier() as token_verifier:
+        await token_verifier.verify(tokens[0])
+        results.append(
+            await _measure(
+                "verify_many",
+                [
+                    lambda offset=offset: token_verifier.verify_many(
+                        tokens[offset : offset + BATCH_SIZE]
+                    )
+                    for offset in range(0, len(tokens), BATCH_SIZE)
+                ],
+                BATCH_SIZE,
+            )
+        )
+        results.append(await _bench_concurrent(token_verifier, tokens))
+    return results
+
+
+async def _bench_concurrent(token_verifier: TokenVerifier, tokens: list) -> dict:
+    latencies = []
+
+    async def verify(token: str):
+        started = time.perf_counter()
+        await token_verifier.verify(token)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for offset in range(0, len(tokens), CONCURRENCY):
+        await asyncio.gather(
+            *(verify(t) for t in tokens[offset : offset + CONCURRENCY])
+        )
+    return _result(
+        "verify_concurrent", len(tokens), time.perf_counter() - started, latencies
+    )
+
+
+async def _bench_provider(
+    mock_server: MockServer, http_client, count: int, cold_count: int
+) -> list:
+    def create_provider() -> TokenProvider:
+        return TokenProvider(
+            mock_server.server_url,
+            AUDIENCE,
+            "CLIENT_ID",
+            "CLIENT_SECRET",
+            http_client=http_client,
+        )
+
+    async def get_token_cold():
+        async with create_provider() as token_provider:
+            await token_provider.get_token()
+
+    results = [await _measure("provider_cold", [get_token_cold] * cold_count)]
+    async with create_provider() as token_provider:
+        await token_provider.get_token()
+        results.append(
+            await _measure("provider_warm", [token_provider.get_token] * count)
+        )
+    return results
+
+
+async def run(key_size: int, count: int) -> dict:
+    token_creator = create_token_creator(key_size)
+    # one log line per request would flood the report
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    httpserver = pytest_httpserver.HTTPServer()
+    httpserver.start()
+    mock_server = MockServer(httpserver)
+    mock_server.respond_with_json(r"/.well-known/jwks.json", token_creator.jwks())
+    mock_server.respond_with_json(
+        r"/oauth/token",
+        {"access_token": "token", "expires_in": 86400, "token_type": "Bearer"},
+    )
+    issuer = mock_server.server_url
+    # cold scenarios fetch from the mock server, fewer operations are enough
+    cold_count = max(count // 20, 10)
+    try:
+        results = _bench_mint(token_creator, issuer, count)
+        tokens = token_creator.create_tokens(
+            issuer,
+            subjects=[f"user-{i}" for i in range(count)],
+            audience=AUDIENCE,
+            expires_in=3600,
+        )
+        async with create_async_client() as http_client:
+            results += await _bench_verify(issuer, tokens, http_client, cold_count)
+            results += await _bench_provider(
+                mock_server, http_client, count, cold_count
+            )
+    finally:
+        httpserver.clear()
+        if httpserver.is_running():
+            httpserver.stop()
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "backend": default_backend().name,
+            "key_size": key_size,
+            "count": count,
+        },
+        "results": results,
+    }
+
+
+def _print_report(report: dict, baseline: typing.Optional[dict]) -> None:
+    previous = {r["name"]: r for r in (baseline or {}).get("results", [])}
+    rows = []
+    for result in report["results"]:
+        row = (
+            result["name"],
+            result["tokens"],
+            f"{result['tokens_per_sec']:.0f}",
+            f"{result['p50_us']:.1f}",
+            f"{result['p99_us']:.1f}",
+        )
+        if baseline is not None:
+            before = previous.get(result["name"])
+            change = "-"
+            if before and before["tokens_per_sec"]:
+                ratio = result["tokens_per_sec"] / before["tokens_per_sec"]
+                change = f"{(ratio - 1) * 100:+.1f}%"
+            row += (change,)
+        rows.append(row)
+    headers = ["scenario", "tokens", "tokens/s", "p50 us", "p99 us"]
+    if baseline is not None:
+        headers.append("tokens/s vs baseline")
+    print_table(headers, rows)
+
+
+def main(key_size: int, count: int, output: str, compare: typing.Optional[str]):
+    baseline = None
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+        environment = baseline["environment"]
+        if (environment["key_size"], environment["count"]) != (key_size, count):
+            print("warning: the baseline was run with a different key size or count")
+    report = asyncio.run(run(key_size, count))
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    _print_report(report, baseline)
+    print(f"results saved to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--key-size", type=int, default=2048)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="results file of a previous run")
+    args = parser.parse_args()
+    main(args.key_size, args.count, args.output, args.compare)
@@ -0,0 +1,49 @@
+"""
+Compares the verifier backends on tokens/sec, parsing and verifying the same tokens with a pre-loaded key.
+
+    python -m benchmarks.bench_verify_backends [--key-size 4096] [--count 2000]
+"""
+
+import argparse
+import time
+
+from benchmarks.common import (
+    AUDIENCE,
+    ISSUER,
+    create_token_creator,
+    create_tokens,
+    print_table,
+)
+from pyauth0.backends import CryptographyBackend, JoseBackend
+from pyauth0.parsed_token import parse_token
+from pyauth0.utils import sanitize_issuer
+
+
+def main(key_size: int, count: int):
+    token_creator = create_token_creator(key_size)
+    tokens = create_tokens(token_creator, count)
+    issuer = sanitize_issuer(ISSUER) + "/"
+    rows = []
+    for backend in (JoseBackend(), CryptographyBackend()):
+        key = backend.load_key(token_creator.jwk(), "RS256")
+        started = time.perf_counter()
+        for token in tokens:
+            backend.decode(parse_token(token), key, ["RS256"], AUDIENCE, issuer)
+        elapsed = time.perf_counter() - started
+        rows.append(
+            (
+                backend.name,
+                count,
+                f"{count / elapsed:.0f}",
+                f"{elapsed / count * 1_000_000:.1f}",
+            )
+        )
+    print_table(["backend", "tokens", "tokens/s", "us/token"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--key-size", type=int, default=2048)
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.key_size, args.count)
@@ -0,0 +1,95 @@
+"""
+Measures how a burst of concurrent `TokenVerifier.verify` calls delays unrelated coroutines,
+verifying inline (on the event loop) vs in a thread or process pool.
+
+    python -m benchmarks.bench_verify_executor [--key-size 4096]
+
+The crossover is the burst size from which offloading gives a lower event loop lag than inline,
+at the cost of some throughput (executor hand-off, pickling for processes).
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import time
+
+from benchmarks.common import (
+    AUDIENCE,
+    ISSUER,
+    StaticJwksProvider,
+    create_token_creator,
+    create_tokens,
+    percentile,
+    print_table,
+)
+from pyauth0 import TokenVerifier
+
+BURST_SIZES = [1, 4, 16, 64, 256]
+PROBE_INTERVAL = 0.001
+
+
+async def _probe(lags: list, stop: asyncio.Event):
+    # an unrelated coroutine: measures how late it is woken up
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def _run_burst(token_verifier: TokenVerifier, tokens: list) -> tuple:
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.ensure_future(_probe(lags, stop))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+    started = time.perf_counter()
+    await asyncio.gather(*(token_verifier.verify(token) for token in tokens))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return elapsed, lags
+
+
+async def main(key_size: int):
+    token_creator = create_token_creator(key_size)
+    jwks_provider = StaticJwksProvider({"keys": [token_creator.jwk()]})
+    tokens = create_tokens(token_creator, max(BURST_SIZES))
+    executors = {
+        "inline": None,
+        "thread": concurrent.futures.ThreadPoolExecutor(max_workers=4),
+        "process": concurrent.futures.ProcessPoolExecutor(max_workers=4),
+    }
+    rows = []
+    try:
+        for mode, executor in executors.items():
+            token_verifier = TokenVerifier(
+                ISSUER, AUDIENCE, jwks_provider=jwks_provider, executor=executor
+            )
+            # warm up key index and worker processes
+            await asyncio.gather(*(token_verifier.verify(t) for t in tokens[:8]))
+            for burst_size in BURST_SIZES:
+                elapsed, lags = await _run_burst(token_verifier, tokens[:burst_size])
+                rows.append(
+                    (
+                        mode,
+                        burst_size,
+                        f"{burst_size / elapsed:.0f}",
+                        f"{percentile(lags, 50) * 1000:.2f}",
+                        f"{percentile(lags, 99) * 1000:.2f}",
+                        f"{max(lags, default=0) * 1000:.2f}",
+                    )
+                )
+    finally:
+        for executor in executors.values():
+            if executor:
+                executor.shutdown()
+    print_table(
+        ["mode", "burst", "tokens/s", "lag p50 ms", "lag p99 ms", "lag max ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--key-size", type=int, default=2048)
+    args = parser.parse_args()
+    asyncio.run(main(args.key_size))
@@ -0,0 +1,38 @@
+import statistics
+import typing
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from pyauth0.token_creator import Signer, TokenCreator
+from test.testutils.tokens import AUDIENCE, ISSUER, StaticJwksProvider, create_token
+
+
+def create_token_creator(key_size: int = 2048) -> TokenCreator:
+    # Auth0 signs with 2048 bit keys, faster to generate than the Signer default
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    return TokenCreator(Signer(private_key))
+
+
+def create_tokens(token_creator: TokenCreator, count: int) -> typing.List[str]:
+    return [
+        create_token(token_creator, subject=f"user-{i}", expires_in=3600)
+        for i in range(count)
+    ]
+
+
+def percentile(values: typing.Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def print_table(headers: typing.Sequence[str], rows: typing.Iterable[tuple]) -> None:
+    rows = [tuple(str(value) for value in row) for row in rows]
+    widths = [
+        max(len(str(h)), *(len(r[i]) for r in rows)) for i, h in enumerate(headers)
+    ]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(value.ljust(w) for value, w in zip(row, widths)))
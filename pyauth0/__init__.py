@@ -1,3 +1,7 @@
+from .auth import SyncTokenAuth, TokenAuth
 from .errors import Auth0Error
+from .multi_tenant import MultiTenantTokenVerifier
+from .sync import SyncTokenProvider, SyncTokenVerifier
 from .token_provider import TokenProvider, GetTokenResponse
+from .token_provider_registry import TokenProviderRegistry
 from .token_verifier import TokenVerifier, DecodedToken
@@ -0,0 +1,108 @@
+import json
+from typing import Iterable, List, Optional, Tuple, Union
+
+from pyauth0.errors import Auth0Error
+from pyauth0.multi_tenant import MultiTenantTokenVerifier
+from pyauth0.token_verifier import TokenVerifier
+
+
+def get_bearer_token(authorization: Optional[str]) -> str:
+    """
+    :param authorization: value of the Authorization header, example `Bearer eyJhbGciOi...`
+    :returns The token
+    :raises Auth0Error: if the header is missing or not a Bearer token
+    """
+    if not authorization:
+        raise Auth0Error(
+            status_code=401,
+            code="authorization_header_missing",
+            description="Authorization header is expected.",
+        )
+    scheme, _, token = authorization.partition(" ")
+    token = token.strip()
+    if scheme.lower() != "bearer" or not token or " " in token:
+        raise Auth0Error(
+            status_code=401,
+            code="invalid_header",
+            description="Authorization header must be a Bearer token.",
+        )
+    return token
+
+
+class AuthMiddleware:
+    """
+    ASGI middleware verifying the Bearer token of each request, example with Starlette or FastAPI
+    `app.add_middleware(AuthMiddleware, token_verifier=token_verifier, public_paths=["/health"])`.
+    The DecodedToken is stored in the request state, as `request.state.token`.
+    Rejected requests get the status code of the Auth0Error and a JSON body with its code and description.
+    """
+
+    def __init__(
+        self,
+        app,
+        token_verifier: Union[TokenVerifier, MultiTenantTokenVerifier],
+        public_paths: Iterable[str] = (),
+        public_path_prefixes: Iterable[str] = (),
+        state_key: str = "token",
+    ) -> None:
+        """
+        :param app: the ASGI app
+        :param token_verifier: shared by all the requests, together with its JWKS and token caches.
+                It is not closed by the middleware.
+        :param public_paths: paths served without token, example `/health`
+        :param public_path_prefixes: path prefixes served without token, example `/docs/`
+        :param state_key: name of the DecodedToken in the request state
+        """
+        self.app = app
+        self.token_verifier = token_verifier
+        self._public_paths = frozenset(public_paths)
+        self._public_path_prefixes = tuple(public_path_prefixes)
+        self._state_key = state_key
+
+    def _is_public(self, path: str) -> bool:
+        return path in self._public_paths or (
+            bool(self._public_path_prefixes)
+            and path.startswith(self._public_path_prefixes)
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] not in ("http", "websocket") or self._is_public(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        try:
+            token = get_bearer_token(_get_header(scope["headers"], b"authorization"))
+            decoded_token = await self.token_verifier.verify(token)
+        except Auth0Error as error:
+            if scope["type"] == "websocket":
+                # policy violation, the handshake is rejected before the app sees it
+                await send({"type": "websocket.close", "code": 1008})
+            else:
+                await _send_error(send, error)
+            return
+        # a new dict, the state set by the lifespan is shared by all the requests
+        scope["state"] = {**scope.get("state", {}), self._state_key: decoded_token}
+        await self.app(scope, receive, send)
+
+
+def _get_header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    # ASGI header names are lowercase
+    for key, value in headers:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _send_error(send, error: Auth0Error) -> None:
+    body = json.dumps({"code": error.code, "description": error.description}).encode(
+        "utf-8"
+    )
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ]
+    if error.status_code == 401:
+        headers.append((b"www-authenticate", b"Bearer"))
+    await send(
+        {"type": "http.response.start", "status": error.status_code, "headers": headers}
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,83 @@
+import typing
+
+import httpx
+
+from pyauth0.sync import SyncTokenProvider
+from pyauth0.token_provider import TokenProvider
+
+
+class TokenAuth(httpx.Auth):
+    """
+    Authenticates the requests of an `httpx.AsyncClient` with the M2M token of a TokenProvider,
+    example `httpx.AsyncClient(auth=TokenAuth(token_provider))`.
+    If the API answers 401, the token is discarded and the request is sent once more with a new token.
+    """
+
+    # the request is sent twice on a 401, streamed bodies are read first
+    requires_request_body = True
+
+    def __init__(self, token_provider: TokenProvider, refresh_margin: int = 30):
+        """
+        :param token_provider: shared by all the requests, it is not closed by the client
+        :param refresh_margin: seconds before expiration from which the token is renewed in background,
+                while the requests still use the current one. 0 to disable.
+        """
+        self._token_provider = token_provider
+        self._refresh_margin = refresh_margin
+
+    def sync_auth_flow(
+        self, request: httpx.Request
+    ) -> typing.Generator[httpx.Request, httpx.Response, None]:
+        raise RuntimeError("TokenAuth requires an httpx.AsyncClient, see SyncTokenAuth")
+
+    async def async_auth_flow(
+        self, request: httpx.Request
+    ) -> typing.AsyncGenerator[httpx.Request, httpx.Response]:
+        # a cache read, unless the token is missing or expired
+        token_response = await self._token_provider.get_token()
+        if self._refresh_margin:
+            self._token_provider.refresh_if_due(self._refresh_margin)
+        request.headers["Authorization"] = token_response.authorization
+        response = yield request
+        if response.status_code == 401:
+            # concurrent requests rejected with the same token share a single fetch
+            self._token_provider.invalidate(token_response)
+            token_response = await self._token_provider.get_token()
+            request.headers["Authorization"] = token_response.authorization
+            yield request
+
+
+class SyncTokenAuth(httpx.Auth):
+    """
+    Sync counterpart of `TokenAuth`, for an `httpx.Client` and a SyncTokenProvider
+    """
+
+    requires_request_body = True
+
+    def __init__(self, token_provider: SyncTokenProvider, refresh_margin: int = 30):
+        """
+        :param token_provider: shared by all the requests, it is not closed by the client
+        :param refresh_margin: seconds before expiration from which the token is renewed in a background thread,
+                while the requests still use the current one. 0 to disable.
+        """
+        self._token_provider = token_provider
+        self._refresh_margin = refresh_margin
+
+    def sync_auth_flow(
+        self, request: httpx.Request
+    ) -> typing.Generator[httpx.Request, httpx.Response, None]:
+        token_response = self._token_provider.get_token()
+        if self._refresh_margin:
+            self._token_provider.refresh_if_due(self._refresh_margin)
+        request.headers["Authorization"] = token_response.authorization
+        response = yield request
+        if response.status_code == 401:
+            self._token_provider.invalidate(token_response)
+            token_response = self._token_provider.get_token()
+            request.headers["Authorization"] = token_response.authorization
+            yield request
+
+    def async_auth_flow(
+        self, request: httpx.Request
+    ) -> typing.AsyncGenerator[httpx.Request, httpx.Response]:
+        raise RuntimeError("SyncTokenAuth requires an httpx.Client, see TokenAuth")
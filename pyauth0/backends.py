@@ -0,0 +1,304 @@
+import abc
+import time
+from typing import List, Optional
+
+from jose import jwk, jwt
+
+from pyauth0.errors import Auth0Error
+from pyauth0.parsed_token import ParsedToken, base64url_decode
+
+
+class VerifierBackend(abc.ABC):
+    """
+    Loads the JWKS public keys and verifies the token signature and claims.
+    Backends are stateless, instances of the same class are interchangeable.
+    """
+
+    name: str
+    # True if the backend implements `verify_signature` and `validate_claims` as the two halves of `decode`,
+    # so that they are measured separately (see `pyauth0.metrics`)
+    splits_verification: bool = False
+
+    @abc.abstractmethod
+    def load_key(self, key: dict, algorithm: str):
+        """
+        :param key: a JWK, as found in the JWKS document
+        :param algorithm: the algorithm the key is loaded for
+        :returns The key, ready to be passed to `decode`
+        """
+        pass
+
+    @abc.abstractmethod
+    def decode(
+        self,
+        token: ParsedToken,
+        key,
+        algorithms: List[str],
+        audience: str,
+        issuer: str,
+    ) -> dict:
+        """
+        Verifies the signature and the claims of the token
+
+        :returns The claims set
+        :raises Auth0Error: if the token is not valid
+        """
+        pass
+
+    def validate_claims(self, claims: dict, audience: str, issuer: str) -> None:
+        """
+        Validates the claims of a token whose signature is verified, see `splits_verification`
+
+        :raises Auth0Error: if the claims are not valid
+        """
+        _validate_claims(claims, audience, issuer)
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other)
+
+    def __hash__(self) -> int:
+        return hash(type(self))
+
+
+class JoseBackend(VerifierBackend):
+    """
+    Verifies tokens with python-jose
+    """
+
+    name = "jose"
+
+    def load_key(self, key: dict, algorithm: str):
+        return jwk.construct(key, algorithm)
+
+    def decode(
+        self,
+        token: ParsedToken,
+        key,
+        algorithms: List[str],
+        audience: str,
+        issuer: str,
+    ) -> dict:
+        try:
+            # python-jose parses the token again
+            return jwt.decode(
+                token.token,
+                key,
+                algorithms=algorithms,
+                audience=audience,
+                issuer=issuer,
+            )
+        except jwt.ExpiredSignatureError as error:
+            raise _token_expired_error() from error
+        except jwt.JWTClaimsError as error:
+            raise _invalid_claims_error() from error
+        except Exception as error:
+            raise Auth0Error(
+                status_code=401, code="invalid_token", description=str(error)
+            ) from error
+
+
+class CryptographyBackend(VerifierBackend):
+    """
+    Verifies RS256, ES256 and EdDSA (Ed25519) tokens with `cryptography`, using pre-loaded public keys.
+    Requires `pip install pyauth0[crypto]`.
+    """
+
+    name = "cryptography"
+    splits_verification = True
+
+    def __init__(self) -> None:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec, padding
+
+        self._padding = padding.PKCS1v15()
+        self._hash = hashes.SHA256()
+        self._ecdsa = ec.ECDSA(hashes.SHA256())
+
+    def load_key(self, key: dict, algorithm: str):
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+        if key_algorithm(key) != algorithm:
+            raise ValueError(f"unsupported key for {algorithm}")
+        if algorithm == "RS256":
+            return _VerificationKey(
+                algorithm,
+                rsa.RSAPublicNumbers(
+                    e=_base64_to_int(key["e"]),
+                    n=_base64_to_int(key["n"]),
+                ).public_key(),
+            )
+        if algorithm == "ES256":
+            return _VerificationKey(
+                algorithm,
+                ec.EllipticCurvePublicNumbers(
+                    x=_base64_to_int(key["x"]),
+                    y=_base64_to_int(key["y"]),
+                    curve=ec.SECP256R1(),
+                ).public_key(),
+            )
+        return _VerificationKey(
+            algorithm,
+            ed25519.Ed25519PublicKey.from_public_bytes(
+                base64url_decode(key["x"].encode("utf-8"))
+            ),
+        )
+
+    def decode(
+        self,
+        token: ParsedToken,
+        key,
+        algorithms: List[str],
+        audience: str,
+        issuer: str,
+    ) -> dict:
+        self.verify_signature(token, key, algorithms)
+        _validate_claims(token.claims, audience, issuer)
+        return token.claims
+
+    def verify_signature(self, token: ParsedToken, key, algorithms: List[str]) -> None:
+        """
+        Verifies the signature only, the first half of `decode`
+
+        :raises Auth0Error: if the signature is not valid
+        """
+        from cryptography.exceptions import InvalidSignature
+
+        if token.header.get("alg") not in algorithms:
+            raise Auth0Error(
+                status_code=401,
+                code="invalid_token",
+                description="The specified alg value is not allowed",
+            )
+        try:
+            # the key is only used with the algorithm it was published for
+            if token.header["alg"] != key.algorithm:
+                raise InvalidSignature()
+            self._verify(key, token.signature, token.signing_input)
+        except InvalidSignature as error:
+            raise Auth0Error(
+                status_code=401,
+                code="invalid_token",
+                description="Signature verification failed.",
+            ) from error
+
+    def _verify(self, key: "_VerificationKey", signature: bytes, data: bytes) -> None:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives.asymmetric.utils import (
+            encode_dss_signature,
+        )
+
+        if key.algorithm == "RS256":
+            key.public_key.verify(signature, data, self._padding, self._hash)
+        elif key.algorithm == "ES256":
+            # JWS signatures are the raw r || s, cryptography expects DER
+            if len(signature) != 64:
+                raise InvalidSignature()
+            signature = encode_dss_signature(
+                int.from_bytes(signature[:32], "big"),
+                int.from_bytes(signature[32:], "big"),
+            )
+            key.public_key.verify(signature, data, self._ecdsa)
+        else:
+            key.public_key.verify(signature, data)
+
+    def __getstate__(self) -> dict:
+        # padding and hash are re-created on unpickling, e.g. in a process pool worker
+        return {}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__()
+
+
+def default_backend() -> VerifierBackend:
+    """
+    The `cryptography` backend if installed, otherwise python-jose
+    """
+    try:
+        return CryptographyBackend()
+    except ImportError:
+        return JoseBackend()
+
+
+class _VerificationKey:
+    """
+    A public key loaded by `CryptographyBackend`, bound to its algorithm
+    """
+
+    __slots__ = ("algorithm", "public_key")
+
+    def __init__(self, algorithm: str, public_key) -> None:
+        self.algorithm = algorithm
+        self.public_key = public_key
+
+
+def key_algorithm(key: dict) -> Optional[str]:
+    """
+    The algorithm of a JWK: its "alg" if set, otherwise inferred from "kty" and "crv"
+
+    :param key: a JWK, as found in the JWKS document
+    """
+    if key.get("alg"):
+        return key["alg"]
+    kty = key.get("kty")
+    if kty == "RSA":
+        return "RS256"
+    if kty == "EC" and key.get("crv") == "P-256":
+        return "ES256"
+    if kty == "OKP" and key.get("crv") == "Ed25519":
+        return "EdDSA"
+    return None
+
+
+def _base64_to_int(data: str) -> int:
+    return int.from_bytes(base64url_decode(data.encode("utf-8")), "big")
+
+
+def _token_expired_error() -> Auth0Error:
+    return Auth0Error(
+        status_code=401,
+        code="token_expired",
+        description="Token is expired.",
+    )
+
+
+def _invalid_claims_error() -> Auth0Error:
+    return Auth0Error(
+        status_code=401,
+        code="invalid_claims",
+        description="Incorrect claims, check audience and issuer.",
+    )
+
+
+def _validate_claims(claims: dict, audience: str, issuer: str) -> None:
+    """
+    Same validation python-jose applies by default (no leeway)
+    """
+    now = int(time.time())
+    try:
+        if "iat" in claims:
+            int(claims["iat"])
+        if "nbf" in claims and int(claims["nbf"]) > now:
+            raise _invalid_claims_error()
+        if "exp" in claims and int(claims["exp"]) < now:
+            raise _token_expired_error()
+    except (TypeError, ValueError) as error:
+        raise _invalid_claims_error() from error
+    if "aud" in claims:
+        audience_claims = claims["aud"]
+        if isinstance(audience_claims, str):
+            audience_claims = [audience_claims]
+        if not isinstance(audience_claims, list):
+            raise _invalid_claims_error()
+        if any(not isinstance(c, str) for c in audience_claims):
+            raise _invalid_claims_error()
+        if audience not in audience_claims:
+            raise _invalid_claims_error()
+    if claims.get("iss") != issuer:
+        raise _invalid_claims_error()
+    if "sub" in claims and not isinstance(claims["sub"], str):
+        raise _invalid_claims_error()
+    if "jti" in claims and not isinstance(claims["jti"], str):
+        raise _invalid_claims_error()
+    if "at_hash" in claims:
+        # no access token to compare against, python-jose rejects it as well
+        raise _invalid_claims_error()
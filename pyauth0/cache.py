@@ -0,0 +1,234 @@
+import abc
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import typing
+import uuid
+
+
+class CacheEntry(typing.NamedTuple):
+    value: typing.Any
+    # unix timestamp, comparable across processes and nodes
+    expires_at: float
+
+
+class CacheBackend(abc.ABC):
+    """
+    Storage for the M2M tokens and the JWKS, shared by several providers, processes or nodes.
+    Leases make sure that only one of them refreshes an entry at a time, while the others wait for its result.
+    """
+
+    # True if the methods can block (network or disk), the async providers then call them in the default
+    # executor instead of in the event loop
+    blocking: bool = True
+
+    @abc.abstractmethod
+    def get(self, key: str) -> typing.Optional[CacheEntry]:
+        """
+        :returns The entry, or None if missing or expired
+        """
+        pass
+
+    @abc.abstractmethod
+    def set(self, key: str, value: typing.Any, expires_at: float) -> None:
+        """
+        :param value: a JSON serializable value
+        :param expires_at: unix timestamp
+        """
+        pass
+
+    @abc.abstractmethod
+    def acquire_lease(self, key: str, ttl: float) -> typing.Optional[str]:
+        """
+        Tries to become the only one refreshing `key`, for at most `ttl` seconds
+
+        :returns The lease to release, or None if the lease is held by someone else
+        """
+        pass
+
+    @abc.abstractmethod
+    def release_lease(self, key: str, lease: str) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """
+    Entries shared by the providers of the same process
+    """
+
+    blocking = False
+
+    def __init__(self) -> None:
+        self._entries: typing.Dict[str, CacheEntry] = {}
+        self._leases: typing.Dict[str, typing.Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> typing.Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        return entry
+
+    def set(self, key: str, value: typing.Any, expires_at: float) -> None:
+        self._entries[key] = CacheEntry(value, expires_at)
+
+    def acquire_lease(self, key: str, ttl: float) -> typing.Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None and lease[1] > now:
+                return None
+            lease_id = uuid.uuid4().hex
+            self._leases[key] = (lease_id, now + ttl)
+            return lease_id
+
+    def release_lease(self, key: str, lease: str) -> None:
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == lease:
+                del self._leases[key]
+
+
+class RedisCache(CacheBackend):
+    """
+    Entries shared by all the nodes through Redis.
+    The client can be a `redis.Redis` or any object with the same `get`, `set(name, value, px=, nx=)` and `delete`.
+    """
+
+    def __init__(self, client, prefix: str = "pyauth0:") -> None:
+        """
+        :param client: a sync Redis client, the async providers call it in the default executor
+        :param prefix: prefix of the Redis keys
+        """
+        self._client = client
+        self._prefix = prefix
+
+    def _key(self, key: str, suffix: str) -> str:
+        return self._prefix + _hash_key(key) + suffix
+
+    def get(self, key: str) -> typing.Optional[CacheEntry]:
+        data = self._client.get(self._key(key, ""))
+        if data is None:
+            return None
+        try:
+            entry = CacheEntry(**json.loads(data))
+        except (ValueError, TypeError):
+            return None
+        if entry.expires_at <= time.time():
+            return None
+        return entry
+
+    def set(self, key: str, value: typing.Any, expires_at: float) -> None:
+        px = int((expires_at - time.time()) * 1000)
+        if px <= 0:
+            self._client.delete(self._key(key, ""))
+            return
+        data = json.dumps({"value": value, "expires_at": expires_at})
+        self._client.set(self._key(key, ""), data, px=px)
+
+    def acquire_lease(self, key: str, ttl: float) -> typing.Optional[str]:
+        lease = uuid.uuid4().hex
+        if self._client.set(
+            self._key(key, ":lease"), lease, nx=True, px=int(ttl * 1000)
+        ):
+            return lease
+        return None
+
+    def release_lease(self, key: str, lease: str) -> None:
+        lease_key = self._key(key, ":lease")
+        current = self._client.get(lease_key)
+        if isinstance(current, bytes):
+            current = current.decode("utf-8")
+        # not atomic, at worst a lease about to expire is released early
+        if current == lease:
+            self._client.delete(lease_key)
+
+
+def _hash_key(key: str) -> str:
+    # keys may contain secrets, only their hash is stored
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _is_shared(
+    entry: typing.Optional[CacheEntry],
+    seen: typing.Optional[CacheEntry],
+    reusable: typing.Callable[[CacheEntry], bool],
+) -> bool:
+    # reusable, or refreshed by someone else since we looked
+    return entry is not None and (reusable(entry) or entry != seen)
+
+
+def fetch_shared(
+    cache: CacheBackend,
+    key: str,
+    fetch: typing.Callable[[], CacheEntry],
+    reusable: typing.Callable[[CacheEntry], bool] = lambda entry: True,
+    lease_ttl: float = 30,
+    poll_interval: float = 0.05,
+) -> CacheEntry:
+    """
+    Returns the cached entry if `reusable`, otherwise fetches and caches a new one.
+    Only the holder of the lease fetches, the others wait for its entry.
+
+    :param lease_ttl: max seconds a fetch can take, before someone else takes over
+    :param poll_interval: seconds between two checks while waiting for the lease holder
+    """
+    seen = cache.get(key)
+    if seen is not None and reusable(seen):
+        return seen
+    while True:
+        lease = cache.acquire_lease(key, lease_ttl)
+        if lease is not None:
+            try:
+                entry = cache.get(key)
+                if _is_shared(entry, seen, reusable):
+                    return entry
+                entry = fetch()
+                cache.set(key, entry.value, entry.expires_at)
+                return entry
+            finally:
+                cache.release_lease(key, lease)
+        time.sleep(poll_interval)
+        entry = cache.get(key)
+        if _is_shared(entry, seen, reusable):
+            return entry
+
+
+async def _call(cache: CacheBackend, method: typing.Callable, *args):
+    if not cache.blocking:
+        return method(*args)
+    return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+
+async def fetch_shared_async(
+    cache: CacheBackend,
+    key: str,
+    fetch: typing.Callable[[], typing.Awaitable[CacheEntry]],
+    reusable: typing.Callable[[CacheEntry], bool] = lambda entry: True,
+    lease_ttl: float = 30,
+    poll_interval: float = 0.05,
+) -> CacheEntry:
+    """
+    Async counterpart of `fetch_shared`, neither waiting for the lease holder nor a blocking cache
+    (see `CacheBackend.blocking`) blocks the event loop
+    """
+    seen = await _call(cache, cache.get, key)
+    if seen is not None and reusable(seen):
+        return seen
+    while True:
+        lease = await _call(cache, cache.acquire_lease, key, lease_ttl)
+        if lease is not None:
+            try:
+                entry = await _call(cache, cache.get, key)
+                if _is_shared(entry, seen, reusable):
+                    return entry
+                entry = await fetch()
+                await _call(cache, cache.set, key, entry.value, entry.expires_at)
+                return entry
+            finally:
+                await _call(cache, cache.release_lease, key, lease)
+        await asyncio.sleep(poll_interval)
+        entry = await _call(cache, cache.get, key)
+        if _is_shared(entry, seen, reusable):
+            return entry
@@ -4,3 +4,7 @@ class Auth0Error(Exception):
         self.status_code = status_code
         self.code = code
         self.description = description
+
+    def __reduce__(self):
+        # allows errors to cross process boundaries (e.g. ProcessPoolExecutor)
+        return Auth0Error, (self.status_code, self.code, self.description)
@@ -0,0 +1,48 @@
+"""
+FastAPI dependency verifying the Bearer token, requires `pip install fastapi`
+"""
+
+from typing import Union
+
+from fastapi import HTTPException, Request
+
+from pyauth0.asgi import get_bearer_token
+from pyauth0.errors import Auth0Error
+from pyauth0.multi_tenant import MultiTenantTokenVerifier
+from pyauth0.token_verifier import DecodedToken, TokenVerifier
+
+
+class BearerToken:
+    """
+    Dependency returning the DecodedToken of the request, example
+    `async def handler(token: DecodedToken = Depends(BearerToken(token_verifier)))`.
+    Rejected requests get an HTTPException with the status code of the Auth0Error.
+    """
+
+    def __init__(
+        self,
+        token_verifier: Union[TokenVerifier, MultiTenantTokenVerifier],
+        state_key: str = "token",
+    ) -> None:
+        """
+        :param token_verifier: shared by all the requests, together with its JWKS and token caches
+        :param state_key: with `pyauth0.asgi.AuthMiddleware`, the token it verified is reused
+        """
+        self.token_verifier = token_verifier
+        self._state_key = state_key
+
+    async def __call__(self, request: Request) -> DecodedToken:
+        decoded_token = getattr(request.state, self._state_key, None)
+        if decoded_token is not None:
+            return decoded_token
+        try:
+            token = get_bearer_token(request.headers.get("authorization"))
+            return await self.token_verifier.verify(token)
+        except Auth0Error as error:
+            raise HTTPException(
+                status_code=error.status_code,
+                detail={"code": error.code, "description": error.description},
+                headers=(
+                    {"WWW-Authenticate": "Bearer"} if error.status_code == 401 else None
+                ),
+            ) from error
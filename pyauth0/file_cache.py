@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import typing
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Windows: writes are still atomic, but leases are not exclusive across processes
+    fcntl = None
+
+from pyauth0.cache import CacheBackend, CacheEntry, _hash_key
+
+
+def _user_id() -> str:
+    if hasattr(os, "getuid"):
+        return str(os.getuid())
+    return os.environ.get("USERNAME", "default")  # pragma: no cover
+
+
+def _check_private(directory: str) -> None:
+    # `makedirs` does not change the mode of an existing directory, that could be created by another user
+    if not hasattr(os, "getuid"):  # pragma: no cover
+        return
+    stat = os.stat(directory)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+        raise PermissionError(
+            f"Cache directory {directory} must be owned by the current user with mode 0700"
+        )
+
+
+class FileCache(CacheBackend):
+    """
+    JSON values stored on disk until they expire, shared by the processes of a host.
+    Writes are atomic. Leases are file locks, released by the system if the holding process dies.
+    """
+
+    def __init__(self, directory: typing.Optional[str] = None) -> None:
+        """
+        :param directory: where the entries are stored, defaults to `pyauth0-cache-<uid>` in the temp directory.
+                Processes using the same directory share the entries.
+                The directory must be owned by the current user and not accessible to the others.
+        """
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), f"pyauth0-cache-{_user_id()}"
+        )
+        # entries may hold access tokens, only the owner can read them
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        _check_private(self.directory)
+        self._leases: typing.Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, _hash_key(key) + suffix)
+
+    def get(self, key: str) -> typing.Optional[CacheEntry]:
+        """
+        :returns The entry, or None if missing, expired or unreadable
+        """
+        try:
+            with open(self._path(key, ".json"), "rb") as f:
+                entry = CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        if not isinstance(entry.expires_at, (int, float)):
+            return None
+        if entry.expires_at <= time.time():
+            return None
+        return entry
+
+    def set(self, key: str, value: typing.Any, expires_at: float) -> None:
+        data = json.dumps({"value": value, "expires_at": expires_at}).encode("utf-8")
+        # write to a temp file first, so that other processes never read a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key, ".json"))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def acquire_lease(self, key: str, ttl: float) -> typing.Optional[str]:
+        # a file lock does not expire, it is released by the system if the process dies instead
+        fd = os.open(self._path(key, ".lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return None
+        lease = uuid.uuid4().hex
+        with self._lock:
+            self._leases[lease] = fd
+        return lease
+
+    def release_lease(self, key: str, lease: str) -> None:
+        with self._lock:
+            fd = self._leases.pop(lease, None)
+        if fd is not None:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
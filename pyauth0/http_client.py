@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import typing
+import warnings
+
+import httpx
+
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=60,
+)
+DEFAULT_TIMEOUT = httpx.Timeout(10.0)
+
+
+def create_async_client(
+    limits: httpx.Limits = None,
+    timeout: httpx.Timeout = None,
+    http2: bool = False,
+) -> httpx.AsyncClient:
+    """
+    Creates a long-lived client, meant to be shared by TokenProvider and TokenVerifier instances
+
+    :param limits: connection pool limits, see https://www.python-httpx.org/advanced/resource-limits/
+    :param timeout: see https://www.python-httpx.org/advanced/timeouts/
+    :param http2: enables HTTP/2, requires `pip install httpx[http2]`
+    """
+    return httpx.AsyncClient(
+        limits=limits or DEFAULT_LIMITS,
+        timeout=timeout or DEFAULT_TIMEOUT,
+        http2=http2,
+    )
+
+
+def create_client(
+    limits: httpx.Limits = None,
+    timeout: httpx.Timeout = None,
+    http2: bool = False,
+) -> httpx.Client:
+    """
+    Creates a long-lived sync client, meant to be shared by SyncTokenProvider and SyncTokenVerifier instances
+
+    :param limits: connection pool limits, see https://www.python-httpx.org/advanced/resource-limits/
+    :param timeout: see https://www.python-httpx.org/advanced/timeouts/
+    :param http2: enables HTTP/2, requires `pip install httpx[http2]`
+    """
+    return httpx.Client(
+        limits=limits or DEFAULT_LIMITS,
+        timeout=timeout or DEFAULT_TIMEOUT,
+        http2=http2,
+    )
+
+
+class _AsyncClientHolder:
+    """
+    Holds either an injected client, or an owned one created lazily on first use.
+    Only the owned client is closed by `aclose`. It is also closed when its event loop shuts down,
+    or when it is replaced by the client of another event loop.
+    """
+
+    def __init__(self, client: typing.Optional[httpx.AsyncClient] = None) -> None:
+        self._client = client
+        self._owned = client is None
+        self._loop: typing.Optional[asyncio.AbstractEventLoop] = None
+        self._closer: typing.Optional[typing.AsyncGenerator[None, None]] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._owned:
+            loop = asyncio.get_running_loop()
+            # pooled connections are bound to the event loop they were opened in
+            if self._client is None or self._loop is not loop:
+                self._release()
+                self._client = create_async_client()
+                self._loop = loop
+                # closes the client when the loop shuts down, example at the end of `asyncio.run`
+                self._closer = _close_on_shutdown(self._client)
+                asyncio.ensure_future(self._closer.__anext__())
+        return self._client
+
+    def _release(self) -> None:
+        """
+        Closes the owned client of another event loop, in that loop
+        """
+        client, loop, self._client, self._closer = (
+            self._client,
+            self._loop,
+            None,
+            None,
+        )
+        if client is None or client.is_closed:
+            return
+        if loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            warnings.warn(
+                "pyauth0: the http client of a closed event loop was not closed, "
+                "use `aclose` before the loop ends",
+                ResourceWarning,
+            )
+
+    async def aclose(self) -> None:
+        if self._owned and self._client is not None:
+            if self._loop is not asyncio.get_running_loop():
+                self._release()
+                return
+            client, closer, self._client, self._closer = (
+                self._client,
+                self._closer,
+                None,
+                None,
+            )
+            await client.aclose()
+            await closer.aclose()
+
+    def borrow(self) -> "_BorrowedAsyncClientHolder":
+        """
+        A holder sharing the client of this one, without closing it
+        """
+        return _BorrowedAsyncClientHolder(self)
+
+
+async def _close_on_shutdown(
+    client: httpx.AsyncClient,
+) -> typing.AsyncGenerator[None, None]:
+    # async generators still suspended are finalized by `loop.shutdown_asyncgens`, in their own loop
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+class _BorrowedAsyncClientHolder:
+    def __init__(self, holder: _AsyncClientHolder) -> None:
+        self._holder = holder
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._holder.client
+
+    async def aclose(self) -> None:
+        # the client is closed by the lending holder
+        pass
+
+
+class _ClientHolder:
+    """
+    Sync counterpart of `_AsyncClientHolder`, the owned client is shared by all threads
+    """
+
+    def __init__(self, client: typing.Optional[httpx.Client] = None) -> None:
+        self._client = client
+        self._owned = client is None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = create_client()
+        return self._client
+
+    def close(self) -> None:
+        if self._owned and self._client is not None:
+            client, self._client = self._client, None
+            client.close()
@@ -0,0 +1,163 @@
+"""
+Measurements reported by the verifiers and the providers, all latencies are in seconds.
+
+Histograms:
+- `verify`: whole `verify` call
+- `verify.parse`: token parsing, and pre-check if enabled
+- `verify.key_lookup`: JWKS (cached or fetched) and key lookup
+- `verify.signature`: signature check
+- `verify.claims`: claims validation
+- `verify.decode`: signature check and claims validation, when run in the executor (queueing included)
+  or by a backend verifying both at once (`VerifierBackend.splits_verification` not set)
+- `verify_many`: whole `verify_many` call, one observation per batch as the stages below
+- `verify_many.parse`: parsing (and pre-check) of the batch
+- `verify_many.key_lookup`: JWKS, key lookup and verified token cache lookups of the batch
+- `verify_many.decode`: signature checks and claims validation of the batch, executor included
+- `http.request`: upstream requests, labelled `target="jwks"` or `target="token"`
+
+Counters:
+- `verify.error`: rejected tokens, labelled with the `Auth0Error.code`, batches included
+- `verify_many.tokens`: tokens received by `verify_many`, the batch histograms divided by it give the cost per token
+- `verified_token_cache.hit`, `verified_token_cache.miss`
+- `jwks_cache.hit`, `jwks_cache.miss`, `jwks.refresh`
+- `token_cache.hit`, `token_cache.miss`, `token.refresh`: M2M tokens
+"""
+
+import bisect
+import threading
+import typing
+
+
+class Metrics:
+    """
+    Receives the measurements, see the list above. This implementation ignores them.
+    The instrumented classes take `metrics=None` by default, in which case nothing is measured at all.
+    """
+
+    def increment(self, name: str, value: int = 1, **labels: str) -> None:
+        pass
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        pass
+
+
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets: typing.Sequence[float]) -> None:
+        """
+        :param buckets: sorted upper bounds, values above the last one are counted in an overflow bucket
+        """
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        :returns The upper bound of the bucket holding the `q` quantile (example 0.99), inf if above the last one
+        """
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            seen += count
+            if seen >= rank and seen > 0:
+                return bound
+        return float("inf")
+
+
+class InMemoryMetrics(Metrics):
+    """
+    Collects the measurements in process, to be scraped (see `snapshot`) or asserted on in tests
+    """
+
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self._buckets = buckets
+        self._counters: typing.Dict[tuple, int] = {}
+        self._histograms: typing.Dict[tuple, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1, **labels: str) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self._buckets)
+            histogram.observe(seconds)
+
+    def counter(self, name: str, **labels: str) -> int:
+        return self._counters.get(_key(name, labels), 0)
+
+    def histogram(self, name: str, **labels: str) -> typing.Optional[Histogram]:
+        return self._histograms.get(_key(name, labels))
+
+    def snapshot(self) -> dict:
+        """
+        :returns All the measurements, keyed by name and labels, example `verify.error{code=token_expired}`
+        """
+        with self._lock:
+            return {
+                "counters": {
+                    _format(key): value for key, value in self._counters.items()
+                },
+                "histograms": {
+                    _format(key): {
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": dict(
+                            zip(
+                                [*histogram.buckets, float("inf")],
+                                histogram.bucket_counts,
+                            )
+                        ),
+                    }
+                    for key, histogram in self._histograms.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, *sorted(labels.items())) if labels else (name,)
+
+
+def _format(key: tuple) -> str:
+    name, *labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
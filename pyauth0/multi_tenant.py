@@ -0,0 +1,232 @@
+import asyncio
+import collections
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+import httpx
+
+from pyauth0.backends import _invalid_claims_error
+from pyauth0.cache import CacheBackend
+from pyauth0.errors import Auth0Error
+from pyauth0.http_client import _AsyncClientHolder
+from pyauth0.token_verifier import (
+    DecodedToken,
+    JwksProvider,
+    TokenVerifier,
+    _JwksProviderBase,
+    _JwksProviderCacheDecorator,
+    _check_length,
+    _parse,
+)
+from pyauth0.utils import sanitize_issuer
+
+
+class _Tenant:
+    def __init__(
+        self, jwks_provider: JwksProvider, verifiers: Dict[str, TokenVerifier]
+    ) -> None:
+        self.jwks_provider = jwks_provider
+        # audience -> verifier, all sharing the JWKS provider of the tenant
+        self.verifiers = verifiers
+
+    async def aclose(self) -> None:
+        for token_verifier in self.verifiers.values():
+            await token_verifier.aclose()
+        await self.jwks_provider.aclose()
+
+
+class MultiTenantTokenVerifier:
+    """
+    Verifies the tokens of several Auth0 tenants (or custom domains), routing each token by its unverified "iss".
+    Tenants are initialized on their first token, and only the most recently used ones are kept,
+    so that memory and JWKS fetches scale with the active tenants.
+    """
+
+    def __init__(
+        self,
+        tenants: Mapping[str, Union[str, Iterable[str]]],
+        max_tenants: int = 32,
+        jwks_cache_ttl: Optional[int] = None,
+        jwks_cache_grace_period: int = 0,
+        jwks_stale_while_revalidate: bool = False,
+        shared_cache: Optional[CacheBackend] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        **verifier_options,
+    ):
+        """
+        :param tenants: the allowed audiences (API identifiers) by issuer, example
+                `{"tenant-1.auth0.com": ["https://api.your-domain.com"], "login.your-domain.com": ...}`
+        :param max_tenants: max number of initialized tenants, the least recently used is closed first
+        :param jwks_cache_ttl: see `TokenVerifier`, applies to each tenant
+        :param jwks_cache_grace_period: see `TokenVerifier`
+        :param jwks_stale_while_revalidate: see `TokenVerifier`
+        :param shared_cache: see `TokenVerifier`
+        :param http_client: a long-lived client to reuse, shared by all the tenants.
+                If not set, an owned client is created on first use and closed by `aclose`.
+        :param verifier_options: other `TokenVerifier` arguments, example `token_cache_size` or `executor`.
+                With `metrics`, the tokens are measured across all the tenants.
+        """
+        if max_tenants < 1:
+            raise ValueError("max_tenants must be positive")
+        self._max_tenants = max_tenants
+        self._jwks_cache_ttl = jwks_cache_ttl
+        self._jwks_cache_grace_period = jwks_cache_grace_period
+        self._jwks_stale_while_revalidate = jwks_stale_while_revalidate
+        self._shared_cache = shared_cache
+        self._verifier_options = verifier_options
+        self._http = _AsyncClientHolder(http_client)
+        self._audiences: Dict[str, Tuple[str, ...]] = {}
+        self._tenants: "collections.OrderedDict[str, _Tenant]" = (
+            collections.OrderedDict()
+        )
+        self._evicted: List[_Tenant] = []
+        # closes of the evicted tenants running in background, awaited by `aclose`
+        self._closing: Set[asyncio.Task] = set()
+        for issuer, audiences in tenants.items():
+            self.add_tenant(issuer, audiences)
+
+    async def __aenter__(self) -> "MultiTenantTokenVerifier":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def add_tenant(self, issuer: str, audiences: Union[str, Iterable[str]]) -> None:
+        """
+        Adds or reconfigures a tenant, it is initialized on its first token
+
+        :param issuer: hostname of the tenant in Auth0, example `your-domain.auth0.com`
+        :param audiences: the allowed API identifiers
+        """
+        if not issuer:
+            raise ValueError("missing issuer")
+        audiences = (audiences,) if isinstance(audiences, str) else tuple(audiences)
+        if not audiences:
+            raise ValueError("missing audience")
+        issuer = sanitize_issuer(issuer)
+        self._audiences[issuer] = audiences
+        tenant = self._tenants.pop(issuer, None)
+        if tenant is not None:
+            self._evicted.append(tenant)
+
+    def _get_tenant(self, issuer: str) -> _Tenant:
+        tenant = self._tenants.get(issuer)
+        if tenant is None:
+            tenant = self._create_tenant(issuer)
+            self._tenants[issuer] = tenant
+            while len(self._tenants) > self._max_tenants:
+                _, evicted = self._tenants.popitem(last=False)
+                self._evicted.append(evicted)
+        self._tenants.move_to_end(issuer)
+        return tenant
+
+    def _create_tenant(self, issuer: str) -> _Tenant:
+        metrics = self._verifier_options.get("metrics")
+        # all the tenants share the connection pool
+        jwks_provider = _JwksProviderBase(
+            issuer, metrics=metrics, http_client_holder=self._http.borrow()
+        )
+        if self._jwks_cache_ttl:
+            jwks_provider = _JwksProviderCacheDecorator(
+                jwks_provider,
+                self._jwks_cache_ttl,
+                grace_period=self._jwks_cache_grace_period,
+                stale_while_revalidate=self._jwks_stale_while_revalidate,
+                shared_cache=self._shared_cache,
+                shared_cache_key=f"jwks:{issuer}",
+                metrics=metrics,
+                clock=self._verifier_options.get("clock"),
+            )
+        verifiers = {
+            audience: TokenVerifier(
+                issuer,
+                audience,
+                jwks_provider=jwks_provider,
+                **self._verifier_options,
+            )
+            for audience in self._audiences[issuer]
+        }
+        return _Tenant(jwks_provider, verifiers)
+
+    def _get_verifier(self, claims: dict) -> TokenVerifier:
+        issuer = claims.get("iss")
+        if not isinstance(issuer, str) or issuer.rstrip("/") not in self._audiences:
+            raise _invalid_claims_error()
+        issuer = issuer.rstrip("/")
+        verifiers = self._get_tenant(issuer).verifiers
+        audience_claims = claims.get("aud")
+        if audience_claims is None:
+            # the "aud" claim is optional, same as TokenVerifier
+            return next(iter(verifiers.values()))
+        if isinstance(audience_claims, str):
+            audience_claims = [audience_claims]
+        if isinstance(audience_claims, list):
+            for audience in audience_claims:
+                if isinstance(audience, str) and audience in verifiers:
+                    return verifiers[audience]
+        raise _invalid_claims_error()
+
+    def _close_evicted_in_background(self) -> None:
+        """
+        Closes the evicted tenants off the request path, they may wait for a JWKS refresh in flight
+        """
+        if not self._evicted:
+            return
+        closing = asyncio.ensure_future(self._close_evicted())
+        self._closing.add(closing)
+        closing.add_done_callback(self._closed)
+
+    def _closed(self, closing: asyncio.Task) -> None:
+        self._closing.discard(closing)
+        # retrieve the exception, nobody awaits the background close
+        closing.cancelled() or closing.exception()
+
+    async def _close_evicted(self) -> None:
+        evicted, self._evicted = self._evicted, []
+        for tenant in evicted:
+            refresh_task = getattr(tenant.jwks_provider, "_refresh_task", None)
+            if refresh_task is not None:
+                # let the tokens still waiting for the JWKS get verified
+                await asyncio.wait({refresh_task})
+            await tenant.aclose()
+
+    async def verify(self, token: str) -> DecodedToken:
+        """
+        Decodes and verifies the token payload, with the JWKS of its issuer
+
+        :param token: the token as string
+        :returns The dict representation of the claims set, assuming the signature is valid
+                and all requested data validation passes.
+        """
+        metrics = self._verifier_options.get("metrics")
+        if metrics is None:
+            return await self._verify(token)
+        started = time.perf_counter()
+        try:
+            return await self._verify(token)
+        except Auth0Error as error:
+            metrics.increment("verify.error", code=error.code)
+            raise
+        finally:
+            metrics.observe("verify", time.perf_counter() - started)
+
+    async def _verify(self, token: str) -> DecodedToken:
+        if self._verifier_options.get("precheck"):
+            # checked here, the tenant (and its verifier) is known only once the token is parsed
+            _check_length(token, self._verifier_options.get("max_token_length", 16384))
+        parsed = _parse(token)
+        token_verifier = self._get_verifier(parsed.claims)
+        self._close_evicted_in_background()
+        return await token_verifier._verify(token_verifier._prechecked(parsed))
+
+    async def aclose(self) -> None:
+        """
+        Closes all the tenants and the owned http client
+        """
+        if self._closing:
+            await asyncio.wait(self._closing)
+        await self._close_evicted()
+        tenants, self._tenants = self._tenants, collections.OrderedDict()
+        for tenant in tenants.values():
+            await tenant.aclose()
+        await self._http.aclose()
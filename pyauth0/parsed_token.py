@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+import typing
+
+
+class ParsedToken(typing.NamedTuple):
+    """
+    A compact JWS split once, with each segment decoded once.
+    Nothing is verified, see `pyauth0.TokenVerifier`.
+    """
+
+    token: str
+    header: dict
+    claims: dict
+    signing_input: bytes
+    signature: bytes
+
+
+def parse_token(token: str) -> ParsedToken:
+    """
+    :param token: the token as string
+    :raises ValueError: if the token is not a compact JWS with JSON object header and claims
+    """
+    try:
+        raw = token.encode("ascii")
+        header_segment, claims_segment, crypto_segment = raw.split(b".")
+        header = json.loads(base64url_decode(header_segment))
+        claims = json.loads(base64url_decode(claims_segment))
+        signature = base64url_decode(crypto_segment)
+    except (AttributeError, UnicodeError, binascii.Error) as error:
+        raise ValueError(f"Malformed token: {error}") from error
+    if not isinstance(header, dict):
+        raise ValueError("Invalid header string: must be a json object")
+    if not isinstance(claims, dict):
+        raise ValueError("Invalid payload string: must be a json object")
+    # the signing input is the raw "<header>.<claims>" segments, as signed by the issuer
+    signing_input = raw[: len(header_segment) + 1 + len(claims_segment)]
+    return ParsedToken(token, header, claims, signing_input, signature)
+
+
+def base64url_decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
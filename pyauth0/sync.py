@@ -0,0 +1,571 @@
+import abc
+import concurrent.futures
+import functools
+import threading
+import time
+import typing
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+
+import httpx
+
+from pyauth0.backends import VerifierBackend
+from pyauth0.errors import Auth0Error
+from pyauth0.cache import CacheBackend, CacheEntry, fetch_shared
+from pyauth0.http_client import _ClientHolder
+from pyauth0.metrics import Metrics
+from pyauth0.parsed_token import ParsedToken
+from pyauth0.token_provider import GetTokenResponse, _TokenProviderBase
+from pyauth0.token_verifier import (
+    DecodedToken,
+    _JwksKeyIndex,
+    _TokenVerifierBase,
+    _decode_payloads,
+    _jwks_from_response,
+)
+from pyauth0.utils import sanitize_issuer
+
+
+class SyncJwksProvider(abc.ABC):
+    """
+    Sync counterpart of `pyauth0.token_verifier.JwksProvider`
+    """
+
+    @abc.abstractmethod
+    def get(self):
+        pass
+
+    def refresh(self):
+        """
+        Fetches the JWKS bypassing any cache, called when a token is signed by an unknown key
+        """
+        return self.get()
+
+    def close(self) -> None:
+        """
+        Releases the resources held by the provider, if any
+        """
+        pass
+
+
+class _SyncJwksProviderBase(SyncJwksProvider):
+    def __init__(
+        self,
+        issuer: str,
+        http_client: Optional[httpx.Client] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        self._issuer = sanitize_issuer(issuer)
+        self._http = _ClientHolder(http_client)
+        self._metrics = metrics
+
+    def get(self):
+        url = self._issuer + "/.well-known/jwks.json"
+        if self._metrics is None:
+            response = self._http.client.get(url)
+        else:
+            started = time.perf_counter()
+            try:
+                response = self._http.client.get(url)
+            finally:
+                self._metrics.observe(
+                    "http.request", time.perf_counter() - started, target="jwks"
+                )
+        return _jwks_from_response(response)
+
+    def close(self) -> None:
+        self._http.close()
+
+
+class _SyncJwksProviderCacheDecorator(SyncJwksProvider):
+    def __init__(
+        self,
+        delegate: SyncJwksProvider,
+        ttl: int,
+        grace_period: int = 0,
+        stale_while_revalidate: bool = False,
+        shared_cache: Optional[CacheBackend] = None,
+        shared_cache_key: str = "jwks",
+        metrics: Optional[Metrics] = None,
+        clock: Optional[Callable[[], float]] = None,
+    ) -> None:
+        """
+        :param delegate: a SyncJwksProvider instance
+        :param ttl: cache time-to-live in seconds
+        :param grace_period: seconds after the ttl during which the last good JWKS is served if the refresh fails,
+                the refresh is retried after 1, 2, 4... seconds (at most 60) instead of by every call
+        :param stale_while_revalidate: if True, during the grace period the last good JWKS is served
+                while the refresh runs in a background thread, instead of waiting for it
+        :param shared_cache: if set, the JWKS is also cached there and shared with the other processes or nodes
+        :param shared_cache_key: key of the JWKS in the shared cache
+        :param metrics: if set, receives the cache hits, misses and refreshes, see `pyauth0.metrics`
+        :param clock: monotonic clock the ttl is tracked with, defaults to `time.monotonic`
+        """
+        self._delegate = delegate
+        self._ttl = ttl
+        self._grace_period = grace_period
+        self._stale_while_revalidate = stale_while_revalidate
+        self._shared_cache = shared_cache
+        self._shared_cache_key = shared_cache_key
+        self._metrics = metrics
+        self._clock = clock or time.monotonic
+        self._jwks = None
+        # as per the clock
+        self._expires_at: Optional[float] = None
+        # after a failed refresh, the stale JWKS is served without refreshing until then
+        self._retry_at: Optional[float] = None
+        self._refresh_failures = 0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._expires_at is not None and self._clock() < self._expires_at
+
+    def get(self):
+        if self._is_fresh():
+            if self._metrics is not None:
+                self._metrics.increment("jwks_cache.hit")
+            return self._jwks
+        if self._metrics is not None:
+            self._metrics.increment("jwks_cache.miss")
+        now = self._clock()
+        stale = (
+            self._expires_at is not None and now < self._expires_at + self._grace_period
+        )
+        if stale and self._retry_at is not None and now < self._retry_at:
+            return self._jwks
+        if stale and self._stale_while_revalidate:
+            if not self._lock.locked():
+                threading.Thread(target=self._refresh_quietly, daemon=True).start()
+            return self._jwks
+        try:
+            return self._refresh()
+        except Exception:
+            if stale:
+                return self._jwks
+            raise
+
+    def refresh(self):
+        return self._refresh(force=True)
+
+    def _refresh(self, force: bool = False):
+        expires_at = self._expires_at
+        # single-flight: threads waiting for the lock get the JWKS fetched by the thread holding it
+        with self._lock:
+            if not self._is_fresh() or (force and self._expires_at is expires_at):
+                self._fetch(force)
+            return self._jwks
+
+    def _fetch(self, force: bool) -> None:
+        try:
+            if self._shared_cache is None:
+                entry = self._fetch_entry()
+            else:
+                entry = fetch_shared(
+                    self._shared_cache,
+                    self._shared_cache_key,
+                    self._fetch_entry,
+                    # a forced refresh reuses only a JWKS refreshed meanwhile by another process
+                    reusable=lambda entry: not force or entry.value != self._jwks,
+                )
+        except Exception:
+            self._schedule_retry()
+            raise
+        self._jwks = entry.value
+        # the shared cache holds a unix timestamp, comparable across processes
+        self._expires_at = self._clock() + entry.expires_at - time.time()
+        self._refresh_failures, self._retry_at = 0, None
+
+    def _schedule_retry(self) -> None:
+        self._refresh_failures += 1
+        self._retry_at = self._clock() + min(2 ** (self._refresh_failures - 1), 60)
+
+    def _fetch_entry(self) -> CacheEntry:
+        if self._metrics is not None:
+            self._metrics.increment("jwks.refresh")
+        return CacheEntry(self._delegate.get(), time.time() + self._ttl)
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self._refresh()
+        except Exception:
+            # background refresh failures are handled in get
+            pass
+
+    def close(self) -> None:
+        self._delegate.close()
+
+
+class SyncTokenVerifier(_TokenVerifierBase):
+    """
+    Sync counterpart of `pyauth0.TokenVerifier`, for WSGI apps, workers and CLI jobs
+    """
+
+    def __init__(
+        self,
+        issuer: str,
+        audience: str,
+        jwks_provider: Optional[SyncJwksProvider] = None,
+        jwks_cache_ttl: Optional[int] = None,
+        token_cache_size: Optional[int] = None,
+        jwks_cache_grace_period: int = 0,
+        jwks_stale_while_revalidate: bool = False,
+        http_client: Optional[httpx.Client] = None,
+        executor: Optional[concurrent.futures.Executor] = None,
+        backend: Optional[VerifierBackend] = None,
+        algorithms: Optional[List[str]] = None,
+        jwks_min_refresh_interval: Optional[float] = None,
+        unknown_kid_cache_size: int = 1024,
+        unknown_kid_cache_ttl: float = 300,
+        precheck: bool = False,
+        precheck_leeway: int = 0,
+        max_token_length: int = 16384,
+        shared_cache: Optional[CacheBackend] = None,
+        metrics: Optional[Metrics] = None,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        """
+        :param issuer: hostname of the tenant in Auth0, example `your-domain.auth0.com`
+        :param audience: API identifier
+        :param jwks_cache_ttl: if set, the JWKS is cached for this number of seconds
+        :param jwks_cache_grace_period: seconds after the `jwks_cache_ttl` during which the last good JWKS
+                is served if the refresh fails
+        :param jwks_stale_while_revalidate: serve the last good JWKS while refreshing it in background
+        :param token_cache_size: if set, verified tokens are cached (up to this number) until they expire
+        :param http_client: a long-lived client to reuse, see `pyauth0.http_client.create_client`.
+                If not set, an owned client is created on first use and closed by `close`.
+        :param executor: default executor of `verify_many`. The executor is not shut down by `close`.
+        :param backend: verifies signature and claims, see `pyauth0.backends`.
+                Defaults to `cryptography` if installed, otherwise python-jose.
+        :param algorithms: allowed signing algorithms, any of RS256 (default), ES256 and EdDSA.
+                EdDSA requires the `cryptography` backend.
+        :param jwks_min_refresh_interval: if set, a token signed by an unknown key forces a JWKS refresh
+                (e.g. after a key rotation), at most once per this number of seconds.
+        :param unknown_kid_cache_size: max number of keys remembered as unknown after a forced refresh,
+                tokens signed by these keys are rejected without forcing another refresh
+        :param unknown_kid_cache_ttl: seconds the unknown keys are remembered
+        :param precheck: if True, tokens with a wrong "alg", "iss" or "aud", or expired since more than
+                `precheck_leeway` seconds, are rejected before the JWKS lookup and the signature check
+        :param precheck_leeway: seconds after "exp" during which the expiration is left to the full check
+        :param max_token_length: with `precheck`, longer tokens are rejected before being parsed
+        :param shared_cache: with `jwks_cache_ttl`, the JWKS is also cached there, so that processes start warm
+                and only one process or node at a time fetches it, see `pyauth0.cache`
+        :param metrics: if set, receives the latencies, cache hits and errors, see `pyauth0.metrics`
+        :param clock: monotonic clock the JWKS and token caches expire with, defaults to `time.monotonic`
+        """
+        super().__init__(
+            issuer,
+            audience,
+            token_cache_size,
+            executor,
+            backend,
+            algorithms,
+            jwks_min_refresh_interval,
+            unknown_kid_cache_size,
+            unknown_kid_cache_ttl,
+            precheck,
+            precheck_leeway,
+            max_token_length,
+            metrics,
+            clock,
+        )
+        self._forced_refresh_lock = threading.Lock()
+        # only the JWKS provider created here is closed by `close`
+        self._owns_jwks_provider = not jwks_provider
+        if jwks_provider:
+            self._jwks_provider = jwks_provider
+        else:
+            self._jwks_provider = _SyncJwksProviderBase(issuer, http_client, metrics)
+            if jwks_cache_ttl:
+                self._jwks_provider = _SyncJwksProviderCacheDecorator(
+                    self._jwks_provider,
+                    jwks_cache_ttl,
+                    grace_period=jwks_cache_grace_period,
+                    stale_while_revalidate=jwks_stale_while_revalidate,
+                    shared_cache=shared_cache,
+                    shared_cache_key=f"jwks:{self._issuer}",
+                    metrics=metrics,
+                    clock=clock,
+                )
+
+    def __enter__(self) -> "SyncTokenVerifier":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the JWKS provider and its owned http client, unless the provider was injected
+        """
+        if self._owns_jwks_provider:
+            self._jwks_provider.close()
+
+    def _get_key_index(self) -> _JwksKeyIndex:
+        return self._index_jwks(self._jwks_provider.get())
+
+    def _refresh_key_index(
+        self, key_index: _JwksKeyIndex, kids: Iterable[str]
+    ) -> _JwksKeyIndex:
+        """
+        Forces a JWKS refresh if some of the kids are unknown, see `jwks_min_refresh_interval`
+        """
+        if not self._missing_kids(key_index, kids):
+            return key_index
+        # threads waiting for the lock see the index refreshed by the thread holding it
+        with self._forced_refresh_lock:
+            key_index = self._key_index
+            missing = self._missing_kids(key_index, kids)
+            if missing and self._may_force_refresh():
+                try:
+                    key_index = self._index_jwks(self._jwks_provider.refresh())
+                except Exception:
+                    # the token is rejected as signed by an unknown key, same as without refresh
+                    return key_index
+                self._remember_unknown_kids(key_index, missing)
+            return key_index
+
+    def verify(self, token: str) -> DecodedToken:
+        """
+        Decodes and verifies the token payload
+
+        :param token: the token as string
+        :returns The dict representation of the claims set, assuming the signature is valid
+                and all requested data validation passes.
+        """
+        if self._metrics is None:
+            return self._verify(self._parse(token))
+        with self._measure_verify():
+            return self._verify(self._timed("verify.parse", self._parse, token))
+
+    def _verify(self, parsed: ParsedToken) -> DecodedToken:
+        if self._metrics is not None:
+            started = time.perf_counter()
+
+        key_index = self._get_key_index()
+
+        decoded_token = self._get_cached(parsed.token)
+        if decoded_token is not None:
+            return decoded_token
+
+        key_index = self._refresh_key_index(key_index, [parsed.header.get("kid")])
+        rsa_key = self._get_key(key_index, parsed.header)
+
+        if self._metrics is not None:
+            self._metrics.observe("verify.key_lookup", time.perf_counter() - started)
+
+        payload = self._decode(parsed, rsa_key)
+        return self._decoded(parsed, payload)
+
+    def verify_many(
+        self,
+        tokens: Sequence[str],
+        executor: Optional[concurrent.futures.Executor] = None,
+        chunk_size: int = 100,
+    ) -> List[Union[DecodedToken, Auth0Error]]:
+        """
+        Decodes and verifies a batch of tokens, fetching the JWKS once per batch.
+        A failing token does not fail the batch.
+
+        :param tokens: the tokens as string
+        :param executor: if set, the signature checks are spread across this thread or process pool,
+                defaults to the executor of the verifier
+        :param chunk_size: max number of tokens sent to the executor in a single job
+        :returns For each token, in input order, either the DecodedToken or the Auth0Error
+        """
+        if self._metrics is None:
+            return self._verify_many(tokens, executor, chunk_size)
+        with self._measure_verify_many(tokens):
+            return self._verify_many(tokens, executor, chunk_size)
+
+    def _verify_many(
+        self,
+        tokens: Sequence[str],
+        executor: Optional[concurrent.futures.Executor],
+        chunk_size: int,
+    ) -> List[Union[DecodedToken, Auth0Error]]:
+        executor = executor or self._executor
+        started = self._stage_started()
+        results, parsed = self._parse_batch(tokens)
+        self._stage_completed("verify_many.parse", started)
+        if not parsed:
+            return self._collect_batch([], [], results)
+        started = self._stage_started()
+        key_index = self._get_key_index()
+        key_index = self._refresh_key_index(
+            key_index, {token.header.get("kid") for _, token in parsed}
+        )
+        jobs = self._plan_batch(parsed, key_index, results, executor, chunk_size)
+        self._stage_completed("verify_many.key_lookup", started)
+
+        started = self._stage_started()
+        chunks = [[token for _, token in chunk] for chunk, _ in jobs]
+        keys = [rsa_key for _, rsa_key in jobs]
+        if executor is None:
+            outcomes = [
+                _decode_payloads(chunk, rsa_key, *self._decode_args())
+                for chunk, rsa_key in zip(chunks, keys)
+            ]
+        else:
+            outcomes = list(
+                executor.map(
+                    _decode_payloads,
+                    chunks,
+                    keys,
+                    *([arg] * len(jobs) for arg in self._decode_args()),
+                )
+            )
+        self._stage_completed("verify_many.decode", started)
+        return self._collect_batch(jobs, outcomes, results)
+
+
+class SyncTokenProvider(_TokenProviderBase):
+    """
+    Sync counterpart of `pyauth0.TokenProvider`, for WSGI apps, workers and CLI jobs
+    """
+
+    def __init__(
+        self,
+        issuer,
+        audience,
+        client_id,
+        client_secret,
+        payload_customizer: typing.Callable[[dict], dict] = None,
+        refresh_ratio: typing.Optional[float] = None,
+        http_client: typing.Optional[httpx.Client] = None,
+        shared_cache: typing.Optional[CacheBackend] = None,
+        metrics: typing.Optional[Metrics] = None,
+        clock: typing.Optional[typing.Callable[[], float]] = None,
+    ):
+        """
+        :param issuer: hostname of the tenant in Auth0, example `your-domain.auth0.com`
+        :param audience: API identifier
+        :param client_id:
+        :param client_secret:
+        :param refresh_ratio: if set, the token is renewed in a background thread once this fraction of its
+                `expires_in` has elapsed (example 0.8), so that callers never wait for a token fetch
+        :param http_client: a long-lived client to reuse, see `pyauth0.http_client.create_client`.
+                If not set, an owned client is created on first use and closed by `close`.
+        :param shared_cache: if set, the token is also cached there, so that processes start warm
+                and only one process or node at a time fetches it, see `pyauth0.cache`
+        :param metrics: if set, receives the cache hits, refreshes and request latencies, see `pyauth0.metrics`
+        :param clock: monotonic clock the token expiration is tracked with, defaults to `time.monotonic`
+        """
+        super().__init__(
+            issuer,
+            audience,
+            client_id,
+            client_secret,
+            payload_customizer,
+            refresh_ratio,
+            shared_cache,
+            metrics,
+            clock,
+        )
+        self._lock = threading.Lock()
+        self._scheduled_refresh: typing.Optional[threading.Timer] = None
+        self._http = _ClientHolder(http_client)
+
+    def __enter__(self) -> "SyncTokenProvider":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_token(self) -> GetTokenResponse:
+        if not self._is_token_valid():
+            if self._metrics is not None:
+                self._metrics.increment("token_cache.miss")
+            # single-flight: threads waiting for the lock get the token fetched by the thread holding it
+            with self._lock:
+                if not self._is_token_valid():
+                    return self._fetch_token()
+        if self._metrics is not None:
+            self._metrics.increment("token_cache.hit")
+        return self._get_token_response
+
+    def _fetch_token(self) -> GetTokenResponse:
+        url, payload = self._token_request()
+        if self._shared_cache is None:
+            token_response = self._post_token(url, payload)
+        else:
+            entry = fetch_shared(
+                self._shared_cache,
+                self._shared_cache_key(url, payload),
+                functools.partial(self._fetch_entry, url, payload),
+                self._is_reusable,
+            )
+            token_response = self._cached_token_response(entry)
+        if self._refresh_ratio:
+            self._schedule_refresh(self._refresh_delay(token_response))
+        return token_response
+
+    def _post_token(self, url: str, payload: dict) -> GetTokenResponse:
+        started = self._request_started()
+        try:
+            response = self._http.client.post(
+                url,
+                json=payload,
+                headers={"content-type": "application/json"},
+            )
+        except Exception as error:
+            raise RuntimeError(f"Invalid response POST {url} >> {error}")
+        finally:
+            self._request_completed(started)
+        return self._token_response(url, response)
+
+    def _fetch_entry(self, url: str, payload: dict) -> CacheEntry:
+        token_response = self._post_token(url, payload)
+        return CacheEntry(
+            token_response.response_body, token_response.expires_at.timestamp()
+        )
+
+    def _schedule_refresh(self, delay: float) -> None:
+        if self._scheduled_refresh:
+            self._scheduled_refresh.cancel()
+        self._scheduled_refresh = threading.Timer(delay, self._refresh_quietly)
+        self._scheduled_refresh.daemon = True
+        self._scheduled_refresh.start()
+
+    def _refresh_quietly(self) -> None:
+        try:
+            with self._lock:
+                self._fetch_token()
+        except Exception:
+            # retried while the token is still valid, so that callers do not wait for the fetch
+            self._schedule_retry()
+
+    def refresh_if_due(self, margin: int) -> None:
+        """
+        Starts a background refresh if the token expires within `margin` seconds,
+        the callers keep using the current token meanwhile. See `pyauth0.auth.SyncTokenAuth`.
+
+        :param margin: seconds before expiration, capped to half the token lifetime
+        """
+        if self._is_refresh_due(margin) and not self._lock.locked():
+            threading.Thread(
+                target=self._refresh_due_quietly, args=(margin,), daemon=True
+            ).start()
+
+    def _refresh_due_quietly(self, margin: int) -> None:
+        try:
+            with self._lock:
+                # the threads started meanwhile find the token refreshed
+                if self._is_refresh_due(margin):
+                    self._fetch_token()
+        except Exception:
+            # background refresh failures are handled in get_token, once the token expires
+            pass
+
+    def close(self) -> None:
+        """
+        Cancels the background refresh, if any, and closes the owned http client
+        """
+        if self._scheduled_refresh:
+            self._scheduled_refresh.cancel()
+            self._scheduled_refresh = None
+        self._http.close()
+
+    def get_access_token(self) -> str:
+        return self.get_token().access_token
+
+    def get_authorization(self) -> str:
+        return self.get_token().authorization
@@ -1,17 +1,25 @@
 import base64
+import concurrent.futures
+import functools
 import hashlib
 import json
 import os
-import re
+import queue
 import tempfile
+import threading
 import time
 import typing
+import uuid
 
 from cryptography.exceptions import InvalidSignature
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa, padding
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey, RSAPrivateKey
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    decode_dss_signature,
+    encode_dss_signature,
+)
 
 from pyauth0.utils import sanitize_issuer
 
@@ -24,13 +32,30 @@ def _int_to_bytes(n: int):
 def _to_base64(data: typing.Union[bytes, str], no_padding=False) -> str:
     if isinstance(data, str):
         data = data.encode("utf-8")
-    b64encoded = base64.urlsafe_b64encode(data).decode("utf-8")
+    b64encoded = base64.urlsafe_b64encode(data)
     if no_padding:
-        b64encoded = re.sub("=+$", "", b64encoded)
-    return b64encoded
+        b64encoded = b64encoded.rstrip(b"=")
+    return b64encoded.decode("ascii")
 
 
-def load_rsa_private_key(key_path: str) -> RSAPrivateKey:
+def _to_compact_json(data: dict) -> str:
+    return json.dumps(data, separators=(",", ":"))
+
+
+@functools.lru_cache(maxsize=128)
+def _issuer_claim(issuer: str) -> str:
+    return f"{sanitize_issuer(issuer)}/"  # trailing slash is required!
+
+
+PrivateKey = typing.Union[
+    RSAPrivateKey, ec.EllipticCurvePrivateKey, ed25519.Ed25519PrivateKey
+]
+PublicKey = typing.Union[
+    RSAPublicKey, ec.EllipticCurvePublicKey, ed25519.Ed25519PublicKey
+]
+
+
+def load_private_key(key_path: str) -> PrivateKey:
     # Load the private key from a file
     with open(key_path, "rb") as f:
         private_pem = f.read()
@@ -41,53 +66,361 @@ def load_rsa_private_key(key_path: str) -> RSAPrivateKey:
     return private_key
 
 
+def load_rsa_private_key(key_path: str) -> RSAPrivateKey:
+    return load_private_key(key_path)
+
+
 def generate_rsa_private_key() -> RSAPrivateKey:
     return rsa.generate_private_key(
         backend=default_backend(), public_exponent=65537, key_size=4096
     )
 
 
-def get_rsa_private_key(key_path: str) -> RSAPrivateKey:
+def generate_ec_private_key() -> ec.EllipticCurvePrivateKey:
+    # P-256, as required by ES256
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+def generate_ed25519_private_key() -> ed25519.Ed25519PrivateKey:
+    return ed25519.Ed25519PrivateKey.generate()
+
+
+_KEY_GENERATORS: typing.Dict[str, typing.Callable[[], PrivateKey]] = {
+    "RS256": generate_rsa_private_key,
+    "ES256": generate_ec_private_key,
+    "EdDSA": generate_ed25519_private_key,
+}
+
+
+def generate_private_key(algorithm: str = "RS256") -> PrivateKey:
+    """
+    :param algorithm: one of RS256 (RSA 4096), ES256 (EC P-256) and EdDSA (Ed25519),
+            ES256 and EdDSA keys are much faster to generate and use
+    """
+    if algorithm not in _KEY_GENERATORS:
+        raise ValueError(f"unsupported algorithm {algorithm}")
+    return _KEY_GENERATORS[algorithm]()
+
+
+def get_private_key(key_path: str, algorithm: str = "RS256") -> PrivateKey:
+    """
+    Loads the private key from `key_path`, or generates and saves it if the file does not exist.
+    Processes sharing the same `key_path` share the same key, the first one saving it wins.
+    Without `key_path`, the generated key is kept in memory only.
+    """
     if not key_path:
-        key_dir = tempfile.mkdtemp(prefix="pyauth0-")
-        key_path = f"{key_dir}/key.pem"
+        return generate_private_key(algorithm)
     if os.path.exists(key_path):
-        private_key = load_rsa_private_key(key_path)
-    else:
-        # Generate an RSA key pair
-        private_key = generate_rsa_private_key()
-        # Serialize the private key to a PEM format
-        private_pem = private_key.private_bytes(
-            serialization.Encoding.PEM,
-            serialization.PrivateFormat.PKCS8,
-            serialization.NoEncryption(),
-        )
-        # Save the private and public keys to files
-        with open(key_path, "+wb") as f:
+        return load_private_key(key_path)
+    private_key = generate_private_key(algorithm)
+    # Write to a temp file first, so that other processes never read a partial key
+    key_dir = os.path.dirname(os.path.abspath(key_path))
+    tmp_path = _write_private_key(private_key, key_dir)
+    try:
+        # fails if another process saved its key meanwhile
+        os.link(tmp_path, key_path)
+    except FileExistsError:
+        return load_private_key(key_path)
+    finally:
+        os.unlink(tmp_path)
+    return private_key
+
+
+def get_rsa_private_key(key_path: str) -> RSAPrivateKey:
+    return get_private_key(key_path, "RS256")
+
+
+def _write_private_key(private_key: PrivateKey, directory: str) -> str:
+    """
+    Saves the key as PEM to a new temp file in `directory`, readable by the owner only
+    """
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".pyauth0-", suffix=".pem")
+    try:
+        with os.fdopen(fd, "wb") as f:
             f.write(private_pem)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
 
-    return private_key
+
+class KeyPool:
+    """
+    Generates private keys ahead of time in a background thread,
+    so that new signers (e.g. key rotation, test fixtures) do not wait for the key generation.
+    With a `directory`, the keys are kept there as PEM files and shared by the processes using it:
+    a process starting up takes a key generated by another process or by a previous run.
+    Each key is taken once, so that signers never share a key.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        algorithm: str = "RS256",
+        directory: typing.Optional[str] = None,
+    ):
+        """
+        :param size: number of keys kept ready
+        :param algorithm: see `generate_private_key`
+        :param directory: if set, the keys are kept in this directory instead of in memory,
+                processes using the same directory fill and take from the same pool
+        """
+        if algorithm not in _KEY_GENERATORS:
+            raise ValueError(f"unsupported algorithm {algorithm}")
+        self._size = size
+        self._algorithm = algorithm
+        self._directory = directory
+        if directory is not None:
+            # private keys, only the owner can read them
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._keys: "queue.Queue[PrivateKey]" = queue.Queue(maxsize=size)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self) -> None:
+        while not self._closed.is_set():
+            if self._directory is not None:
+                if len(self._stored()) >= self._size:
+                    # topped up by this or another process, keys are taken meanwhile
+                    self._closed.wait(0.1)
+                else:
+                    self._store(generate_private_key(self._algorithm))
+                continue
+            private_key = generate_private_key(self._algorithm)
+            while not self._closed.is_set():
+                try:
+                    self._keys.put(private_key, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def _stored(self) -> typing.List[str]:
+        prefix = f"{self._algorithm}-"
+        return [
+            name
+            for name in os.listdir(self._directory)
+            if name.startswith(prefix) and name.endswith(".pem")
+        ]
+
+    def _store(self, private_key: PrivateKey) -> None:
+        tmp_path = _write_private_key(private_key, self._directory)
+        # renamed once complete, so that other processes never take a partial key
+        os.replace(
+            tmp_path,
+            os.path.join(self._directory, f"{self._algorithm}-{uuid.uuid4().hex}.pem"),
+        )
+
+    def _take_stored(self) -> typing.Optional[PrivateKey]:
+        for name in self._stored():
+            claimed_path = os.path.join(
+                self._directory, f".claimed-{uuid.uuid4().hex}.pem"
+            )
+            try:
+                # atomic, only one process gets the key
+                os.rename(os.path.join(self._directory, name), claimed_path)
+            except FileNotFoundError:
+                continue
+            try:
+                return load_private_key(claimed_path)
+            finally:
+                os.unlink(claimed_path)
+        return None
+
+    def get(self) -> PrivateKey:
+        """
+        A pre-generated key, or a new one if the pool is empty
+        """
+        if self._directory is not None:
+            private_key = self._take_stored()
+            if private_key is not None:
+                return private_key
+            return generate_private_key(self._algorithm)
+        try:
+            return self._keys.get_nowait()
+        except queue.Empty:
+            return generate_private_key(self._algorithm)
+
+    def signer(self) -> "Signer":
+        """
+        A new signer, usable as `KeyRing` signer factory
+        """
+        return Signer(self.get())
+
+    def close(self) -> None:
+        """
+        Stops the background generation, the keys stored in `directory` are left for the next processes
+        """
+        self._closed.set()
 
 
 class Signer:
-    def __init__(self, private_key: RSAPrivateKey = None, private_key_path: str = None):
+    def __init__(
+        self,
+        private_key: PrivateKey = None,
+        private_key_path: str = None,
+        algorithm: str = "RS256",
+    ):
+        """
+        :param private_key: RSA, EC P-256 or Ed25519 private key
+        :param private_key_path: loaded if `private_key` is not set, see `get_private_key`
+        :param algorithm: algorithm of the key generated if neither `private_key` nor `private_key_path` are set
+        """
         super().__init__()
-        self.private_key = private_key or get_rsa_private_key(private_key_path)
+        self.private_key = private_key or get_private_key(private_key_path, algorithm)
 
     @property
-    def public_key(self) -> RSAPublicKey:
-        return self.private_key.public_key()
+    def private_key(self) -> PrivateKey:
+        return self._private_key
 
-    def get_public_pem(self):
-        return self.public_key.public_bytes(
-            serialization.Encoding.OpenSSH,
-            serialization.PublicFormat.OpenSSH,
+    @private_key.setter
+    def private_key(self, private_key: PrivateKey) -> None:
+        if isinstance(private_key, RSAPrivateKey):
+            alg = "RS256"
+        elif isinstance(private_key, ec.EllipticCurvePrivateKey) and isinstance(
+            private_key.curve, ec.SECP256R1
+        ):
+            alg = "ES256"
+        elif isinstance(private_key, ed25519.Ed25519PrivateKey):
+            alg = "EdDSA"
+        else:
+            raise ValueError(f"unsupported private key {type(private_key).__name__}")
+        self._private_key = private_key
+        self._alg = alg
+        # key material derived from the private key, computed once per key
+        self._derived = {}
+
+    @property
+    def alg(self) -> str:
+        """
+        The JWS algorithm of the key: RS256, ES256 or EdDSA
+        """
+        return self._alg
+
+    def _derive(self, name: str, compute: typing.Callable[[], typing.Any]):
+        if name not in self._derived:
+            self._derived[name] = compute()
+        return self._derived[name]
+
+    @property
+    def public_key(self) -> PublicKey:
+        return self._derive("public_key", self.private_key.public_key)
+
+    @property
+    def private_pem(self) -> bytes:
+        return self._derive(
+            "private_pem",
+            lambda: self.private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            ),
+        )
+
+    @property
+    def public_pem(self) -> bytes:
+        return self._derive(
+            "public_pem",
+            lambda: self.public_key.public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            ),
+        )
+
+    @property
+    def public_openssh(self) -> bytes:
+        return self._derive(
+            "public_openssh",
+            lambda: self.public_key.public_bytes(
+                serialization.Encoding.OpenSSH,
+                serialization.PublicFormat.OpenSSH,
+            ),
         )
 
+    def get_public_pem(self):
+        return self.public_openssh
+
+    @property
+    def kid(self) -> str:
+        # Calculate a deterministic "kid" by hashing the public key
+        return self._derive("kid", lambda: hashlib.sha256(self.public_pem).hexdigest())
+
+    def jwk(self) -> dict:
+        """
+        See https://datatracker.ietf.org/doc/html/rfc7517
+        """
+        # a copy, so that callers cannot alter the cached JWK
+        return dict(self._derive("jwk", self._compute_jwk))
+
+    def _compute_jwk(self) -> dict:
+        jwk = {"kid": self.kid, "use": "sig", "alg": self.alg}
+        if self.alg == "RS256":
+            # Extract the modulus (n) and exponent (e) from the public key
+            pn = self.public_key.public_numbers()
+            jwk.update(
+                kty="RSA",
+                n=_to_base64(_int_to_bytes(pn.n)),
+                e=_to_base64(_int_to_bytes(pn.e)),
+            )
+        elif self.alg == "ES256":
+            # See https://datatracker.ietf.org/doc/html/rfc7518#section-6.2
+            pn = self.public_key.public_numbers()
+            jwk.update(
+                kty="EC",
+                crv="P-256",
+                x=_to_base64(pn.x.to_bytes(32, "big"), no_padding=True),
+                y=_to_base64(pn.y.to_bytes(32, "big"), no_padding=True),
+            )
+        else:
+            # See https://datatracker.ietf.org/doc/html/rfc8037#section-2
+            raw = self.public_key.public_bytes(
+                serialization.Encoding.Raw, serialization.PublicFormat.Raw
+            )
+            jwk.update(kty="OKP", crv="Ed25519", x=_to_base64(raw, no_padding=True))
+        return jwk
+
     def sign(self, data: typing.Union[bytes, str]) -> bytes:
         if isinstance(data, str):
             data = data.encode("utf-8")
-        return self.private_key.sign(data, padding.PKCS1v15(), hashes.SHA256())
+        if self.alg == "RS256":
+            return self.private_key.sign(data, padding.PKCS1v15(), hashes.SHA256())
+        if self.alg == "ES256":
+            # JWS signatures are the raw r || s, not DER
+            r, s = decode_dss_signature(
+                self.private_key.sign(data, ec.ECDSA(hashes.SHA256()))
+            )
+            return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+        return self.private_key.sign(data)
+
+    def sign_many(
+        self,
+        data: typing.Sequence[typing.Union[bytes, str]],
+        executor: concurrent.futures.Executor = None,
+        chunk_size: int = 100,
+    ) -> typing.List[bytes]:
+        """
+        :param data: the data to sign
+        :param executor: if set, signatures are computed in this thread or process pool
+        :param chunk_size: max number of signatures computed in a single job
+        """
+        if executor is None:
+            return [self.sign(item) for item in data]
+        chunks = [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+        if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+            # private keys are not picklable, the worker loads the key from the PEM
+            results = executor.map(
+                _sign_chunk, [self.private_pem] * len(chunks), chunks
+            )
+        else:
+            results = executor.map(
+                lambda chunk: [self.sign(item) for item in chunk], chunks
+            )
+        return [signature for chunk in results for signature in chunk]
 
     def verify_signature(
         self,
@@ -99,73 +432,235 @@ class Signer:
         if isinstance(data, str):
             data = data.encode("utf-8")
         try:
-            self.public_key.verify(
-                signature,
-                data,
-                padding.PKCS1v15(),
-                hashes.SHA256(),
-            )
+            if self.alg == "RS256":
+                self.public_key.verify(
+                    signature,
+                    data,
+                    padding.PKCS1v15(),
+                    hashes.SHA256(),
+                )
+            elif self.alg == "ES256":
+                if len(signature) != 64:
+                    return False
+                self.public_key.verify(
+                    encode_dss_signature(
+                        int.from_bytes(signature[:32], "big"),
+                        int.from_bytes(signature[32:], "big"),
+                    ),
+                    data,
+                    ec.ECDSA(hashes.SHA256()),
+                )
+            else:
+                self.public_key.verify(signature, data)
             return True
         except InvalidSignature:
             return False
 
 
+class KeyRing:
+    """
+    Signing keys published in the JWKS: the active key, the next key (pre-published before it becomes
+    active, so that verifiers already know it) and the retiring keys (still verifying tokens they signed).
+    """
+
+    def __init__(
+        self,
+        active: Signer = None,
+        rotation_interval: int = None,
+        prepublish_period: int = None,
+        max_retiring: int = 1,
+        signer_factory: typing.Callable[[], Signer] = Signer,
+        clock: typing.Callable[[], float] = time.time,
+    ):
+        """
+        :param active: the signing key, a new one is generated if not set
+        :param rotation_interval: if set, seconds after which the active key is rotated
+        :param prepublish_period: seconds before the rotation at which the next key is published,
+                should be longer than the JWKS cache ttl of the verifiers, defaults to 1/10 of `rotation_interval`
+        :param max_retiring: number of retired keys kept in the JWKS
+        :param signer_factory: creates the new keys
+        :param clock: returns the current time in seconds
+        """
+        if rotation_interval is not None and rotation_interval <= 0:
+            raise ValueError("rotation_interval must be a positive number")
+        self._signer_factory = signer_factory
+        self._clock = clock
+        self._rotation_interval = rotation_interval
+        self._prepublish_period = (
+            prepublish_period
+            if prepublish_period is not None
+            else (rotation_interval or 0) / 10
+        )
+        self._max_retiring = max_retiring
+        self._active = active or signer_factory()
+        self._next: typing.Optional[Signer] = None
+        self._retiring: typing.List[Signer] = []
+        self._rotates_at = (
+            clock() + rotation_interval if rotation_interval is not None else None
+        )
+        self._lock = threading.Lock()
+        self._preparing: typing.Optional[threading.Thread] = None
+        # serializes the rotations, reentrant so that `rotate` can be called while holding it
+        self._rotation_lock = threading.RLock()
+
+    def _check_schedule(self) -> None:
+        if self._rotates_at is None:
+            return
+        now = self._clock()
+        if now >= self._rotates_at:
+            with self._rotation_lock:
+                # the threads waiting for the lock find the key already rotated
+                if self._clock() >= self._rotates_at:
+                    self.rotate()
+        elif self._next is None and now >= self._rotates_at - self._prepublish_period:
+            self._prepare_in_background()
+
+    def _prepare_in_background(self) -> None:
+        # the key generation (seconds for RSA 4096) must not stall the tokens being minted
+        with self._lock:
+            if self._preparing is None:
+                self._preparing = threading.Thread(
+                    target=self._prepare_quietly, daemon=True
+                )
+                self._preparing.start()
+
+    def _prepare_quietly(self) -> None:
+        try:
+            signer = self._signer_factory()
+            if self._next is None:
+                self._next = signer
+        except Exception:
+            # the next key is created by the rotation instead
+            pass
+        finally:
+            with self._lock:
+                self._preparing = None
+
+    def _wait_prepared(self) -> None:
+        preparing = self._preparing
+        if preparing is not None and preparing is not threading.current_thread():
+            preparing.join()
+
+    @property
+    def active(self) -> Signer:
+        self._check_schedule()
+        return self._active
+
+    @property
+    def published(self) -> typing.List[Signer]:
+        """
+        The keys to publish in the JWKS, the active one first.
+        The next key is published once generated in background, after the pre-publish point.
+        """
+        self._check_schedule()
+        with self._rotation_lock:
+            next_key = [self._next] if self._next else []
+            return [self._active, *next_key, *self._retiring]
+
+    def prepare(self, signer: Signer = None) -> Signer:
+        """
+        Publishes the key that becomes active on the next rotation
+        """
+        self._next = signer or self._next or self._signer_factory()
+        return self._next
+
+    def rotate(self) -> Signer:
+        """
+        Activates the next key (a new one if not prepared) and retires the current active key
+        """
+        with self._rotation_lock:
+            self._wait_prepared()
+            signer = self._next or self._signer_factory()
+            self._retiring.insert(0, self._active)
+            del self._retiring[self._max_retiring :]
+            self._active, self._next = signer, None
+            if self._rotation_interval is not None:
+                self._rotates_at = self._clock() + self._rotation_interval
+            return signer
+
+
 class TokenCreator:
-    def __init__(self, signer: Signer = None):
+    def __init__(self, signer: Signer = None, key_ring: KeyRing = None):
+        """
+        :param signer: the signing key, ignored if `key_ring` is set
+        :param key_ring: the signing keys, to rotate keys without breaking verifiers
+        """
         super().__init__()
-        self.signer = signer or Signer()
-        self._kid = None
+        self.key_ring = key_ring or KeyRing(signer)
+        self._encoded_jwks: typing.Tuple[typing.Tuple[str, ...], bytes] = ((), b"")
+        self._encoded_headers: typing.Dict[str, str] = {}
+
+    @property
+    def signer(self) -> Signer:
+        return self.key_ring.active
+
+    @signer.setter
+    def signer(self, signer: Signer) -> None:
+        self.key_ring = KeyRing(signer)
 
     @property
     def kid(self) -> str:
-        if not self._kid:
-            # Calculate a deterministic "kid" by hashing the public key
-            public_key_bytes = self.signer.public_key.public_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PublicFormat.SubjectPublicKeyInfo,
-            )
-            self._kid = hashlib.sha256(public_key_bytes).hexdigest()
-        return self._kid
+        return self.signer.kid
 
     def jwk(self) -> dict:
         """
-        See https://datatracker.ietf.org/doc/html/rfc7517
+        The JWK of the active key, see https://datatracker.ietf.org/doc/html/rfc7517
         """
+        return self.signer.jwk()
 
-        # Serialize the public key to get the components (n and e) for the JWK
-        public_key = self.signer.private_key.public_key()
-        pn = public_key.public_numbers()
-        n = _to_base64(_int_to_bytes(pn.n))
-        e = _to_base64(_int_to_bytes(pn.e))
+    def jwks(self) -> dict:
+        """
+        The JSON Web Key Set of all published keys, as served by `/.well-known/jwks.json`
+        """
+        return {"keys": [signer.jwk() for signer in self.key_ring.published]}
+
+    @property
+    def encoded_jwks(self) -> bytes:
+        """
+        The JSON Web Key Set encoded once per set of published keys, ready to be served as response body
+        """
+        published = self.key_ring.published
+        kids = tuple(signer.kid for signer in published)
+        cached_kids, encoded_jwks = self._encoded_jwks
+        if kids != cached_kids:
+            jwks = {"keys": [signer.jwk() for signer in published]}
+            encoded_jwks = _to_compact_json(jwks).encode("utf-8")
+            self._encoded_jwks = (kids, encoded_jwks)
+        return encoded_jwks
 
-        # Extract the modulus (n) and exponent (e) from the PEM-encoded public key
-        jwk = {
-            "kty": "RSA",
-            "kid": self.kid,
-            "use": "sig",
-            "n": n,
-            "e": e,
-        }
+    @property
+    def encoded_header(self) -> str:
+        return self._encoded_header(self.signer)
 
-        return jwk
+    def _encoded_header(self, signer: Signer) -> str:
+        kid = signer.kid
+        encoded_header = self._encoded_headers.get(kid)
+        if encoded_header is None:
+            # the header is the same for every token, it is encoded once per key
+            header = dict(alg=signer.alg, typ="JWT", kid=kid)
+            encoded_header = _to_base64(_to_compact_json(header), no_padding=True)
+            # only the headers of the published keys are kept
+            kids = {signer.kid for signer in self.key_ring.published}
+            self._encoded_headers = {
+                k: v for k, v in self._encoded_headers.items() if k in kids
+            }
+            self._encoded_headers[kid] = encoded_header
+        return encoded_header
 
-    def create_token(
+    def _signing_input(
         self,
+        signer: Signer,
         issuer: str,
         subject: str,
         audience: str,
         expires_in: int,
-        scope: str = None,
-        extra_claims: dict = None,
+        scope: str,
+        extra_claims: dict,
+        issued_at: int,
     ) -> str:
-        header = dict(alg="RS256", typ="JWT", kid=self.kid)
-        enc_header = _to_base64(json.dumps(header), no_padding=True)
-        issued_at = int(time.time())
-        expires_at = issued_at + expires_in
-        issuer = f"{sanitize_issuer(issuer)}/"  # trailing slash is required!
         payload = dict(
-            iss=issuer,
-            exp=expires_at,
+            iss=_issuer_claim(issuer),
+            exp=issued_at + expires_in,
             iat=issued_at,
             sub=subject,
             aud=audience,
@@ -173,7 +668,79 @@ class TokenCreator:
         )
         if extra_claims:
             payload.update(extra_claims)
-        enc_payload = _to_base64(json.dumps(payload), no_padding=True)
-        to_sign = f"{enc_header}.{enc_payload}"
-        signature = _to_base64(self.signer.sign(to_sign), no_padding=True)
+        enc_payload = _to_base64(_to_compact_json(payload), no_padding=True)
+        return f"{self._encoded_header(signer)}.{enc_payload}"
+
+    def create_token(
+        self,
+        issuer: str,
+        subject: str,
+        audience: str,
+        expires_in: int,
+        scope: str = None,
+        extra_claims: dict = None,
+    ) -> str:
+        # the same key for header and signature, even if a rotation is due meanwhile
+        signer = self.signer
+        to_sign = self._signing_input(
+            signer,
+            issuer,
+            subject,
+            audience,
+            expires_in,
+            scope,
+            extra_claims,
+            int(time.time()),
+        )
+        signature = _to_base64(signer.sign(to_sign), no_padding=True)
         return f"{to_sign}.{signature}"
+
+    def create_tokens(
+        self,
+        issuer: str,
+        subjects: typing.Sequence[str],
+        audience: str,
+        expires_in: int,
+        scope: str = None,
+        extra_claims: dict = None,
+        executor: concurrent.futures.Executor = None,
+        chunk_size: int = 100,
+    ) -> typing.List[str]:
+        """
+        Creates one token per subject, all issued at the same time
+
+        :param executor: if set, tokens are signed in this thread or process pool
+        :param chunk_size: max number of tokens signed in a single job
+        """
+        issued_at = int(time.time())
+        signer = self.signer
+        to_sign = [
+            self._signing_input(
+                signer,
+                issuer,
+                subject,
+                audience,
+                expires_in,
+                scope,
+                extra_claims,
+                issued_at,
+            )
+            for subject in subjects
+        ]
+        signatures = signer.sign_many(to_sign, executor, chunk_size)
+        return [
+            f"{data}.{_to_base64(signature, no_padding=True)}"
+            for data, signature in zip(to_sign, signatures)
+        ]
+
+
+@functools.lru_cache(maxsize=8)
+def _load_private_key(private_pem: bytes) -> PrivateKey:
+    # keys sent to a process pool are loaded once per worker process
+    return serialization.load_pem_private_key(private_pem, password=None)
+
+
+def _sign_chunk(
+    private_pem: bytes, data: typing.Sequence[typing.Union[bytes, str]]
+) -> typing.List[bytes]:
+    return Signer(_load_private_key(private_pem)).sign_many(data)
@@ -1,7 +1,16 @@
+import asyncio
 import dataclasses
 import datetime
+import functools
+import json
+import time
 import typing
 
+import httpx
+
+from pyauth0.cache import CacheBackend, CacheEntry, fetch_shared_async
+from pyauth0.http_client import _AsyncClientHolder, _BorrowedAsyncClientHolder
+from pyauth0.metrics import Metrics
 from pyauth0.utils import sanitize_issuer
 
 
@@ -11,12 +20,22 @@ class GetTokenResponse:
     access_token: str
     token_type: str
     expires_at: datetime.datetime
+    # expiration on `clock`, not affected by wall clock changes, `expires_at` is then informative only
+    deadline: typing.Optional[float] = dataclasses.field(default=None, repr=False)
+    clock: typing.Callable[[], float] = dataclasses.field(
+        default=time.monotonic, repr=False, compare=False
+    )
 
     @property
     def authorization(self) -> str:
         return f"{self.token_type} {self.access_token}"
 
     def is_expired(self, skew_seconds: int = None):
+        if self.deadline is not None:
+            now = self.clock()
+            if skew_seconds:
+                now += skew_seconds
+            return now >= self.deadline
         if self.expires_at is not None:
             now = datetime.datetime.now()
             if skew_seconds:
@@ -25,7 +44,11 @@ class GetTokenResponse:
         return True
 
 
-class TokenProvider:
+class _TokenProviderBase:
+    """
+    Configuration and request/response handling shared by the async and sync providers
+    """
+
     def __init__(
         self,
         issuer,
@@ -33,13 +56,11 @@ class TokenProvider:
         client_id,
         client_secret,
         payload_customizer: typing.Callable[[dict], dict] = None,
+        refresh_ratio: typing.Optional[float] = None,
+        shared_cache: typing.Optional[CacheBackend] = None,
+        metrics: typing.Optional[Metrics] = None,
+        clock: typing.Optional[typing.Callable[[], float]] = None,
     ):
-        """
-        :param issuer: hostname of the tenant in Auth0, example `your-domain.auth0.com`
-        :param audience: API identifier
-        :param client_id:
-        :param client_secret:
-        """
         if not issuer:
             raise ValueError("missing issuer")
         if not audience:
@@ -53,45 +74,297 @@ class TokenProvider:
         self._client_id = client_id
         self._client_secret = client_secret
         self._payload_customizer = payload_customizer
+        if refresh_ratio is not None and not 0 < refresh_ratio < 1:
+            raise ValueError("refresh_ratio must be between 0 and 1")
+        self._refresh_ratio = refresh_ratio
+        self._shared_cache = shared_cache
+        self._metrics = metrics
+        self._clock = clock or time.monotonic
         self._get_token_response: typing.Optional[GetTokenResponse] = None
+        # consecutive failures of the background refresh, see _retry_delay
+        self._refresh_failures = 0
+
+    def _is_token_valid(self) -> bool:
+        return (
+            bool(self._get_token_response) and not self._get_token_response.is_expired()
+        )
+
+    def invalidate(self, token_response: GetTokenResponse) -> None:
+        """
+        Discards a token rejected by the API (example with a 401), so that the next `get_token` fetches a new one.
+        Does nothing if the token is already replaced, so that concurrent callers cause a single fetch.
+
+        :param token_response: the token that was rejected
+        """
+        if self._get_token_response is token_response:
+            # expired rather than dropped, so that the shared cache does not return it again (see _is_reusable)
+            self._get_token_response = dataclasses.replace(
+                token_response,
+                expires_at=datetime.datetime.now(),
+                deadline=self._clock(),
+            )
+
+    def _token_request(self) -> typing.Tuple[str, dict]:
+        url = f"{self._issuer}/oauth/token"
+        payload = {
+            "grant_type": "client_credentials",
+            "audience": self._audience,
+            "client_id": self._client_id,
+            "client_secret": self._client_secret,
+        }
+        if self._payload_customizer:
+            payload = self._payload_customizer(payload)
+        return url, payload
+
+    def _request_started(self) -> typing.Optional[float]:
+        if self._metrics is None:
+            return None
+        self._metrics.increment("token.refresh")
+        return time.perf_counter()
+
+    def _request_completed(self, started: typing.Optional[float]) -> None:
+        if started is not None:
+            self._metrics.observe(
+                "http.request", time.perf_counter() - started, target="token"
+            )
+
+    def _token_response(self, url: str, response: httpx.Response) -> GetTokenResponse:
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Invalid response POST {url} >> {response.status_code} {response.text}"
+            )
+        response_dict = response.json()
+        return self._set_token_response(response_dict, response_dict.get("expires_in"))
+
+    def _set_token_response(
+        self, response_dict: dict, expires_in: float
+    ) -> GetTokenResponse:
+        self._get_token_response = GetTokenResponse(
+            response_body=response_dict,
+            access_token=response_dict.get("access_token"),
+            token_type=response_dict.get("token_type"),
+            expires_at=datetime.datetime.now() + datetime.timedelta(seconds=expires_in),
+            deadline=self._clock() + expires_in,
+            clock=self._clock,
+        )
+        self._refresh_failures = 0
+        return self._get_token_response
+
+    def _shared_cache_key(self, url: str, payload: dict) -> str:
+        # hashed by the shared cache, the client secret is never stored
+        return json.dumps(["token", url, payload], sort_keys=True)
+
+    def _cached_token_response(self, entry: CacheEntry) -> GetTokenResponse:
+        # the shared cache holds a unix timestamp, comparable across processes
+        return self._set_token_response(entry.value, entry.expires_at - time.time())
+
+    def _is_reusable(self, entry: CacheEntry) -> bool:
+        """
+        Whether a token found in the shared cache can be used instead of fetching a new one
+        """
+        current = self._get_token_response
+        if current and entry.value.get("access_token") == current.access_token:
+            # the token being refreshed
+            return False
+        if self._refresh_ratio:
+            # not yet due for refresh
+            expires_in = entry.value.get("expires_in")
+            remaining = entry.expires_at - time.time()
+            return remaining > expires_in * (1 - self._refresh_ratio)
+        return True
+
+    def _is_refresh_due(self, margin: int) -> bool:
+        """
+        Whether the token expires within `margin` seconds
+        """
+        token_response = self._get_token_response
+        if token_response is None:
+            return False
+        # tokens living less than twice the margin are refreshed half-way instead
+        expires_in = token_response.response_body.get("expires_in") or 0
+        return token_response.is_expired(min(margin, expires_in / 2))
+
+    def _refresh_delay(self, token_response: GetTokenResponse) -> float:
+        expires_in = token_response.response_body.get("expires_in")
+        remaining = token_response.deadline - self._clock()
+        # tokens found in the shared cache are already partially elapsed
+        return max(0.0, remaining - expires_in * (1 - self._refresh_ratio))
+
+    def _retry_delay(self) -> typing.Optional[float]:
+        """
+        Delay before retrying a failed background refresh: exponential backoff from 1 to 60 seconds,
+        capped so that there is one more attempt before the token expires.
+        None if the token expires within 2 seconds, the next `get_token` fetches it then.
+        """
+        token_response = self._get_token_response
+        if token_response is None or token_response.deadline is None:
+            return None
+        remaining = token_response.deadline - self._clock()
+        if remaining < 2:
+            return None
+        self._refresh_failures += 1
+        return min(2 ** (self._refresh_failures - 1), 60, remaining / 2)
+
+    def _schedule_retry(self) -> None:
+        delay = self._retry_delay()
+        if delay is not None:
+            self._schedule_refresh(delay)
+
+
+class TokenProvider(_TokenProviderBase):
+    def __init__(
+        self,
+        issuer,
+        audience,
+        client_id,
+        client_secret,
+        payload_customizer: typing.Callable[[dict], dict] = None,
+        refresh_ratio: typing.Optional[float] = None,
+        http_client: typing.Optional[httpx.AsyncClient] = None,
+        shared_cache: typing.Optional[CacheBackend] = None,
+        metrics: typing.Optional[Metrics] = None,
+        clock: typing.Optional[typing.Callable[[], float]] = None,
+        http_client_holder: typing.Optional[_BorrowedAsyncClientHolder] = None,
+    ):
+        """
+        :param issuer: hostname of the tenant in Auth0, example `your-domain.auth0.com`
+        :param audience: API identifier
+        :param client_id:
+        :param client_secret:
+        :param refresh_ratio: if set, the token is renewed in background once this fraction of its
+                `expires_in` has elapsed (example 0.8), so that callers never wait for a token fetch
+        :param http_client: a long-lived client to reuse, see `pyauth0.http_client.create_async_client`.
+                If not set, an owned client is created on first use and closed by `aclose`.
+        :param shared_cache: if set, the token is also cached there, so that processes start warm
+                and only one process or node at a time fetches it, see `pyauth0.cache`
+        :param metrics: if set, receives the cache hits, refreshes and request latencies, see `pyauth0.metrics`
+        :param clock: monotonic clock the token expiration is tracked with, defaults to `time.monotonic`
+        :param http_client_holder: shares the http client of a `TokenProviderRegistry`, instead of `http_client`
+        """
+        super().__init__(
+            issuer,
+            audience,
+            client_id,
+            client_secret,
+            payload_customizer,
+            refresh_ratio,
+            shared_cache,
+            metrics,
+            clock,
+        )
+        self._refresh_task: typing.Optional[asyncio.Task] = None
+        self._scheduled_refresh: typing.Optional[asyncio.TimerHandle] = None
+        self._http = http_client_holder or _AsyncClientHolder(http_client)
+
+    async def __aenter__(self) -> "TokenProvider":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
 
     async def get_token(self) -> GetTokenResponse:
-        if not self._get_token_response or self._get_token_response.is_expired():
-            url = f"{self._issuer}/oauth/token"
-            payload = {
-                "grant_type": "client_credentials",
-                "audience": self._audience,
-                "client_id": self._client_id,
-                "client_secret": self._client_secret,
-            }
-            if self._payload_customizer:
-                payload = self._payload_customizer(payload)
-
-            try:
-                import httpx
-
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        url,
-                        json=payload,
-                        headers={"content-type": "application/json"},
-                    )
-            except Exception as error:
-                raise RuntimeError(f"Invalid response POST {url} >> {error}")
-            if response.status_code != 200:
-                raise RuntimeError(
-                    f"Invalid response POST {url} >> {response.status_code} {response.text}"
+        if not self._is_token_valid():
+            if self._metrics is not None:
+                self._metrics.increment("token_cache.miss")
+            # shield the refresh, so that a cancelled caller does not cancel it for the others
+            return await asyncio.shield(self._refresh())
+        if self._metrics is not None:
+            self._metrics.increment("token_cache.hit")
+        return self._get_token_response
+
+    def _refresh(self) -> asyncio.Task:
+        """
+        Starts a token fetch, unless one is already running (single-flight)
+        """
+        refresh_task = self._refresh_task
+        if (
+            refresh_task is None
+            or refresh_task.get_loop() is not asyncio.get_running_loop()
+        ):
+            refresh_task = asyncio.ensure_future(self._fetch_token())
+            # retrieve the exception, background refresh failures are handled in get_token
+            refresh_task.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+            self._refresh_task = refresh_task
+        return refresh_task
+
+    def refresh_if_due(self, margin: int) -> None:
+        """
+        Starts a background refresh if the token expires within `margin` seconds,
+        the callers keep using the current token meanwhile. See `pyauth0.auth.TokenAuth`.
+
+        :param margin: seconds before expiration, capped to half the token lifetime
+        """
+        if self._is_refresh_due(margin):
+            self._refresh()
+
+    def _schedule_refresh(self, delay: float) -> None:
+        if self._scheduled_refresh:
+            self._scheduled_refresh.cancel()
+        self._scheduled_refresh = asyncio.get_running_loop().call_later(
+            delay, self._background_refresh
+        )
+
+    def _background_refresh(self) -> None:
+        self._refresh().add_done_callback(self._retry_if_failed)
+
+    def _retry_if_failed(self, refresh_task: asyncio.Task) -> None:
+        # retried while the token is still valid, so that callers do not wait for the fetch
+        if not refresh_task.cancelled() and refresh_task.exception() is not None:
+            self._schedule_retry()
+
+    async def _fetch_token(self) -> GetTokenResponse:
+        try:
+            url, payload = self._token_request()
+            if self._shared_cache is None:
+                token_response = await self._post_token(url, payload)
+            else:
+                entry = await fetch_shared_async(
+                    self._shared_cache,
+                    self._shared_cache_key(url, payload),
+                    functools.partial(self._fetch_entry, url, payload),
+                    self._is_reusable,
                 )
-            response_dict = response.json()
-            self._get_token_response = GetTokenResponse(
-                response_body=response_dict,
-                access_token=response_dict.get("access_token"),
-                token_type=response_dict.get("token_type"),
-                expires_at=datetime.datetime.now()
-                + datetime.timedelta(seconds=response_dict.get("expires_in")),
+                token_response = self._cached_token_response(entry)
+            if self._refresh_ratio:
+                self._schedule_refresh(self._refresh_delay(token_response))
+            return token_response
+        finally:
+            if self._refresh_task is asyncio.current_task():
+                self._refresh_task = None
+
+    async def _post_token(self, url: str, payload: dict) -> GetTokenResponse:
+        started = self._request_started()
+        try:
+            response = await self._http.client.post(
+                url,
+                json=payload,
+                headers={"content-type": "application/json"},
             )
+        except Exception as error:
+            raise RuntimeError(f"Invalid response POST {url} >> {error}")
+        finally:
+            self._request_completed(started)
+        return self._token_response(url, response)
 
-        return self._get_token_response
+    async def _fetch_entry(self, url: str, payload: dict) -> CacheEntry:
+        token_response = await self._post_token(url, payload)
+        return CacheEntry(
+            token_response.response_body, token_response.expires_at.timestamp()
+        )
+
+    async def aclose(self) -> None:
+        """
+        Cancels the background refresh, if any, and closes the owned http client
+        """
+        if self._scheduled_refresh:
+            self._scheduled_refresh.cancel()
+            self._scheduled_refresh = None
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        await self._http.aclose()
 
     async def get_access_token(self) -> str:
         res = await self.get_token()
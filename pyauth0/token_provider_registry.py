@@ -0,0 +1,211 @@
+import asyncio
+import collections
+import json
+import time
+import typing
+
+import httpx
+
+from pyauth0.cache import CacheBackend
+from pyauth0.http_client import _AsyncClientHolder
+from pyauth0.metrics import Metrics
+from pyauth0.token_provider import GetTokenResponse, TokenProvider
+from pyauth0.utils import sanitize_issuer
+
+
+class TokenProviderRegistry:
+    """
+    One TokenProvider per (issuer, audience, client, payload), all sharing the same http client.
+    Concurrent requests of the same token are sent once, and idle providers are evicted.
+    """
+
+    def __init__(
+        self,
+        http_client: typing.Optional[httpx.AsyncClient] = None,
+        max_size: int = 100,
+        idle_timeout: typing.Optional[float] = None,
+        refresh_ratio: typing.Optional[float] = None,
+        shared_cache: typing.Optional[CacheBackend] = None,
+        metrics: typing.Optional[Metrics] = None,
+        clock: typing.Optional[typing.Callable[[], float]] = None,
+    ):
+        """
+        :param http_client: a long-lived client to reuse, see `pyauth0.http_client.create_async_client`.
+                If not set, an owned client is created on first use and closed by `aclose`.
+        :param max_size: max number of providers, the least recently used is evicted first
+        :param idle_timeout: if set, providers not used for this number of seconds are evicted
+        :param refresh_ratio: see `TokenProvider`
+        :param shared_cache: see `TokenProvider`
+        :param metrics: see `TokenProvider`, shared by all the providers
+        :param clock: see `TokenProvider`, also used for the idle timeout
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self._http = _AsyncClientHolder(http_client)
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._refresh_ratio = refresh_ratio
+        self._shared_cache = shared_cache
+        self._metrics = metrics
+        self._clock = clock or time.monotonic
+        # key -> (provider, last use as per the clock)
+        self._providers = collections.OrderedDict()
+        self._evicted: typing.List[TokenProvider] = []
+        # closes of the evicted providers running in background, awaited by `aclose`
+        self._closing: typing.Set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "TokenProviderRegistry":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def __len__(self) -> int:
+        return len(self._providers)
+
+    def get_provider(
+        self,
+        issuer: str,
+        audience: str,
+        client_id: str,
+        client_secret: str,
+        extra_payload: typing.Optional[dict] = None,
+    ) -> TokenProvider:
+        """
+        :param extra_payload: merged into the token request payload, example `{"scope": "read:users"}`
+        :returns The provider registered for these arguments, created if missing.
+                Evicted providers are closed by the next `get_token`, `prefetch` or `aclose`.
+        """
+        key = (
+            sanitize_issuer(issuer),
+            audience,
+            client_id,
+            client_secret,
+            json.dumps(extra_payload or {}, sort_keys=True),
+        )
+        now = self._clock()
+        self._evict_idle(now)
+        entry = self._providers.get(key)
+        if entry is None:
+            token_provider = TokenProvider(
+                issuer,
+                audience,
+                client_id,
+                client_secret,
+                payload_customizer=_payload_customizer(extra_payload),
+                refresh_ratio=self._refresh_ratio,
+                shared_cache=self._shared_cache,
+                metrics=self._metrics,
+                clock=self._clock,
+                # all the providers share the connection pool of the registry
+                http_client_holder=self._http.borrow(),
+            )
+        else:
+            token_provider = entry[0]
+        self._providers[key] = (token_provider, now)
+        self._providers.move_to_end(key)
+        while len(self._providers) > self._max_size:
+            _, (evicted, _) = self._providers.popitem(last=False)
+            self._evicted.append(evicted)
+        return token_provider
+
+    def _evict_idle(self, now: float) -> None:
+        if self._idle_timeout is None:
+            return
+        while self._providers:
+            key, (token_provider, last_used) = next(iter(self._providers.items()))
+            if now - last_used < self._idle_timeout:
+                break
+            del self._providers[key]
+            self._evicted.append(token_provider)
+
+    def _close_evicted_in_background(self) -> None:
+        """
+        Closes the evicted providers off the request path, they may wait for a token request in flight
+        """
+        if not self._evicted:
+            return
+        closing = asyncio.ensure_future(self._close_evicted())
+        self._closing.add(closing)
+        closing.add_done_callback(self._closed)
+
+    def _closed(self, closing: asyncio.Task) -> None:
+        self._closing.discard(closing)
+        # retrieve the exception, nobody awaits the background close
+        closing.cancelled() or closing.exception()
+
+    async def _close_evicted(self) -> None:
+        evicted, self._evicted = self._evicted, []
+        for token_provider in evicted:
+            refresh_task = token_provider._refresh_task
+            if refresh_task is not None:
+                # let the callers still waiting for the token get it
+                await asyncio.wait({refresh_task})
+            # cancels the background refresh, the http client is not closed
+            await token_provider.aclose()
+
+    async def get_token(
+        self,
+        issuer: str,
+        audience: str,
+        client_id: str,
+        client_secret: str,
+        extra_payload: typing.Optional[dict] = None,
+    ) -> GetTokenResponse:
+        token_provider = self.get_provider(
+            issuer, audience, client_id, client_secret, extra_payload
+        )
+        self._close_evicted_in_background()
+        return await token_provider.get_token()
+
+    async def get_authorization(
+        self,
+        issuer: str,
+        audience: str,
+        client_id: str,
+        client_secret: str,
+        extra_payload: typing.Optional[dict] = None,
+    ) -> str:
+        res = await self.get_token(
+            issuer, audience, client_id, client_secret, extra_payload
+        )
+        return res.authorization
+
+    async def prefetch(self) -> None:
+        """
+        Fetches the tokens of all the registered providers concurrently, example at startup
+
+        :raises The first error, once all the fetches are completed
+        """
+        self._close_evicted_in_background()
+        results = await asyncio.gather(
+            *(
+                token_provider.get_token()
+                for token_provider, _ in self._providers.values()
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def aclose(self) -> None:
+        """
+        Closes all the providers and the owned http client
+        """
+        if self._closing:
+            await asyncio.wait(self._closing)
+        await self._close_evicted()
+        providers, self._providers = self._providers, collections.OrderedDict()
+        for token_provider, _ in providers.values():
+            await token_provider.aclose()
+        await self._http.aclose()
+
+
+def _payload_customizer(
+    extra_payload: typing.Optional[dict],
+) -> typing.Optional[typing.Callable[[dict], dict]]:
+    if not extra_payload:
+        return None
+    extra_payload = dict(extra_payload)
+    return lambda payload: {**payload, **extra_payload}
@@ -1,14 +1,35 @@
 import abc
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
 import dataclasses
-import datetime
-from typing import Optional
+import functools
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
 
 import httpx
 from jose import jwt
 
+from pyauth0.backends import (
+    VerifierBackend,
+    _invalid_claims_error,
+    _token_expired_error,
+    default_backend,
+    key_algorithm,
+)
 from pyauth0.errors import Auth0Error
+from pyauth0.cache import CacheBackend, CacheEntry, fetch_shared_async
+from pyauth0.http_client import _AsyncClientHolder, _BorrowedAsyncClientHolder
+from pyauth0.metrics import Metrics
+from pyauth0.parsed_token import ParsedToken, parse_token
 from pyauth0.utils import sanitize_issuer
 
+SUPPORTED_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
 
 @dataclasses.dataclass
 class DecodedToken:
@@ -28,9 +49,11 @@ class DecodedToken:
         :returns The dict representation of the claims set, assuming the signature is valid
                 and all requested data validation passes.
         """
-        header = jwt.get_unverified_header(token)
-        payload = jwt.get_unverified_claims(token)
-        return DecodedToken(payload=payload, header=header)
+        try:
+            parsed = parse_token(token)
+        except ValueError as error:
+            raise jwt.JWTError(str(error)) from error
+        return DecodedToken(payload=parsed.claims, header=parsed.header)
 
 
 class JwksProvider(abc.ABC):
@@ -43,50 +66,353 @@ class JwksProvider(abc.ABC):
     async def get(self):
         pass
 
+    async def refresh(self):
+        """
+        Fetches the JWKS bypassing any cache, called when a token is signed by an unknown key
+        """
+        return await self.get()
+
+    async def aclose(self) -> None:
+        """
+        Releases the resources held by the provider, if any
+        """
+        pass
+
 
 class _JwksProviderBase(JwksProvider):
-    def __init__(self, issuer: str) -> None:
+    def __init__(
+        self,
+        issuer: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        metrics: Optional[Metrics] = None,
+        http_client_holder: Optional[_BorrowedAsyncClientHolder] = None,
+    ) -> None:
         self._issuer = sanitize_issuer(issuer)
+        # a borrowed holder shares the http client of its lender, see MultiTenantTokenVerifier
+        self._http = http_client_holder or _AsyncClientHolder(http_client)
+        self._metrics = metrics
 
     async def get(self):
         url = self._issuer + "/.well-known/jwks.json"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            return response.json()
+        if self._metrics is None:
+            response = await self._http.client.get(url)
+        else:
+            started = time.perf_counter()
+            try:
+                response = await self._http.client.get(url)
+            finally:
+                self._metrics.observe(
+                    "http.request", time.perf_counter() - started, target="jwks"
+                )
+        return _jwks_from_response(response)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+def _jwks_from_response(response: httpx.Response) -> dict:
+    """
+    Rejects error answers (example a 429 or 503 with a JSON body), so that they never replace the last good JWKS
+    """
+    response.raise_for_status()
+    jwks = response.json()
+    if not isinstance(jwks, dict) or not isinstance(jwks.get("keys"), list):
+        raise ValueError(f"Invalid JWKS GET {response.request.url}, missing keys")
+    return jwks
 
 
 class _JwksProviderCacheDecorator(JwksProvider):
-    def __init__(self, delegate: JwksProvider, ttl: int) -> None:
+    def __init__(
+        self,
+        delegate: JwksProvider,
+        ttl: int,
+        grace_period: int = 0,
+        stale_while_revalidate: bool = False,
+        shared_cache: Optional[CacheBackend] = None,
+        shared_cache_key: str = "jwks",
+        metrics: Optional[Metrics] = None,
+        clock: Optional[Callable[[], float]] = None,
+    ) -> None:
         """
         :param delegate: a JwksProvider instance
         :param ttl: cache time-to-live in seconds
+        :param grace_period: seconds after the ttl during which the last good JWKS is served if the refresh fails,
+                the refresh is retried after 1, 2, 4... seconds (at most 60) instead of by every call
+        :param stale_while_revalidate: if True, during the grace period the last good JWKS is served
+                while the refresh runs in background, instead of waiting for it
+        :param shared_cache: if set, the JWKS is also cached there and shared with the other processes or nodes
+        :param shared_cache_key: key of the JWKS in the shared cache
+        :param metrics: if set, receives the cache hits, misses and refreshes, see `pyauth0.metrics`
+        :param clock: monotonic clock the ttl is tracked with, defaults to `time.monotonic`
         """
         self._delegate = delegate
         self._ttl = ttl
+        self._grace_period = grace_period
+        self._stale_while_revalidate = stale_while_revalidate
+        self._shared_cache = shared_cache
+        self._shared_cache_key = shared_cache_key
+        self._metrics = metrics
+        self._clock = clock or time.monotonic
         self._jwks = None
-        self._expires_at = None
+        # as per the clock
+        self._expires_at: Optional[float] = None
+        # after a failed refresh, the stale JWKS is served without refreshing until then
+        self._retry_at: Optional[float] = None
+        self._refresh_failures = 0
+        self._refresh_task: Optional[asyncio.Task] = None
 
     async def get(self):
-        if not self._expires_at or self._expires_at <= datetime.datetime.now():
-            self._jwks = await self._delegate.get()
-            self._expires_at = datetime.datetime.now() + datetime.timedelta(
-                seconds=self._ttl
+        now = self._clock()
+        if self._expires_at is not None and now < self._expires_at:
+            if self._metrics is not None:
+                self._metrics.increment("jwks_cache.hit")
+            return self._jwks
+        if self._metrics is not None:
+            self._metrics.increment("jwks_cache.miss")
+        stale = (
+            self._expires_at is not None and now < self._expires_at + self._grace_period
+        )
+        if stale and self._retry_at is not None and now < self._retry_at:
+            return self._jwks
+        refresh_task = self._refresh()
+        if stale and self._stale_while_revalidate:
+            return self._jwks
+        try:
+            # shield the refresh, so that a cancelled caller does not cancel it for the others
+            return await asyncio.shield(refresh_task)
+        except Exception:
+            if stale:
+                return self._jwks
+            raise
+
+    async def refresh(self):
+        return await asyncio.shield(self._refresh(force=True))
+
+    def _refresh(self, force: bool = False) -> asyncio.Task:
+        """
+        Starts a refresh, unless one is already running (single-flight)
+        """
+        refresh_task = self._refresh_task
+        if (
+            refresh_task is None
+            or refresh_task.get_loop() is not asyncio.get_running_loop()
+        ):
+            refresh_task = asyncio.ensure_future(self._fetch(force))
+            # retrieve the exception, background refresh failures are handled in get
+            refresh_task.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
             )
-        return self._jwks
+            self._refresh_task = refresh_task
+        return refresh_task
+
+    async def _fetch(self, force: bool = False):
+        try:
+            if self._shared_cache is None:
+                entry = await self._fetch_entry()
+            else:
+                entry = await fetch_shared_async(
+                    self._shared_cache,
+                    self._shared_cache_key,
+                    self._fetch_entry,
+                    # a forced refresh reuses only a JWKS refreshed meanwhile by another process
+                    reusable=lambda entry: not force or entry.value != self._jwks,
+                )
+            self._jwks = entry.value
+            # the shared cache holds a unix timestamp, comparable across processes
+            self._expires_at = self._clock() + entry.expires_at - time.time()
+            self._refresh_failures, self._retry_at = 0, None
+            return entry.value
+        except Exception:
+            self._schedule_retry()
+            raise
+        finally:
+            if self._refresh_task is asyncio.current_task():
+                self._refresh_task = None
 
+    def _schedule_retry(self) -> None:
+        self._refresh_failures += 1
+        self._retry_at = self._clock() + min(2 ** (self._refresh_failures - 1), 60)
+
+    async def _fetch_entry(self) -> CacheEntry:
+        if self._metrics is not None:
+            self._metrics.increment("jwks.refresh")
+        return CacheEntry(await self._delegate.get(), time.time() + self._ttl)
+
+    async def aclose(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        await self._delegate.aclose()
+
+
+class _JwksKeyIndex:
+    """
+    Public keys of a JWKS document indexed by "kid", ready to be used for signature verification
+    """
+
+    def __init__(
+        self, jwks: dict, algorithms: List[str], backend: VerifierBackend
+    ) -> None:
+        """
+        :param jwks: the JWKS document as returned by the JwksProvider
+        :param algorithms: the allowed algorithms, keys published for other algorithms are ignored
+        :param backend: the backend the keys are loaded by
+        """
+        self.jwks = jwks
+        self.keys = {}
+        self.raw_keys = {}
+        for key in jwks.get("keys", []):
+            kid = key.get("kid")
+            algorithm = key_algorithm(key)
+            if not kid or algorithm not in algorithms:
+                continue
+            try:
+                self.keys[kid] = backend.load_key(key, algorithm)
+                self.raw_keys[kid] = key
+            except Exception:
+                # ignore keys we are not able to use, same as if they were not there
+                continue
+
+    def get(self, kid: str):
+        return self.keys.get(kid)
+
+
+class _UnknownKidCache:
+    """
+    Bounded set of the "kid"s still missing after a JWKS refresh, forgotten after `ttl` seconds.
+    Tokens signed by these keys are rejected without fetching the JWKS again.
+    """
+
+    def __init__(
+        self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "collections.OrderedDict[str, float]" = collections.OrderedDict()
+        # shared by the threads of a SyncTokenVerifier
+        self._lock = threading.Lock()
+
+    def __contains__(self, kid: str) -> bool:
+        with self._lock:
+            expires_at = self._entries.get(kid)
+            if expires_at is None:
+                return False
+            if expires_at <= self._clock():
+                del self._entries[kid]
+                return False
+            return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, kid: str) -> None:
+        with self._lock:
+            self._entries[kid] = self._clock() + self.ttl
+            self._entries.move_to_end(kid)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified tokens, keyed by the hash of the token string.
+    Entries are evicted no later than the token "exp" claim, or when the key that signed the token is gone.
+    """
+
+    def __init__(
+        self, maxsize: int, clock: Optional[Callable[[], float]] = None
+    ) -> None:
+        """
+        :param maxsize: max number of tokens kept in cache
+        :param clock: monotonic clock the expiration is tracked with, defaults to `time.monotonic`
+        """
+        if not maxsize or maxsize < 1:
+            raise ValueError("maxsize must be a positive number")
+        self.maxsize = maxsize
+        self._clock = clock or time.monotonic
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        # shared by the threads of a SyncTokenVerifier, the LRU bookkeeping is not atomic
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[DecodedToken]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                decoded_token, expires_at, _ = entry
+                if self._clock() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return decoded_token
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, decoded_token: DecodedToken) -> None:
+        expires_at = decoded_token.payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            # tokens without expiration are never cached
+            return
+        key = self._key(token)
+        # "exp" is a unix timestamp, converted once so that lookups only read the clock
+        entry = (
+            decoded_token,
+            self._clock() + expires_at - time.time(),
+            decoded_token.header.get("kid"),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def retain_kids(self, kids: Iterable[str]) -> None:
+        """
+        Evicts the tokens signed by keys that are not in `kids`
+        """
+        kids = set(kids)
+        with self._lock:
+            for key, (_, _, kid) in list(self._entries.items()):
+                if kid not in kids:
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _TokenVerifierBase:
+    """
+    State and logic shared by the async and sync verifiers: key index, token cache and batch planning
+    """
 
-class TokenVerifier:
     def __init__(
         self,
         issuer: str,
         audience: str,
-        jwks_provider: Optional[JwksProvider] = None,
-        jwks_cache_ttl: Optional[int] = None,
+        token_cache_size: Optional[int] = None,
+        executor: Optional[concurrent.futures.Executor] = None,
+        backend: Optional[VerifierBackend] = None,
+        algorithms: Optional[List[str]] = None,
+        jwks_min_refresh_interval: Optional[float] = None,
+        unknown_kid_cache_size: int = 1024,
+        unknown_kid_cache_ttl: float = 300,
+        precheck: bool = False,
+        precheck_leeway: int = 0,
+        max_token_length: int = 16384,
+        metrics: Optional[Metrics] = None,
+        clock: Optional[Callable[[], float]] = None,
     ):
-        """
-        :param issuer: hostname of the tenant in Auth0, example `your-domain.auth0.com`
-        :param audience: API identifier
-        """
         if not issuer:
             raise ValueError("missing issuer")
         self._issuer = sanitize_issuer(issuer)
@@ -94,16 +420,382 @@ class TokenVerifier:
             raise ValueError("missing audience")
         self._audience = audience
         # this is not safe to change without double-checking configuration in Auth0 dashboard + current codebase
-        self._algorithms = ["RS256"]
+        self._algorithms = list(algorithms or ["RS256"])
+        unsupported = set(self._algorithms) - set(SUPPORTED_ALGORITHMS)
+        if unsupported:
+            raise ValueError(f"unsupported algorithms {sorted(unsupported)}")
+        self._executor = executor
+        self._backend = backend or default_backend()
+        self._clock = clock or time.monotonic
+        self._key_index: Optional[_JwksKeyIndex] = None
+        self._token_cache: Optional[VerifiedTokenCache] = None
+        if token_cache_size:
+            self._token_cache = VerifiedTokenCache(token_cache_size, self._clock)
+        self._jwks_min_refresh_interval = jwks_min_refresh_interval
+        self._forced_refresh_at: Optional[float] = None
+        self._unknown_kids: Optional[_UnknownKidCache] = None
+        if jwks_min_refresh_interval:
+            self._unknown_kids = _UnknownKidCache(
+                unknown_kid_cache_size, unknown_kid_cache_ttl, self._clock
+            )
+        self._precheck = precheck
+        self._precheck_leeway = precheck_leeway
+        self._max_token_length = max_token_length
+        self._metrics = metrics
+
+    @property
+    def token_cache(self) -> Optional[VerifiedTokenCache]:
+        return self._token_cache
+
+    def _index_jwks(self, jwks: dict) -> _JwksKeyIndex:
+        key_index = self._key_index
+        # the index is rebuilt only when the provider returns a new JWKS document (i.e. after a refresh)
+        if key_index is None or key_index.jwks is not jwks:
+            key_index = _JwksKeyIndex(jwks, self._algorithms, self._backend)
+            self._key_index = key_index
+            if self._token_cache is not None:
+                self._token_cache.retain_kids(key_index.keys)
+        return key_index
+
+    def _parse(self, token: str) -> ParsedToken:
+        if not self._precheck:
+            return _parse(token)
+        _check_length(token, self._max_token_length)
+        return self._prechecked(_parse(token))
+
+    def _prechecked(self, parsed: ParsedToken) -> ParsedToken:
+        if self._precheck:
+            _precheck(
+                parsed,
+                self._algorithms,
+                self._audience,
+                self._issuer + "/",
+                self._precheck_leeway,
+            )
+        return parsed
+
+    def _missing_kids(self, key_index: _JwksKeyIndex, kids: Iterable[str]) -> set:
+        """
+        The kids worth a forced JWKS refresh: not in the index, nor known to be bogus
+        """
+        if self._unknown_kids is None:
+            return set()
+        return {
+            kid
+            for kid in kids
+            if isinstance(kid, str)
+            and kid not in key_index.keys
+            and kid not in self._unknown_kids
+        }
+
+    def _may_force_refresh(self) -> bool:
+        # at most one forced refresh per interval, so that bogus kids cannot flood the JWKS endpoint
+        now = self._clock()
+        if (
+            self._forced_refresh_at is not None
+            and now - self._forced_refresh_at < self._jwks_min_refresh_interval
+        ):
+            return False
+        self._forced_refresh_at = now
+        return True
+
+    def _remember_unknown_kids(self, key_index: _JwksKeyIndex, kids: set) -> None:
+        for kid in kids:
+            if kid not in key_index.keys:
+                self._unknown_kids.add(kid)
+
+    def _get_cached(self, token: str) -> Optional[DecodedToken]:
+        if self._token_cache is None:
+            return None
+        decoded_token = self._token_cache.get(token)
+        if self._metrics is not None:
+            self._metrics.increment(
+                "verified_token_cache.miss"
+                if decoded_token is None
+                else "verified_token_cache.hit"
+            )
+        return decoded_token
+
+    def _get_key(self, key_index: _JwksKeyIndex, header: dict, executor=None):
+        kid = header.get("kid")
+        rsa_key = key_index.get(kid)
+        if not rsa_key:
+            raise _key_not_found_error()
+        if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+            # constructed keys are not picklable, the worker builds the key from the JWK
+            return key_index.raw_keys[kid]
+        return rsa_key
+
+    def _decode_args(self) -> tuple:
+        return self._backend, self._algorithms, self._audience, self._issuer + "/"
+
+    def _decode(self, token: ParsedToken, key) -> dict:
+        """
+        Verifies the token in the calling thread
+        """
+        if self._metrics is None:
+            return _decode_payload(token, key, *self._decode_args())
+        if not self._backend.splits_verification:
+            return self._timed(
+                "verify.decode", _decode_payload, token, key, *self._decode_args()
+            )
+        self._timed(
+            "verify.signature",
+            self._backend.verify_signature,
+            token,
+            key,
+            self._algorithms,
+        )
+        self._timed(
+            "verify.claims",
+            self._backend.validate_claims,
+            token.claims,
+            self._audience,
+            self._issuer + "/",
+        )
+        return token.claims
+
+    def _timed(self, name: str, function, *args):
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self._metrics.observe(name, time.perf_counter() - started)
+
+    def _stage_started(self) -> Optional[float]:
+        return None if self._metrics is None else time.perf_counter()
+
+    def _stage_completed(self, name: str, started: Optional[float]) -> None:
+        if started is not None:
+            self._metrics.observe(name, time.perf_counter() - started)
+
+    @contextlib.contextmanager
+    def _measure_verify_many(self, tokens: Sequence[str]):
+        """
+        Measures a whole `verify_many` call, the errors are counted by `_collect_batch`
+        """
+        self._metrics.increment("verify_many.tokens", len(tokens))
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._metrics.observe("verify_many", time.perf_counter() - started)
+
+    @contextlib.contextmanager
+    def _measure_verify(self):
+        """
+        Measures a whole `verify` call and counts its error, if any
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Auth0Error as error:
+            self._metrics.increment("verify.error", code=error.code)
+            raise
+        finally:
+            self._metrics.observe("verify", time.perf_counter() - started)
+
+    def _decoded(self, token: ParsedToken, payload: dict) -> DecodedToken:
+        decoded_token = DecodedToken(payload=payload, header=token.header)
+        if self._token_cache is not None:
+            self._token_cache.put(token.token, decoded_token)
+        return decoded_token
+
+    def _parse_batch(self, tokens: Sequence[str]) -> tuple:
+        results: List[Union[DecodedToken, Auth0Error, None]] = [None] * len(tokens)
+        parsed = []
+        for i, token in enumerate(tokens):
+            try:
+                parsed.append((i, self._parse(token)))
+            except Auth0Error as error:
+                results[i] = error
+        return results, parsed
+
+    def _plan_batch(
+        self,
+        parsed: list,
+        key_index: _JwksKeyIndex,
+        results: list,
+        executor: Optional[concurrent.futures.Executor],
+        chunk_size: int,
+    ) -> list:
+        groups: Dict[str, list] = {}
+        for i, token in parsed:
+            decoded_token = self._get_cached(token.token)
+            if decoded_token is not None:
+                results[i] = decoded_token
+                continue
+            groups.setdefault(token.header.get("kid"), []).append((i, token))
+
+        # tokens are grouped by "kid", so that each key is looked up once per batch
+        jobs = []
+        for group in groups.values():
+            try:
+                rsa_key = self._get_key(key_index, group[0][1].header, executor)
+            except Auth0Error as error:
+                for i, _ in group:
+                    results[i] = error
+                continue
+            for offset in range(0, len(group), chunk_size):
+                jobs.append((group[offset : offset + chunk_size], rsa_key))
+        return jobs
+
+    def _collect_batch(self, jobs: list, outcomes: list, results: list) -> list:
+        for (chunk, _), outcome in zip(jobs, outcomes):
+            for (i, token), payload in zip(chunk, outcome):
+                if isinstance(payload, Auth0Error):
+                    results[i] = payload
+                else:
+                    results[i] = self._decoded(token, payload)
+        if self._metrics is not None:
+            for result in results:
+                if isinstance(result, Auth0Error):
+                    self._metrics.increment("verify.error", code=result.code)
+        return results
+
+
+class TokenVerifier(_TokenVerifierBase):
+    def __init__(
+        self,
+        issuer: str,
+        audience: str,
+        jwks_provider: Optional[JwksProvider] = None,
+        jwks_cache_ttl: Optional[int] = None,
+        token_cache_size: Optional[int] = None,
+        jwks_cache_grace_period: int = 0,
+        jwks_stale_while_revalidate: bool = False,
+        http_client: Optional[httpx.AsyncClient] = None,
+        executor: Optional[concurrent.futures.Executor] = None,
+        backend: Optional[VerifierBackend] = None,
+        algorithms: Optional[List[str]] = None,
+        jwks_min_refresh_interval: Optional[float] = None,
+        unknown_kid_cache_size: int = 1024,
+        unknown_kid_cache_ttl: float = 300,
+        precheck: bool = False,
+        precheck_leeway: int = 0,
+        max_token_length: int = 16384,
+        shared_cache: Optional[CacheBackend] = None,
+        metrics: Optional[Metrics] = None,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        """
+        :param issuer: hostname of the tenant in Auth0, example `your-domain.auth0.com`
+        :param audience: API identifier
+        :param jwks_cache_ttl: if set, the JWKS is cached for this number of seconds
+        :param jwks_cache_grace_period: seconds after the `jwks_cache_ttl` during which the last good JWKS
+                is served if the refresh fails
+        :param jwks_stale_while_revalidate: serve the last good JWKS while refreshing it in background
+        :param token_cache_size: if set, verified tokens are cached (up to this number) until they expire
+        :param http_client: a long-lived client to reuse, see `pyauth0.http_client.create_async_client`.
+                If not set, an owned client is created on first use and closed by `aclose`.
+        :param executor: if set, the signature check (CPU-bound) runs in this thread or process pool
+                instead of blocking the event loop. The executor is not shut down by `aclose`.
+        :param backend: verifies signature and claims, see `pyauth0.backends`.
+                Defaults to `cryptography` if installed, otherwise python-jose.
+        :param algorithms: allowed signing algorithms, any of RS256 (default), ES256 and EdDSA.
+                EdDSA requires the `cryptography` backend.
+        :param jwks_min_refresh_interval: if set, a token signed by an unknown key forces a JWKS refresh
+                (e.g. after a key rotation), at most once per this number of seconds.
+        :param unknown_kid_cache_size: max number of keys remembered as unknown after a forced refresh,
+                tokens signed by these keys are rejected without forcing another refresh
+        :param unknown_kid_cache_ttl: seconds the unknown keys are remembered
+        :param precheck: if True, tokens with a wrong "alg", "iss" or "aud", or expired since more than
+                `precheck_leeway` seconds, are rejected before the JWKS lookup and the signature check
+        :param precheck_leeway: seconds after "exp" during which the expiration is left to the full check
+        :param max_token_length: with `precheck`, longer tokens are rejected before being parsed
+        :param shared_cache: with `jwks_cache_ttl`, the JWKS is also cached there, so that processes start warm
+                and only one process or node at a time fetches it, see `pyauth0.cache`
+        :param metrics: if set, receives the latencies, cache hits and errors, see `pyauth0.metrics`
+        :param clock: monotonic clock the JWKS and token caches expire with, defaults to `time.monotonic`
+        """
+        super().__init__(
+            issuer,
+            audience,
+            token_cache_size,
+            executor,
+            backend,
+            algorithms,
+            jwks_min_refresh_interval,
+            unknown_kid_cache_size,
+            unknown_kid_cache_ttl,
+            precheck,
+            precheck_leeway,
+            max_token_length,
+            metrics,
+            clock,
+        )
+        self._forced_refresh: Optional[asyncio.Task] = None
+        # only the JWKS provider created here is closed by `aclose`
+        self._owns_jwks_provider = not jwks_provider
         if jwks_provider:
             self._jwks_provider = jwks_provider
         else:
-            self._jwks_provider = _JwksProviderBase(issuer)
+            self._jwks_provider = _JwksProviderBase(issuer, http_client, metrics)
             if jwks_cache_ttl:
                 self._jwks_provider = _JwksProviderCacheDecorator(
-                    self._jwks_provider, jwks_cache_ttl
+                    self._jwks_provider,
+                    jwks_cache_ttl,
+                    grace_period=jwks_cache_grace_period,
+                    stale_while_revalidate=jwks_stale_while_revalidate,
+                    shared_cache=shared_cache,
+                    shared_cache_key=f"jwks:{self._issuer}",
+                    metrics=metrics,
+                    clock=clock,
                 )
 
+    async def __aenter__(self) -> "TokenVerifier":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Closes the JWKS provider and its owned http client, unless the provider was injected
+        """
+        if self._forced_refresh:
+            self._forced_refresh.cancel()
+            self._forced_refresh = None
+        if self._owns_jwks_provider:
+            await self._jwks_provider.aclose()
+
+    async def _get_key_index(self) -> _JwksKeyIndex:
+        return self._index_jwks(await self._jwks_provider.get())
+
+    async def _refresh_key_index(
+        self, key_index: _JwksKeyIndex, kids: Iterable[str]
+    ) -> _JwksKeyIndex:
+        """
+        Forces a JWKS refresh if some of the kids are unknown, see `jwks_min_refresh_interval`
+        """
+        missing = self._missing_kids(key_index, kids)
+        if not missing:
+            return key_index
+        refresh_task = self._forced_refresh
+        # concurrent callers join the refresh in flight, instead of being rate-limited
+        if (
+            refresh_task is None
+            or refresh_task.get_loop() is not asyncio.get_running_loop()
+        ):
+            if not self._may_force_refresh():
+                return key_index
+            refresh_task = asyncio.ensure_future(self._force_refresh())
+            self._forced_refresh = refresh_task
+        if await asyncio.shield(refresh_task):
+            self._remember_unknown_kids(self._key_index, missing)
+        return self._key_index
+
+    async def _force_refresh(self) -> bool:
+        try:
+            self._index_jwks(await self._jwks_provider.refresh())
+            return True
+        except Exception:
+            # the token is rejected as signed by an unknown key, same as without refresh
+            return False
+        finally:
+            if self._forced_refresh is asyncio.current_task():
+                self._forced_refresh = None
+
     async def verify(self, token: str) -> DecodedToken:
         """
         Decodes and verifies the token payload
@@ -112,69 +804,225 @@ class TokenVerifier:
         :returns The dict representation of the claims set, assuming the signature is valid
                 and all requested data validation passes.
         """
-        if not token:
-            raise Auth0Error(
-                status_code=401, code="invalid_token", description="Token is missing."
-            )
+        if self._metrics is None:
+            return await self._verify(self._parse(token))
+        with self._measure_verify():
+            return await self._verify(self._timed("verify.parse", self._parse, token))
 
-        try:
-            header = jwt.get_unverified_headers(token)
-        except Exception as error:
-            raise Auth0Error(
-                status_code=401,
-                code="invalid_token",
-                description="Malformed token.",
-            ) from error
-
-        if header["alg"] == "HS256":
-            raise Auth0Error(
-                status_code=401,
-                code="invalid_token",
-                description="Invalid token. Use an RS256 signed JWT Access Token.",
+    async def _verify(self, parsed: ParsedToken) -> DecodedToken:
+        if self._metrics is not None:
+            started = time.perf_counter()
+
+        key_index = await self._get_key_index()
+
+        decoded_token = self._get_cached(parsed.token)
+        if decoded_token is not None:
+            return decoded_token
+
+        key_index = await self._refresh_key_index(key_index, [parsed.header.get("kid")])
+        rsa_key = self._get_key(key_index, parsed.header, self._executor)
+
+        if self._metrics is not None:
+            self._metrics.observe("verify.key_lookup", time.perf_counter() - started)
+
+        if self._executor is None:
+            payload = self._decode(parsed, rsa_key)
+        else:
+            if self._metrics is not None:
+                started = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            (payload,) = await loop.run_in_executor(
+                self._executor,
+                _decode_payloads,
+                [parsed],
+                rsa_key,
+                *self._decode_args(),
             )
+            if self._metrics is not None:
+                self._metrics.observe("verify.decode", time.perf_counter() - started)
+            if isinstance(payload, Auth0Error):
+                raise payload
 
-        rsa_key = {}
-        jwks = await self._jwks_provider.get()
-        for key in jwks["keys"]:
-            if key["kid"] == header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"],
-                }
+        return self._decoded(parsed, payload)
 
-        if not rsa_key:
-            raise Auth0Error(
-                status_code=401,
-                code="invalid_token",
-                description="Unable to find appropriate key.",
+    async def verify_many(
+        self,
+        tokens: Sequence[str],
+        executor: Optional[concurrent.futures.Executor] = None,
+        chunk_size: int = 100,
+    ) -> List[Union[DecodedToken, Auth0Error]]:
+        """
+        Decodes and verifies a batch of tokens, fetching the JWKS once per batch.
+        A failing token does not fail the batch.
+
+        :param tokens: the tokens as string
+        :param executor: if set, the signature checks are spread across this thread or process pool,
+                defaults to the executor of the verifier
+        :param chunk_size: max number of tokens sent to the executor in a single job
+        :returns For each token, in input order, either the DecodedToken or the Auth0Error
+        """
+        if self._metrics is None:
+            return await self._verify_many(tokens, executor, chunk_size)
+        with self._measure_verify_many(tokens):
+            return await self._verify_many(tokens, executor, chunk_size)
+
+    async def _verify_many(
+        self,
+        tokens: Sequence[str],
+        executor: Optional[concurrent.futures.Executor],
+        chunk_size: int,
+    ) -> List[Union[DecodedToken, Auth0Error]]:
+        executor = executor or self._executor
+        started = self._stage_started()
+        results, parsed = self._parse_batch(tokens)
+        self._stage_completed("verify_many.parse", started)
+        if not parsed:
+            return self._collect_batch([], [], results)
+        started = self._stage_started()
+        key_index = await self._get_key_index()
+        key_index = await self._refresh_key_index(
+            key_index, {token.header.get("kid") for _, token in parsed}
+        )
+        jobs = self._plan_batch(parsed, key_index, results, executor, chunk_size)
+        self._stage_completed("verify_many.key_lookup", started)
+
+        started = self._stage_started()
+        if executor is None:
+            outcomes = [
+                _decode_payloads(
+                    [token for _, token in chunk], rsa_key, *self._decode_args()
+                )
+                for chunk, rsa_key in jobs
+            ]
+        else:
+            loop = asyncio.get_running_loop()
+            outcomes = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor,
+                        _decode_payloads,
+                        [token for _, token in chunk],
+                        rsa_key,
+                        *self._decode_args(),
+                    )
+                    for chunk, rsa_key in jobs
+                )
             )
+        self._stage_completed("verify_many.decode", started)
+        return self._collect_batch(jobs, outcomes, results)
+
 
+def _parse(token: str) -> ParsedToken:
+    if not token:
+        raise Auth0Error(
+            status_code=401, code="invalid_token", description="Token is missing."
+        )
+
+    try:
+        parsed = parse_token(token)
+    except Exception as error:
+        raise Auth0Error(
+            status_code=401,
+            code="invalid_token",
+            description="Malformed token.",
+        ) from error
+
+    if parsed.header.get("alg") == "HS256":
+        raise Auth0Error(
+            status_code=401,
+            code="invalid_token",
+            description="Invalid token. Use an RS256 signed JWT Access Token.",
+        )
+    return parsed
+
+
+def _check_length(token: str, max_token_length: int) -> None:
+    """
+    Rejects oversized tokens before they are base64 and JSON decoded
+    """
+    if token and len(token) > max_token_length:
+        raise Auth0Error(
+            status_code=401,
+            code="invalid_token",
+            description="Token is too large.",
+        )
+
+
+def _precheck(
+    token: ParsedToken,
+    algorithms: List[str],
+    audience: str,
+    issuer: str,
+    leeway: int,
+) -> None:
+    """
+    Rejects the tokens that would fail verification anyway, without looking up the key nor checking the signature.
+    Raises the same error codes as the backends.
+    """
+    if token.header.get("alg") not in algorithms:
+        raise Auth0Error(
+            status_code=401,
+            code="invalid_token",
+            description="The specified alg value is not allowed",
+        )
+    claims = token.claims
+    expires_at = claims.get("exp")
+    if isinstance(expires_at, (int, float)) and expires_at < time.time() - leeway:
+        raise _token_expired_error()
+    if claims.get("iss") != issuer:
+        raise _invalid_claims_error()
+    if "aud" in claims:
+        audience_claims = claims["aud"]
+        if isinstance(audience_claims, str):
+            audience_claims = [audience_claims]
+        if not isinstance(audience_claims, list) or audience not in audience_claims:
+            raise _invalid_claims_error()
+
+
+def _key_not_found_error() -> Auth0Error:
+    return Auth0Error(
+        status_code=401,
+        code="invalid_token",
+        description="Unable to find appropriate key.",
+    )
+
+
+def _decode_payload(
+    token: ParsedToken,
+    key,
+    backend: VerifierBackend,
+    algorithms: List[str],
+    audience: str,
+    issuer: str,
+) -> dict:
+    return backend.decode(token, key, algorithms, audience, issuer)
+
+
+def _decode_payloads(
+    tokens: List[ParsedToken],
+    key,
+    backend: VerifierBackend,
+    algorithms: List[str],
+    audience: str,
+    issuer: str,
+) -> List[Union[dict, Auth0Error]]:
+    """
+    Module level, so that it can be sent to a process pool
+    """
+    if isinstance(key, dict):
+        key = _construct_key(
+            json.dumps(key, sort_keys=True), key_algorithm(key), backend
+        )
+    outcomes = []
+    for token in tokens:
         try:
-            payload = jwt.decode(
-                token,
-                rsa_key,
-                algorithms=self._algorithms,
-                audience=self._audience,
-                issuer=self._issuer + "/",
-            )
-        except jwt.ExpiredSignatureError as error:
-            raise Auth0Error(
-                status_code=401,
-                code="token_expired",
-                description="Token is expired.",
-            ) from error
-        except jwt.JWTClaimsError as error:
-            raise Auth0Error(
-                status_code=401,
-                code="invalid_claims",
-                description="Incorrect claims, check audience and issuer.",
-            ) from error
-        except Exception as error:
-            raise Auth0Error(
-                status_code=401, code="invalid_token", description=str(error)
-            ) from error
-
-        return DecodedToken(payload=payload, header=header)
+            outcomes.append(backend.decode(token, key, algorithms, audience, issuer))
+        except Auth0Error as error:
+            outcomes.append(error)
+    return outcomes
+
+
+@functools.lru_cache(maxsize=32)
+def _construct_key(key: str, algorithm: str, backend: VerifierBackend):
+    # keys sent to a process pool are constructed once per worker process
+    return backend.load_key(json.loads(key), algorithm)
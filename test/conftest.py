@@ -1,6 +1,7 @@
 import pytest
 import pytest_httpserver
 
+from pyauth0.token_creator import TokenCreator
 from test.testutils.mock_server import MockServer
 
 
@@ -9,3 +10,9 @@ def mock_server(httpserver: pytest_httpserver.HTTPServer):
     server = MockServer(httpserver)
     yield server
     server.clear()
+
+
+@pytest.fixture(scope="session")
+def token_creator() -> TokenCreator:
+    # RSA 4096 keys take a while to generate, one for the whole session
+    return TokenCreator()
@@ -0,0 +1,108 @@
+import json
+
+import httpx
+import pytest
+
+from pyauth0 import Auth0Error, TokenVerifier
+from pyauth0.asgi import AuthMiddleware, get_bearer_token
+from test.testutils.tokens import AUDIENCE, ISSUER, StaticJwksProvider, create_token
+
+
+@pytest.fixture
+def token_verifier(token_creator):
+    return TokenVerifier(
+        issuer=ISSUER,
+        audience=AUDIENCE,
+        jwks_provider=StaticJwksProvider({"keys": [token_creator.jwk()]}),
+    )
+
+
+async def _app(scope, receive, send):
+    # echoes the subject of the verified token, if any
+    token = scope.get("state", {}).get("token")
+    body = json.dumps({"sub": token.payload["sub"] if token else None}).encode()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+    )
+
+
+def test_get_bearer_token():
+    assert get_bearer_token("Bearer abc") == "abc"
+    assert get_bearer_token("bearer  abc ") == "abc"
+    for authorization, code in [
+        (None, "authorization_header_missing"),
+        ("", "authorization_header_missing"),
+        ("Basic abc", "invalid_header"),
+        ("Bearer", "invalid_header"),
+        ("Bearer abc def", "invalid_header"),
+    ]:
+        with pytest.raises(Auth0Error) as info:
+            get_bearer_token(authorization)
+        assert info.value.code == code
+
+
+@pytest.mark.asyncio
+async def test_auth_middleware(token_creator, token_verifier):
+    token = create_token(token_creator)
+    expired_token = create_token(token_creator, expires_in=-60)
+    app = AuthMiddleware(
+        _app,
+        token_verifier,
+        public_paths=["/health"],
+        public_path_prefixes=["/docs/"],
+    )
+
+    async with _client(app) as client:
+        response = await client.get("/", headers={"authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.json() == {"sub": "nobody"}
+
+        response = await client.get("/")
+        assert response.status_code == 401
+        assert response.json()["code"] == "authorization_header_missing"
+        assert response.headers["www-authenticate"] == "Bearer"
+
+        response = await client.get(
+            "/", headers={"authorization": f"Bearer {expired_token}"}
+        )
+        assert response.status_code == 401
+        assert response.json() == {
+            "code": "token_expired",
+            "description": "Token is expired.",
+        }
+
+        for path in ("/health", "/docs/index.html"):
+            response = await client.get(path)
+            assert response.status_code == 200
+            assert response.json() == {"sub": None}
+
+        response = await client.get("/healthz")
+        assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_fastapi_dependency(token_creator, token_verifier):
+    fastapi = pytest.importorskip("fastapi")
+    from pyauth0.fastapi import BearerToken
+
+    app = fastapi.FastAPI()
+    bearer_token = BearerToken(token_verifier)
+
+    @app.get("/")
+    async def handler(token=fastapi.Depends(bearer_token)):
+        return {"sub": token.payload["sub"]}
+
+    token = create_token(token_creator)
+    async with _client(app) as client:
+        response = await client.get("/", headers={"authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.json() == {"sub": "nobody"}
+
+        response = await client.get("/", headers={"authorization": "Bearer gibberish"})
+        assert response.status_code == 401
+        assert response.json()["detail"]["code"] == "invalid_token"
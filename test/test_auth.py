@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from pyauth0 import SyncTokenAuth, SyncTokenProvider, TokenAuth, TokenProvider
+
+
+class _Upstream:
+    """
+    Token endpoint issuing a new token per request, and an API accepting only the latest one
+    """
+
+    def __init__(self, expires_in: int = 60):
+        self.expires_in = expires_in
+        self.issued = 0
+        self.revoked = set()
+        self.api_calls = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/oauth/token":
+            self.issued += 1
+            return httpx.Response(
+                200,
+                json={
+                    "access_token": f"token-{self.issued}",
+                    "expires_in": self.expires_in,
+                    "token_type": "Bearer",
+                },
+            )
+        authorization = request.headers.get("authorization")
+        self.api_calls.append(authorization)
+        if authorization.split(" ")[1] in self.revoked:
+            return httpx.Response(401)
+        return httpx.Response(200, json={"authorization": authorization})
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/oauth/token":
+            # concurrent requests reach the API before the first response, as over the network
+            await asyncio.sleep(0.01)
+        return self.handler(request)
+
+    def token_provider(self) -> TokenProvider:
+        return TokenProvider(
+            "your-domain.auth0.com",
+            "https://api.your-domain.com",
+            "CLIENT_ID",
+            "CLIENT_SECRET",
+            http_client=httpx.AsyncClient(
+                transport=httpx.MockTransport(self.async_handler)
+            ),
+        )
+
+    def client(self, auth: httpx.Auth) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            transport=httpx.MockTransport(self.async_handler),
+            base_url="https://api.your-domain.com",
+            auth=auth,
+        )
+
+
+@pytest.mark.asyncio
+async def test_token_auth_reuses_token():
+    upstream = _Upstream()
+    async with upstream.client(TokenAuth(upstream.token_provider())) as client:
+        responses = await asyncio.gather(*(client.get("/") for _ in range(10)))
+    assert {r.json()["authorization"] for r in responses} == {"Bearer token-1"}
+    assert upstream.issued == 1
+
+
+@pytest.mark.asyncio
+async def test_token_auth_retries_once_on_401():
+    upstream = _Upstream()
+    async with upstream.client(TokenAuth(upstream.token_provider())) as client:
+        await client.get("/")
+        upstream.revoked.add("token-1")
+        upstream.api_calls.clear()
+
+        # all the requests rejected with the revoked token share a single fetch
+        responses = await asyncio.gather(*(client.get("/") for _ in range(10)))
+        assert {r.json()["authorization"] for r in responses} == {"Bearer token-2"}
+        assert upstream.issued == 2
+        assert upstream.api_calls.count("Bearer token-1") == 10
+
+        # the new token is rejected as well, the 401 is returned after one retry
+        upstream.revoked.update(["token-2", "token-3"])
+        upstream.api_calls.clear()
+        response = await client.get("/")
+        assert response.status_code == 401
+        assert upstream.api_calls == ["Bearer token-2", "Bearer token-3"]
+
+
+@pytest.mark.asyncio
+async def test_token_auth_refreshes_before_expiry():
+    upstream = _Upstream(expires_in=2)
+    async with upstream.client(
+        TokenAuth(upstream.token_provider(), refresh_margin=30)
+    ) as client:
+        await client.get("/")
+        # the margin is capped to half the token lifetime
+        time.sleep(1.1)
+        response = await client.get("/")
+        # the request does not wait for the refresh
+        assert response.json()["authorization"] == "Bearer token-1"
+        await asyncio.sleep(0.05)
+        assert upstream.issued == 2
+        response = await client.get("/")
+        assert response.json()["authorization"] == "Bearer token-2"
+
+
+def test_sync_token_auth_retries_once_on_401():
+    upstream = _Upstream()
+    token_provider = SyncTokenProvider(
+        "your-domain.auth0.com",
+        "https://api.your-domain.com",
+        "CLIENT_ID",
+        "CLIENT_SECRET",
+        http_client=httpx.Client(transport=httpx.MockTransport(upstream.handler)),
+    )
+    with httpx.Client(
+        transport=httpx.MockTransport(upstream.handler),
+        base_url="https://api.your-domain.com",
+        auth=SyncTokenAuth(token_provider),
+    ) as client:
+        assert client.get("/").json()["authorization"] == "Bearer token-1"
+        upstream.revoked.add("token-1")
+        response = client.post("/", content=json.dumps({"a": 1}))
+        assert response.json()["authorization"] == "Bearer token-2"
+        assert upstream.issued == 2
+
+    with pytest.raises(RuntimeError):
+        with httpx.Client(auth=TokenAuth(token_provider)) as client:
+            client.get("https://api.your-domain.com")
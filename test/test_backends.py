@@ -0,0 +1,129 @@
+import pickle
+
+import pytest
+
+from pyauth0 import Auth0Error
+from pyauth0.backends import (
+    CryptographyBackend,
+    JoseBackend,
+    default_backend,
+    key_algorithm,
+)
+from pyauth0.parsed_token import ParsedToken, parse_token
+from pyauth0.token_creator import Signer, TokenCreator
+from test.testutils.tokens import create_token
+
+ISSUER = "https://your-domain.auth0.com/"
+AUDIENCE = "https://api.your-domain.com"
+
+
+def _create_token(token_creator: TokenCreator, **kwargs) -> ParsedToken:
+    return parse_token(create_token(token_creator, **kwargs))
+
+
+def test_default_backend():
+    assert isinstance(default_backend(), CryptographyBackend)
+
+
+@pytest.mark.parametrize("backend", [JoseBackend(), CryptographyBackend()])
+def test_backend(token_creator, backend):
+    key = backend.load_key(token_creator.jwk(), "RS256")
+
+    claims = backend.decode(
+        _create_token(token_creator), key, ["RS256"], AUDIENCE, ISSUER
+    )
+    assert claims.get("sub") == "nobody"
+
+    with pytest.raises(Auth0Error) as info:
+        backend.decode(
+            _create_token(token_creator, expires_in=-60),
+            key,
+            ["RS256"],
+            AUDIENCE,
+            ISSUER,
+        )
+    assert info.value.code == "token_expired"
+
+    with pytest.raises(Auth0Error) as info:
+        backend.decode(
+            _create_token(token_creator, audience="https://another-api.com"),
+            key,
+            ["RS256"],
+            AUDIENCE,
+            ISSUER,
+        )
+    assert info.value.code == "invalid_claims"
+
+    with pytest.raises(Auth0Error) as info:
+        tampered_token = _create_token(token_creator)._replace(signature=b"tampered")
+        tampered_token = tampered_token._replace(
+            token=tampered_token.token.rpartition(".")[0] + ".dGFtcGVyZWQ"
+        )
+        backend.decode(tampered_token, key, ["RS256"], AUDIENCE, ISSUER)
+    assert info.value.code == "invalid_token"
+    assert info.value.description == "Signature verification failed."
+
+
+def _decode_outcome(backend, token: ParsedToken, token_creator: TokenCreator):
+    key = backend.load_key(token_creator.jwk(), "RS256")
+    try:
+        return backend.decode(token, key, ["RS256"], AUDIENCE, ISSUER)
+    except Auth0Error as error:
+        return error.code, error.description
+
+
+@pytest.mark.parametrize(
+    "extra_claims",
+    [
+        {"aud": [AUDIENCE]},
+        {"aud": [AUDIENCE, 1]},
+        {"aud": [AUDIENCE, None]},
+        {"aud": {"aud": AUDIENCE}},
+        {"aud": 1},
+        {"iss": "https://another-domain.auth0.com/"},
+        {"iat": "now"},
+        {"nbf": 4102444800},
+        {"nbf": "now"},
+        {"exp": "later"},
+        {"sub": 1},
+        {"jti": 1},
+        {"at_hash": "hash"},
+    ],
+)
+def test_backends_accept_the_same_claims(token_creator, extra_claims):
+    token = _create_token(token_creator, extra_claims=extra_claims)
+    assert _decode_outcome(
+        CryptographyBackend(), token, token_creator
+    ) == _decode_outcome(JoseBackend(), token, token_creator)
+
+
+def test_backends_are_picklable():
+    backend = pickle.loads(pickle.dumps(CryptographyBackend()))
+    assert backend == CryptographyBackend()
+    assert hash(backend) == hash(CryptographyBackend())
+
+
+@pytest.mark.parametrize("algorithm", ["ES256", "EdDSA"])
+def test_cryptography_backend_algorithms(algorithm):
+    backend = CryptographyBackend()
+    token_creator = TokenCreator(Signer(algorithm=algorithm))
+    key = backend.load_key(token_creator.jwk(), algorithm)
+
+    token = _create_token(token_creator)
+    assert token.header["alg"] == algorithm
+    claims = backend.decode(token, key, [algorithm], AUDIENCE, ISSUER)
+    assert claims.get("sub") == "nobody"
+
+    # the key is not used for another algorithm, even if allowed
+    with pytest.raises(Auth0Error) as info:
+        spoofed_token = token._replace(header={**token.header, "alg": "RS256"})
+        backend.decode(spoofed_token, key, ["RS256", algorithm], AUDIENCE, ISSUER)
+    assert info.value.description == "Signature verification failed."
+
+
+def test_key_algorithm():
+    assert key_algorithm({"kty": "RSA"}) == "RS256"
+    assert key_algorithm({"kty": "EC", "crv": "P-256"}) == "ES256"
+    assert key_algorithm({"kty": "OKP", "crv": "Ed25519"}) == "EdDSA"
+    assert key_algorithm({"kty": "EC", "crv": "P-384"}) is None
+    assert key_algorithm({"kty": "RSA", "alg": "RS512"}) == "RS512"
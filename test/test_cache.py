@@ -0,0 +1,141 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from pyauth0 import TokenProvider
+from pyauth0.cache import (
+    CacheBackend,
+    CacheEntry,
+    MemoryCache,
+    RedisCache,
+    fetch_shared,
+    fetch_shared_async,
+)
+from pyauth0.file_cache import FileCache
+from test.const import JWT_IO_TOKEN
+from test.testutils.fake_redis import FakeRedis
+from test.testutils.mock_server import MockServer
+
+
+@pytest.fixture(params=["memory", "file", "redis"])
+def cache(request, tmp_path) -> CacheBackend:
+    if request.param == "memory":
+        return MemoryCache()
+    if request.param == "file":
+        return FileCache(str(tmp_path))
+    return RedisCache(FakeRedis())
+
+
+def test_cache_entries(cache: CacheBackend):
+    assert cache.get("key") is None
+    cache.set("key", {"value": 1}, time.time() + 60)
+    assert cache.get("key") == CacheEntry({"value": 1}, cache.get("key").expires_at)
+    cache.set("key", {"value": 2}, time.time() - 1)
+    assert cache.get("key") is None
+
+
+def test_cache_leases(cache: CacheBackend):
+    lease = cache.acquire_lease("key", ttl=60)
+    assert lease
+    assert cache.acquire_lease("key", ttl=60) is None
+    assert cache.acquire_lease("another-key", ttl=60)
+    cache.release_lease("key", lease)
+    assert cache.acquire_lease("key", ttl=60)
+
+
+def test_fetch_is_shared(cache: CacheBackend):
+    fetches = []
+
+    def fetch() -> CacheEntry:
+        fetches.append(1)
+        time.sleep(0.1)
+        return CacheEntry(len(fetches), time.time() + 60)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(
+            executor.map(lambda _: fetch_shared(cache, "key", fetch).value, range(8))
+        )
+    # one fetched, the others waited for its entry
+    assert fetches == [1]
+    assert values == [1] * 8
+
+
+def test_expired_lease_is_taken_over():
+    cache = MemoryCache()
+    assert cache.acquire_lease("key", ttl=0.05)
+    # the holder died without releasing the lease
+    entry = fetch_shared(
+        cache, "key", lambda: CacheEntry("value", time.time() + 60), lease_ttl=1
+    )
+    assert entry.value == "value"
+
+
+class _ThreadRecordingCache(MemoryCache):
+    """
+    A cache doing I/O, e.g. Redis, recording the threads calling it
+    """
+
+    blocking = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key: str):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key: str, value, expires_at: float) -> None:
+        self.threads.add(threading.get_ident())
+        super().set(key, value, expires_at)
+
+    def acquire_lease(self, key: str, ttl: float):
+        self.threads.add(threading.get_ident())
+        return super().acquire_lease(key, ttl)
+
+    def release_lease(self, key: str, lease: str) -> None:
+        self.threads.add(threading.get_ident())
+        super().release_lease(key, lease)
+
+
+@pytest.mark.asyncio
+async def test_blocking_cache_is_called_off_the_event_loop():
+    cache = _ThreadRecordingCache()
+
+    async def fetch() -> CacheEntry:
+        return CacheEntry("value", time.time() + 60)
+
+    assert (await fetch_shared_async(cache, "key", fetch)).value == "value"
+    assert (await fetch_shared_async(cache, "key", fetch)).value == "value"
+    assert cache.threads
+    assert threading.get_ident() not in cache.threads
+
+
+@pytest.mark.asyncio
+async def test_token_providers_share_the_token(mock_server: MockServer):
+    mock_server.respond_with_json(
+        r".*",
+        {"access_token": JWT_IO_TOKEN, "expires_in": 60, "token_type": "bearer"},
+    )
+    # e.g. the same service running on several nodes
+    shared_cache = RedisCache(FakeRedis())
+    token_providers = [
+        TokenProvider(
+            issuer=mock_server.server_url,
+            audience="AUDIENCE",
+            client_id="CLIENT_ID",
+            client_secret="CLIENT_SECRET",
+            shared_cache=shared_cache,
+        )
+        for _ in range(5)
+    ]
+    access_tokens = await asyncio.gather(
+        *(token_provider.get_access_token() for token_provider in token_providers)
+    )
+    assert access_tokens == [JWT_IO_TOKEN] * 5
+    assert len(mock_server.received_requests) == 1
+    for token_provider in token_providers:
+        await token_provider.aclose()
@@ -1,4 +1,8 @@
+import pytest
+from jose.exceptions import JWTError
+
 from pyauth0 import DecodedToken
+from pyauth0.parsed_token import parse_token
 from test.const import JWT_IO_TOKEN
 
 
@@ -8,3 +12,19 @@ def test_decode():
     assert decoded_token.header
     assert decoded_token.payload
     assert decoded_token.payload.get("name") == "John Doe"
+
+
+def test_parse_token():
+    parsed_token = parse_token(JWT_IO_TOKEN)
+    assert parsed_token.header.get("alg") == "HS256"
+    assert parsed_token.claims.get("name") == "John Doe"
+    assert parsed_token.signing_input == JWT_IO_TOKEN.rpartition(".")[0].encode()
+    assert len(parsed_token.signature) == 32
+
+
+@pytest.mark.parametrize("token", ["gibberish", "a.b", "a.b.c.d", "e30.W10.", "Ã.e30."])
+def test_parse_malformed_token(token):
+    with pytest.raises(ValueError):
+        parse_token(token)
+    with pytest.raises(JWTError):
+        DecodedToken.decode(token)
@@ -0,0 +1,108 @@
+import concurrent.futures
+import os
+import time
+
+import pytest
+
+from pyauth0 import SyncTokenVerifier, TokenProvider
+from pyauth0.cache import CacheEntry, fetch_shared
+from pyauth0.file_cache import FileCache
+from test.const import JWT_IO_TOKEN
+from test.testutils.mock_server import MockServer
+
+
+def test_file_cache(tmp_path):
+    file_cache = FileCache(str(tmp_path))
+    assert file_cache.get("key") is None
+
+    file_cache.set("key", {"value": 1}, time.time() + 60)
+    assert file_cache.get("key").value == {"value": 1}
+    assert FileCache(str(tmp_path)).get("key").value == {"value": 1}
+
+    file_cache.set("key", {"value": 2}, time.time() - 1)
+    assert file_cache.get("key") is None
+
+    # unreadable entries are ignored
+    for path in tmp_path.iterdir():
+        path.write_text("{")
+    assert file_cache.get("key") is None
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_file_cache_refuses_shared_directory(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir()
+    directory.chmod(0o777)
+    # e.g. created by another user in the temp directory, before this process
+    with pytest.raises(PermissionError):
+        FileCache(str(directory))
+    directory.chmod(0o700)
+    FileCache(str(directory))
+
+    default_directory = FileCache().directory
+    assert default_directory.endswith(f"pyauth0-cache-{os.getuid()}")
+    assert os.stat(default_directory).st_mode & 0o777 == 0o700
+
+
+def _fetch_once(directory: str) -> int:
+    def fetch() -> CacheEntry:
+        with open(os.path.join(directory, "fetches"), "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.1)
+        return CacheEntry(os.getpid(), time.time() + 60)
+
+    return fetch_shared(FileCache(directory), "key", fetch).value
+
+
+def test_fetch_is_shared_across_processes(tmp_path):
+    with concurrent.futures.ProcessPoolExecutor(max_workers=4) as executor:
+        values = list(executor.map(_fetch_once, [str(tmp_path)] * 8))
+    # one process fetched, the others waited for its entry
+    assert len((tmp_path / "fetches").read_text().splitlines()) == 1
+    assert len(set(values)) == 1
+
+
+@pytest.mark.asyncio
+async def test_token_provider_warm_start(mock_server: MockServer, tmp_path):
+    mock_server.respond_with_json(
+        r".*",
+        {"access_token": JWT_IO_TOKEN, "expires_in": 60, "token_type": "bearer"},
+    )
+
+    def create_token_provider():
+        return TokenProvider(
+            issuer=mock_server.server_url,
+            audience="AUDIENCE",
+            client_id="CLIENT_ID",
+            client_secret="CLIENT_SECRET",
+            shared_cache=FileCache(str(tmp_path)),
+        )
+
+    async with create_token_provider() as token_provider:
+        assert await token_provider.get_access_token() == JWT_IO_TOKEN
+    # e.g. the next worker process
+    async with create_token_provider() as token_provider:
+        token = await token_provider.get_token()
+        assert token.access_token == JWT_IO_TOKEN
+        assert not token.is_expired(skew_seconds=50)
+    assert len(mock_server.received_requests) == 1
+    # the client secret is never written to disk
+    for path in tmp_path.iterdir():
+        assert "CLIENT_SECRET" not in path.read_text()
+
+
+def test_sync_token_verifier_warm_start(mock_server: MockServer, tmp_path):
+    mock_server.respond_with_json(r"/.well-known/jwks.json", {"keys": []})
+
+    def create_token_verifier():
+        return SyncTokenVerifier(
+            issuer=mock_server.server_url,
+            audience="https://api.your-domain.com",
+            jwks_cache_ttl=60,
+            shared_cache=FileCache(str(tmp_path)),
+        )
+
+    for _ in range(2):
+        with create_token_verifier() as token_verifier:
+            assert token_verifier._get_key_index().jwks == {"keys": []}
+    assert len(mock_server.received_requests) == 1
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+import warnings
+
+import pytest
+
+from pyauth0 import TokenProvider, TokenVerifier
+from pyauth0.http_client import _AsyncClientHolder, create_async_client
+from test.const import JWT_IO_TOKEN
+from test.testutils.mock_server import MockServer
+
+
+@pytest.mark.asyncio
+async def test_owned_client_is_reused_and_closed():
+    holder = _AsyncClientHolder()
+    client = holder.client
+    assert holder.client is client
+    await holder.aclose()
+    assert client.is_closed
+
+
+def test_owned_client_is_recreated_per_event_loop():
+    holder = _AsyncClientHolder()
+
+    async def get_client():
+        return holder.client
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", ResourceWarning)
+        first_client = asyncio.run(get_client())
+        # closed at the end of its event loop, with its pooled connections
+        assert first_client.is_closed
+        second_client = asyncio.run(get_client())
+        assert second_client is not first_client
+        assert second_client.is_closed
+
+
+def test_owned_client_of_another_loop_is_closed_or_reported():
+    holder = _AsyncClientHolder()
+
+    async def get_client():
+        return holder.client
+
+    # a loop still running in another thread closes its client
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    client = asyncio.run_coroutine_threadsafe(get_client(), loop).result()
+    asyncio.run(holder.aclose())
+    time.sleep(0.05)
+    assert client.is_closed
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+    # a loop closed without shutting down its async generators leaks it
+    client = loop.run_until_complete(get_client())
+    loop.close()
+    with pytest.warns(ResourceWarning):
+        asyncio.run(get_client())
+    assert not client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_injected_client_is_shared_and_not_closed(mock_server: MockServer):
+    mock_server.respond_with_json(
+        r"/oauth/token",
+        {"access_token": JWT_IO_TOKEN, "expires_in": 60, "token_type": "bearer"},
+    )
+    mock_server.respond_with_json(r"/.well-known/jwks.json", {"keys": []})
+
+    async with create_async_client() as http_client:
+        async with TokenProvider(
+            issuer=mock_server.server_url,
+            audience="AUDIENCE",
+            client_id="CLIENT_ID",
+            client_secret="CLIENT_SECRET",
+            http_client=http_client,
+        ) as token_provider, TokenVerifier(
+            issuer=mock_server.server_url,
+            audience="AUDIENCE",
+            http_client=http_client,
+        ) as token_verifier:
+            assert await token_provider.get_access_token() == JWT_IO_TOKEN
+            assert await token_verifier._jwks_provider.get() == {"keys": []}
+        assert not http_client.is_closed
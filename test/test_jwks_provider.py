@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from pyauth0.token_verifier import JwksProvider, _JwksProviderCacheDecorator
+from test.testutils.fake_clock import FakeClock
+
+
+class _SlowJwksProvider(JwksProvider):
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    async def get(self):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if self.error:
+            raise self.error
+        return {"keys": [], "version": self.calls}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_fetch():
+    delegate = _SlowJwksProvider()
+    jwks_provider = _JwksProviderCacheDecorator(delegate, ttl=60)
+
+    results = await asyncio.gather(*(jwks_provider.get() for _ in range(10)))
+
+    assert delegate.calls == 1
+    assert all(jwks is results[0] for jwks in results)
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate():
+    delegate = _SlowJwksProvider()
+    jwks_provider = _JwksProviderCacheDecorator(
+        delegate, ttl=0, grace_period=60, stale_while_revalidate=True
+    )
+    jwks = await jwks_provider.get()
+    assert jwks["version"] == 1
+
+    # the ttl is expired, the stale JWKS is served while refreshing in background
+    assert await jwks_provider.get() is jwks
+    assert await jwks_provider.get() is jwks
+    await asyncio.sleep(0.1)
+    assert delegate.calls == 2
+    assert jwks_provider._jwks["version"] == 2
+
+
+@pytest.mark.asyncio
+async def test_grace_period_on_refresh_failure():
+    delegate = _SlowJwksProvider()
+    jwks_provider = _JwksProviderCacheDecorator(delegate, ttl=0, grace_period=60)
+    jwks = await jwks_provider.get()
+
+    delegate.error = RuntimeError("unavailable")
+    assert await jwks_provider.get() is jwks
+
+    # without grace period the error is propagated
+    jwks_provider = _JwksProviderCacheDecorator(delegate, ttl=0)
+    with pytest.raises(RuntimeError):
+        await jwks_provider.get()
+
+
+@pytest.mark.asyncio
+async def test_ttl_follows_the_clock():
+    delegate = _SlowJwksProvider()
+    clock = FakeClock()
+    jwks_provider = _JwksProviderCacheDecorator(
+        delegate, ttl=60, grace_period=30, clock=clock
+    )
+    await jwks_provider.get()
+
+    clock.advance(59)
+    await jwks_provider.get()
+    assert delegate.calls == 1
+
+    clock.advance(1)
+    delegate.error = RuntimeError("unavailable")
+    jwks = await jwks_provider.get()
+    assert jwks["version"] == 1
+    assert delegate.calls == 2
+
+    # after the grace period the error is propagated
+    clock.advance(30)
+    with pytest.raises(RuntimeError):
+        await jwks_provider.get()
@@ -0,0 +1,186 @@
+import pytest
+
+from pyauth0 import Auth0Error, SyncTokenVerifier, TokenProvider, TokenVerifier
+from pyauth0.backends import CryptographyBackend, JoseBackend
+from pyauth0.metrics import Histogram, InMemoryMetrics
+from pyauth0.token_creator import TokenCreator
+from test.const import JWT_IO_TOKEN
+from test.testutils.mock_server import MockServer
+from test.testutils.tokens import create_token
+
+
+def test_in_memory_metrics():
+    metrics = InMemoryMetrics(buckets=(0.001, 0.01, 0.1))
+    metrics.increment("verify.error", code="token_expired")
+    metrics.increment("verify.error", code="token_expired")
+    metrics.increment("verify.error", code="invalid_token")
+    for seconds in (0.0005, 0.005, 0.005, 0.05, 1):
+        metrics.observe("verify", seconds)
+
+    assert metrics.counter("verify.error", code="token_expired") == 2
+    assert metrics.counter("verify.error", code="invalid_claims") == 0
+    histogram = metrics.histogram("verify")
+    assert histogram.count == 5
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(0.99) == float("inf")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["verify.error{code=invalid_token}"] == 1
+    assert snapshot["histograms"]["verify"]["buckets"] == {
+        0.001: 1,
+        0.01: 2,
+        0.1: 1,
+        float("inf"): 1,
+    }
+
+    metrics.reset()
+    assert metrics.snapshot() == {"counters": {}, "histograms": {}}
+
+
+def test_histogram_quantile_of_empty_histogram():
+    assert Histogram((0.1, 1)).quantile(0.5) == float("inf")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", [CryptographyBackend(), JoseBackend()])
+async def test_token_verifier_metrics(
+    mock_server: MockServer, token_creator: TokenCreator, backend
+):
+    mock_server.respond_with_json(
+        r"/.well-known/jwks.json", {"keys": [token_creator.jwk()]}
+    )
+    token = create_token(token_creator, issuer=mock_server.server_url)
+    expired_token = create_token(
+        token_creator, issuer=mock_server.server_url, expires_in=-60
+    )
+    metrics = InMemoryMetrics()
+
+    async with TokenVerifier(
+        issuer=mock_server.server_url,
+        audience="https://api.your-domain.com",
+        jwks_cache_ttl=60,
+        token_cache_size=10,
+        backend=backend,
+        metrics=metrics,
+    ) as token_verifier:
+        await token_verifier.verify(token)
+        await token_verifier.verify(token)
+        with pytest.raises(Auth0Error):
+            await token_verifier.verify(expired_token)
+        with pytest.raises(Auth0Error):
+            await token_verifier.verify("gibberish")
+        await token_verifier.verify_many([token, expired_token, "gibberish"])
+        await token_verifier.verify_many([None])
+
+    assert metrics.histogram("verify").count == 4
+    assert metrics.histogram("verify.parse").count == 4
+    assert metrics.histogram("verify.key_lookup").count == 2
+    if backend.splits_verification:
+        assert metrics.histogram("verify.signature").count == 2
+        assert metrics.histogram("verify.claims").count == 2
+    else:
+        assert metrics.histogram("verify.decode").count == 2
+    assert metrics.histogram("http.request", target="jwks").count == 1
+    assert metrics.counter("verify.error", code="token_expired") == 2
+    assert metrics.counter("verify.error", code="invalid_token") == 3
+    assert metrics.counter("verified_token_cache.hit") == 2
+    assert metrics.counter("verified_token_cache.miss") == 3
+    assert metrics.counter("jwks_cache.miss") == 1
+    assert metrics.counter("jwks_cache.hit") == 3
+    # batches without a parsable token stop after the parse stage
+    assert metrics.histogram("verify_many").count == 2
+    assert metrics.histogram("verify_many.parse").count == 2
+    assert metrics.histogram("verify_many.key_lookup").count == 1
+    assert metrics.histogram("verify_many.decode").count == 1
+    assert metrics.counter("verify_many.tokens") == 4
+    assert metrics.counter("jwks.refresh") == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", [CryptographyBackend(), JoseBackend()])
+async def test_metrics_do_not_change_the_verification(
+    mock_server: MockServer, token_creator: TokenCreator, backend
+):
+    mock_server.respond_with_json(
+        r"/.well-known/jwks.json", {"keys": [token_creator.jwk()]}
+    )
+    tokens = [
+        create_token(token_creator, issuer=mock_server.server_url, extra_claims=claims)
+        for claims in (
+            {},
+            {"aud": ["https://api.your-domain.com", 1]},
+            {"nbf": "now"},
+            {"sub": 1},
+            {"at_hash": "hash"},
+        )
+    ]
+
+    async def verify_all(metrics):
+        async with TokenVerifier(
+            issuer=mock_server.server_url,
+            audience="https://api.your-domain.com",
+            backend=backend,
+            metrics=metrics,
+        ) as token_verifier:
+            results = []
+            for token in tokens:
+                try:
+                    results.append(await token_verifier.verify(token))
+                except Auth0Error as error:
+                    results.append(error.description)
+            return results
+
+    assert await verify_all(InMemoryMetrics()) == await verify_all(None)
+
+
+def test_sync_token_verifier_metrics(
+    mock_server: MockServer, token_creator: TokenCreator
+):
+    mock_server.respond_with_json(
+        r"/.well-known/jwks.json", {"keys": [token_creator.jwk()]}
+    )
+    token = create_token(token_creator, issuer=mock_server.server_url)
+    metrics = InMemoryMetrics()
+
+    with SyncTokenVerifier(
+        issuer=mock_server.server_url,
+        audience="https://api.your-domain.com",
+        metrics=metrics,
+    ) as token_verifier:
+        token_verifier.verify(token)
+        results = token_verifier.verify_many([token, None])
+        assert isinstance(results[1], Auth0Error)
+
+    assert metrics.histogram("verify").count == 1
+    assert metrics.histogram("verify.signature").count == 1
+    assert metrics.histogram("http.request", target="jwks").count == 2
+    assert metrics.counter("verify.error", code="invalid_token") == 1
+    # one observation per batch and stage
+    for name in ("parse", "key_lookup", "decode"):
+        assert metrics.histogram(f"verify_many.{name}").count == 1
+    assert metrics.histogram("verify_many").count == 1
+    assert metrics.counter("verify_many.tokens") == 2
+
+
+@pytest.mark.asyncio
+async def test_token_provider_metrics(mock_server: MockServer):
+    mock_server.respond_with_json(
+        r".*",
+        {"access_token": JWT_IO_TOKEN, "expires_in": 60, "token_type": "bearer"},
+    )
+    metrics = InMemoryMetrics()
+
+    async with TokenProvider(
+        issuer=mock_server.server_url,
+        audience="AUDIENCE",
+        client_id="CLIENT_ID",
+        client_secret="CLIENT_SECRET",
+        metrics=metrics,
+    ) as token_provider:
+        await token_provider.get_token()
+        await token_provider.get_token()
+
+    assert metrics.counter("token_cache.miss") == 1
+    assert metrics.counter("token_cache.hit") == 1
+    assert metrics.counter("token.refresh") == 1
+    assert metrics.histogram("http.request", target="token").count == 1
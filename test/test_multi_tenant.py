@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from pyauth0 import Auth0Error, MultiTenantTokenVerifier
+from pyauth0.token_creator import TokenCreator
+from test.testutils.mock_server import MockServer
+from test.testutils.tokens import create_token
+
+
+@pytest.mark.asyncio
+async def test_multi_tenant_token_verifier(
+    mock_server: MockServer, token_creator: TokenCreator
+):
+    mock_server.respond_with_json(
+        r"/.well-known/jwks.json", {"keys": [token_creator.jwk()]}
+    )
+    # two tenants served by the same mock server
+    tenant_1 = mock_server.server_url
+    tenant_2 = mock_server.server_url.replace("localhost", "127.0.0.1")
+    assert tenant_1 != tenant_2
+
+    async with MultiTenantTokenVerifier(
+        {
+            tenant_1: ["https://api-1.com", "https://api-2.com"],
+            tenant_2: "https://api-1.com",
+        },
+        max_tenants=1,
+        jwks_cache_ttl=60,
+    ) as token_verifier:
+        for issuer, audience in [
+            (tenant_1, "https://api-1.com"),
+            (tenant_1, "https://api-2.com"),
+        ]:
+            decoded_token = await token_verifier.verify(
+                create_token(token_creator, issuer=issuer, audience=audience)
+            )
+            assert decoded_token.payload.get("aud") == audience
+        # tenants are initialized lazily, and the JWKS is shared by the audiences
+        assert list(token_verifier._tenants) == [tenant_1]
+        assert len(mock_server.received_requests) == 1
+
+        await token_verifier.verify(
+            create_token(token_creator, issuer=tenant_2, audience="https://api-1.com")
+        )
+        # the least recently used tenant is evicted
+        assert list(token_verifier._tenants) == [tenant_2]
+        assert len(mock_server.received_requests) == 2
+
+        for issuer, audience in [
+            (tenant_2, "https://api-2.com"),
+            ("unknown-tenant.auth0.com", "https://api-1.com"),
+        ]:
+            with pytest.raises(Auth0Error) as info:
+                await token_verifier.verify(
+                    create_token(token_creator, issuer=issuer, audience=audience)
+                )
+            assert info.value.code == "invalid_claims"
+
+
+@pytest.mark.asyncio
+async def test_multi_tenant_precheck_rejects_large_tokens(token_creator: TokenCreator):
+    async with MultiTenantTokenVerifier(
+        {"your-domain.auth0.com": "https://api-1.com"},
+        precheck=True,
+        max_token_length=100,
+    ) as token_verifier:
+        token = create_token(token_creator, audience="https://api-1.com")
+        assert len(token) > 100
+        with pytest.raises(Auth0Error) as info:
+            await token_verifier.verify(token)
+        assert info.value.description == "Token is too large."
+        assert not token_verifier._tenants
+
+
+@pytest.mark.asyncio
+async def test_multi_tenant_closes_evicted_tenants_in_background(
+    mock_server: MockServer, token_creator: TokenCreator
+):
+    mock_server.respond_with_json(
+        r"/.well-known/jwks.json", {"keys": [token_creator.jwk()]}
+    )
+    tenant_1 = mock_server.server_url
+    tenant_2 = mock_server.server_url.replace("localhost", "127.0.0.1")
+
+    async with MultiTenantTokenVerifier(
+        {tenant_1: "https://api-1.com", tenant_2: "https://api-1.com"},
+        max_tenants=1,
+        jwks_cache_ttl=60,
+    ) as token_verifier:
+        await token_verifier.verify(
+            create_token(token_creator, issuer=tenant_1, audience="https://api-1.com")
+        )
+        # e.g. a slow JWKS refresh of the first tenant
+        refreshed = asyncio.Event()
+        jwks_provider = token_verifier._tenants[tenant_1].jwks_provider
+        jwks_provider._refresh_task = asyncio.ensure_future(refreshed.wait())
+
+        # evicting the first tenant does not delay the tokens of the second one
+        token = create_token(
+            token_creator, issuer=tenant_2, audience="https://api-1.com"
+        )
+        await asyncio.wait_for(token_verifier.verify(token), timeout=1)
+        assert list(token_verifier._tenants) == [tenant_2]
+        assert len(token_verifier._closing) == 1
+        refreshed.set()
+    assert not token_verifier._closing
@@ -0,0 +1,165 @@
+import concurrent.futures
+import sys
+import time
+
+import pytest
+
+from pyauth0 import Auth0Error, SyncTokenProvider, SyncTokenVerifier
+from pyauth0.sync import SyncJwksProvider, _SyncJwksProviderCacheDecorator
+from pyauth0.token_creator import Signer, TokenCreator
+from pyauth0.token_verifier import DecodedToken, VerifiedTokenCache, _UnknownKidCache
+from test.const import JWT_IO_TOKEN
+from test.testutils.fake_clock import FakeClock
+from test.testutils.mock_server import MockServer
+
+
+class _CountingJwksProvider(SyncJwksProvider):
+    def __init__(self, jwks: dict):
+        self.jwks = jwks
+        self.calls = 0
+
+    def get(self):
+        self.calls += 1
+        if self.jwks is None:
+            raise ConnectionError("unavailable")
+        return self.jwks
+
+
+def test_sync_token_verifier(mock_server: MockServer):
+    token_creator = TokenCreator()
+    mock_server.respond_with_json(
+        r"/.well-known/jwks.json", {"keys": [token_creator.jwk()]}
+    )
+    token = token_creator.create_token(
+        mock_server.server_url,
+        subject="nobody",
+        audience="https://api.your-domain.com",
+        expires_in=60,
+    )
+
+    with SyncTokenVerifier(
+        issuer=mock_server.server_url,
+        audience="https://api.your-domain.com",
+        jwks_cache_ttl=60,
+    ) as token_verifier:
+        decoded_token = token_verifier.verify(token)
+        assert decoded_token.payload.get("sub") == "nobody"
+        token_verifier.verify(token)
+        assert len(mock_server.received_requests) == 1
+
+        with pytest.raises(Auth0Error) as info:
+            token_verifier.verify("gibberish")
+        assert "Malformed token" in info.value.description
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            results = token_verifier.verify_many([token, None, token], executor)
+        assert results[0].payload.get("sub") == "nobody"
+        assert isinstance(results[1], Auth0Error)
+        assert results[2].payload.get("sub") == "nobody"
+
+
+def test_sync_jwks_cache_is_single_flight():
+    delegate = _CountingJwksProvider({"keys": []})
+    jwks_provider = _SyncJwksProviderCacheDecorator(delegate, ttl=60)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: jwks_provider.get(), range(32)))
+    assert delegate.calls == 1
+    assert all(jwks is delegate.jwks for jwks in results)
+
+
+def test_sync_failed_refresh_is_retried_with_backoff():
+    jwks_provider = _CountingJwksProvider({"keys": []})
+    clock = FakeClock()
+    jwks_cache = _SyncJwksProviderCacheDecorator(
+        jwks_provider, ttl=60, grace_period=600, clock=clock
+    )
+    jwks = jwks_cache.get()
+
+    jwks_provider.jwks = None
+    clock.advance(60)
+    # the stale JWKS is served, without refreshing by every call
+    for delay in (0, 1, 2, 4):
+        clock.advance(delay)
+        for _ in range(10):
+            assert jwks_cache.get() == jwks
+        clock.advance(delay / 2)
+        assert jwks_cache.get() == jwks
+    assert jwks_provider.calls == 5
+
+    jwks_provider.jwks = {"keys": []}
+    clock.advance(8)
+    jwks_cache.get()
+    assert jwks_provider.calls == 6
+
+
+def test_sync_token_provider(mock_server: MockServer):
+    mock_server.respond_with_json(
+        r"/oauth/token",
+        {"access_token": JWT_IO_TOKEN, "expires_in": 60, "token_type": "bearer"},
+    )
+    with SyncTokenProvider(
+        issuer=mock_server.server_url,
+        audience="AUDIENCE",
+        client_id="CLIENT_ID",
+        client_secret="CLIENT_SECRET",
+    ) as token_provider:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            tokens = list(
+                executor.map(lambda _: token_provider.get_access_token(), range(32))
+            )
+        assert tokens == [JWT_IO_TOKEN] * 32
+        assert len(mock_server.received_requests) == 1
+        assert token_provider.get_authorization() == f"bearer {JWT_IO_TOKEN}"
+
+
+def test_sync_unknown_kid_forces_refresh():
+    token_creator = TokenCreator(Signer(algorithm="ES256"))
+    delegate = _CountingJwksProvider({"keys": []})
+    token_verifier = SyncTokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_provider=_SyncJwksProviderCacheDecorator(delegate, ttl=60),
+        algorithms=["ES256"],
+        jwks_min_refresh_interval=60,
+    )
+    assert token_verifier._get_key_index().jwks is delegate.jwks
+
+    # the key was rotated after the JWKS was cached
+    delegate.jwks = {"keys": [token_creator.jwk()]}
+    token = token_creator.create_token(
+        "your-domain.auth0.com",
+        subject="nobody",
+        audience="https://api.your-domain.com",
+        expires_in=60,
+    )
+    assert token_verifier.verify(token).payload.get("sub") == "nobody"
+    assert delegate.calls == 2
+
+
+def test_sync_caches_are_thread_safe():
+    token_cache = VerifiedTokenCache(maxsize=16)
+    unknown_kids = _UnknownKidCache(maxsize=16, ttl=0)
+    tokens = [
+        DecodedToken(header={"kid": f"kid-{i % 4}"}, payload={"exp": time.time() + 60})
+        for i in range(64)
+    ]
+
+    def run(worker: int):
+        for i, decoded_token in enumerate(tokens):
+            token_cache.put(f"token-{i}", decoded_token)
+            token_cache.get(f"token-{(i + worker) % 64}")
+            token_cache.retain_kids([f"kid-{(i + worker) % 4}"])
+            unknown_kids.add(f"kid-{i}")
+            assert f"kid-{i}" not in unknown_kids
+
+    # switch threads as often as possible, so that the races show up
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            for _ in range(20):
+                # raises the first error of the workers, if any
+                list(executor.map(run, range(8)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert len(token_cache) <= 16
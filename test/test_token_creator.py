@@ -1,9 +1,14 @@
 import base64
+import concurrent.futures
 import json
+import tempfile
+import threading
+import time
 
 import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
 
-from pyauth0.token_creator import Signer, TokenCreator
+from pyauth0.token_creator import KeyPool, KeyRing, Signer, TokenCreator
 from test.testutils.mock_server import MockServer
 
 
@@ -14,6 +19,12 @@ def test_signer():
     assert signer.verify_signature(signature, data)
 
 
+def test_signer_without_key_path_is_not_saved(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    Signer(algorithm="ES256")
+    assert not list(tmp_path.iterdir())
+
+
 @pytest.mark.asyncio
 async def test_token_creator(
     mock_server: MockServer,
@@ -49,3 +60,233 @@ async def test_token_creator(
     signed_data, _, signature = token.rpartition(".")
     signature = base64.urlsafe_b64decode(signature + "==")
     assert signer.verify_signature(signature, signed_data)
+
+
+@pytest.mark.parametrize(
+    "executor_class",
+    [
+        None,
+        concurrent.futures.ThreadPoolExecutor,
+        concurrent.futures.ProcessPoolExecutor,
+    ],
+)
+def test_create_tokens(executor_class):
+    signer = Signer()
+    token_creator = TokenCreator(signer)
+    subjects = [f"user-{i}" for i in range(5)]
+
+    executor = executor_class(max_workers=2) if executor_class else None
+    try:
+        tokens = token_creator.create_tokens(
+            "your-domain.auth0.com",
+            subjects=subjects,
+            audience="https://api.your-domain.com",
+            expires_in=3600,
+            executor=executor,
+            chunk_size=2,
+        )
+    finally:
+        if executor:
+            executor.shutdown()
+
+    assert len(tokens) == len(subjects)
+    for subject, token in zip(subjects, tokens):
+        header, payload, _ = token.split(".")
+        assert header == token_creator.encoded_header
+        payload = json.loads(base64.urlsafe_b64decode(payload + "=="))
+        assert payload.get("sub") == subject
+        assert payload.get("iss") == "https://your-domain.auth0.com/"
+        signed_data, _, signature = token.rpartition(".")
+        signature = base64.urlsafe_b64decode(signature + "==")
+        assert signer.verify_signature(signature, signed_data)
+
+
+def test_key_material_is_computed_once_per_key():
+    signer = Signer()
+    token_creator = TokenCreator(signer)
+
+    assert signer.public_key is signer.public_key
+    assert signer.public_pem.startswith(b"-----BEGIN PUBLIC KEY-----")
+    assert signer.get_public_pem().startswith(b"ssh-rsa ")
+    assert token_creator.jwk() == token_creator.jwk()
+    assert token_creator.encoded_jwks is token_creator.encoded_jwks
+    assert json.loads(token_creator.encoded_jwks) == {"keys": [token_creator.jwk()]}
+
+    # the cached JWK cannot be altered by callers
+    token_creator.jwk()["kid"] = "altered"
+    assert token_creator.jwk()["kid"] == token_creator.kid
+
+    # a new key invalidates the derived material
+    kid, encoded_jwks = token_creator.kid, token_creator.encoded_jwks
+    signer.private_key = Signer().private_key
+    assert token_creator.kid != kid
+    assert token_creator.encoded_jwks != encoded_jwks
+    header = base64.urlsafe_b64decode(token_creator.encoded_header + "==")
+    assert json.loads(header)["kid"] == token_creator.kid
+
+
+def _small_signer() -> Signer:
+    return Signer(rsa.generate_private_key(public_exponent=65537, key_size=1024))
+
+
+def test_key_ring_rotation():
+    now = [0.0]
+    key_ring = KeyRing(
+        rotation_interval=100,
+        prepublish_period=10,
+        signer_factory=_small_signer,
+        clock=lambda: now[0],
+    )
+    token_creator = TokenCreator(key_ring=key_ring)
+    first_kid = token_creator.kid
+    assert [key["kid"] for key in token_creator.jwks()["keys"]] == [first_kid]
+
+    # the next key is generated in background, and published before it becomes active
+    now[0] = 95
+    assert token_creator.kid == first_kid
+    key_ring._wait_prepared()
+    published_kids = [key["kid"] for key in token_creator.jwks()["keys"]]
+    assert published_kids[0] == first_kid
+    assert len(published_kids) == 2
+    assert token_creator.kid == first_kid
+    next_kid = published_kids[1]
+
+    now[0] = 100
+    token = token_creator.create_token(
+        "your-domain.auth0.com",
+        subject="nobody",
+        audience="https://api.your-domain.com",
+        expires_in=3600,
+    )
+    header = json.loads(base64.urlsafe_b64decode(token.split(".")[0] + "=="))
+    assert header["kid"] == next_kid
+    assert json.loads(token_creator.encoded_jwks) == {
+        "keys": [key_ring.active.jwk(), key_ring.published[1].jwk()]
+    }
+    assert [key["kid"] for key in token_creator.jwks()["keys"]] == [
+        next_kid,
+        first_kid,
+    ]
+
+    # retired keys are dropped after max_retiring rotations
+    key_ring.rotate()
+    assert first_kid not in [key["kid"] for key in token_creator.jwks()["keys"]]
+
+
+def test_key_ring_prepares_off_the_minting_path():
+    now = [0.0]
+    factory_threads = []
+
+    def signer_factory() -> Signer:
+        factory_threads.append(threading.current_thread())
+        return _small_signer()
+
+    key_ring = KeyRing(
+        _small_signer(),
+        rotation_interval=100,
+        signer_factory=signer_factory,
+        clock=lambda: now[0],
+    )
+    token_creator = TokenCreator(key_ring=key_ring)
+    now[0] = 95
+    token_creator.create_token(
+        "your-domain.auth0.com",
+        subject="nobody",
+        audience="https://api.your-domain.com",
+        expires_in=3600,
+    )
+    key_ring._wait_prepared()
+    assert len(factory_threads) == 1
+    assert factory_threads[0] is not threading.current_thread()
+    next_kid = key_ring.published[1].kid
+
+    # the rotation activates the prepared key
+    now[0] = 100
+    assert token_creator.kid == next_kid
+    assert len(factory_threads) == 1
+
+
+def test_key_ring_rotates_once_under_concurrency():
+    now = [0.0]
+    created = []
+
+    def signer_factory() -> Signer:
+        created.append(_small_signer())
+        return created[-1]
+
+    key_ring = KeyRing(
+        _small_signer(),
+        rotation_interval=100,
+        prepublish_period=0,
+        max_retiring=1,
+        signer_factory=signer_factory,
+        clock=lambda: now[0],
+    )
+    first_kid = key_ring.active.kid
+    now[0] = 100
+    barrier = threading.Barrier(8)
+
+    def read_active(_) -> str:
+        barrier.wait()
+        return key_ring.active.kid
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        kids = set(executor.map(read_active, range(8)))
+    assert len(created) == 1
+    assert kids == {created[0].kid}
+    # the key active until the rotation still verifies the tokens it signed
+    assert [signer.kid for signer in key_ring.published] == [
+        created[0].kid,
+        first_kid,
+    ]
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256", "EdDSA"])
+def test_signer_algorithms(algorithm):
+    signer = Signer(
+        _small_signer().private_key if algorithm == "RS256" else None,
+        algorithm=algorithm,
+    )
+    assert signer.alg == algorithm
+    assert signer.jwk()["alg"] == algorithm
+    signature = signer.sign("Hello, World!")
+    assert signer.verify_signature(signature, "Hello, World!")
+    assert not signer.verify_signature(signature, "Hello, World?")
+
+
+def test_private_key_is_saved_once(tmp_path):
+    key_path = str(tmp_path / "key.pem")
+    signer = Signer(private_key_path=key_path, algorithm="ES256")
+    # other processes using the same path load the same key
+    assert Signer(private_key_path=key_path).kid == signer.kid
+    assert [path.name for path in tmp_path.iterdir()] == ["key.pem"]
+
+
+def test_key_pool():
+    key_pool = KeyPool(size=2, algorithm="EdDSA")
+    try:
+        kids = {key_pool.signer().kid for _ in range(5)}
+        assert len(kids) == 5
+    finally:
+        key_pool.close()
+
+
+def test_key_pool_shared_by_directory(tmp_path):
+    # pools sharing a directory, as in different processes
+    key_pool = KeyPool(size=3, algorithm="EdDSA", directory=str(tmp_path))
+    try:
+        for _ in range(100):
+            if len(list(tmp_path.glob("EdDSA-*.pem"))) == 3:
+                break
+            time.sleep(0.01)
+    finally:
+        key_pool.close()
+    stored = {path.name for path in tmp_path.glob("EdDSA-*.pem")}
+    assert len(stored) == 3
+
+    other_pool = KeyPool(size=3, algorithm="EdDSA", directory=str(tmp_path))
+    other_pool.close()
+    kids = {other_pool.signer().kid for _ in range(4)}
+    # the stored keys are taken once each, then new ones are generated
+    assert len(kids) == 4
+    assert not stored & {path.name for path in tmp_path.iterdir()}
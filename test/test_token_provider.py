@@ -1,9 +1,12 @@
+import asyncio
 import time
 
+import httpx
 import pytest
 
-from pyauth0 import TokenProvider
+from pyauth0 import SyncTokenProvider, TokenProvider
 from test.const import JWT_IO_TOKEN
+from test.testutils.fake_clock import FakeClock
 from test.testutils.mock_server import MockServer
 
 
@@ -44,3 +47,153 @@ async def test_get_token_multiple_times_should_reuse_token_if_valid(
     access_token = await token_provider.get_access_token()
     assert access_token == expected
     assert len(mock_server.received_requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_token_should_send_one_request(
+    mock_server: MockServer,
+):
+    response_data = {
+        "access_token": JWT_IO_TOKEN,
+        "expires_in": 60,
+        "token_type": "bearer",
+    }
+    mock_server.respond_with_json(r".*", response_data)
+
+    token_provider = TokenProvider(
+        issuer=mock_server.server_url,
+        audience="AUDIENCE",
+        client_id="CLIENT_ID",
+        client_secret="CLIENT_SECRET",
+    )
+
+    tokens = await asyncio.gather(
+        *(token_provider.get_access_token() for _ in range(10))
+    )
+    assert tokens == [JWT_IO_TOKEN] * 10
+    assert len(mock_server.received_requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_background_refresh(
+    mock_server: MockServer,
+):
+    response_data = {
+        "access_token": JWT_IO_TOKEN,
+        "expires_in": 1,
+        "token_type": "bearer",
+    }
+    mock_server.respond_with_json(r".*", response_data)
+
+    token_provider = TokenProvider(
+        issuer=mock_server.server_url,
+        audience="AUDIENCE",
+        client_id="CLIENT_ID",
+        client_secret="CLIENT_SECRET",
+        refresh_ratio=0.2,
+    )
+
+    await token_provider.get_access_token()
+    assert len(mock_server.received_requests) == 1
+
+    # the token is renewed in background after 20% of its expires_in
+    await asyncio.sleep(0.3)
+    assert len(mock_server.received_requests) == 2
+    assert not token_provider._get_token_response.is_expired()
+
+    await token_provider.aclose()
+    received_requests = len(mock_server.received_requests)
+    await asyncio.sleep(0.5)
+    assert len(mock_server.received_requests) == received_requests
+
+
+class _FlakyTokenEndpoint:
+    """
+    Issues a new token per request, failing the second one
+    """
+
+    def __init__(self):
+        self.requests = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.requests == 2:
+            return httpx.Response(503, json={"error": "unavailable"})
+        return httpx.Response(
+            200,
+            json={
+                "access_token": f"token-{self.requests}",
+                "expires_in": 4,
+                "token_type": "bearer",
+            },
+        )
+
+
+@pytest.mark.asyncio
+async def test_failed_background_refresh_is_retried():
+    endpoint = _FlakyTokenEndpoint()
+    async with TokenProvider(
+        issuer="your-domain.auth0.com",
+        audience="AUDIENCE",
+        client_id="CLIENT_ID",
+        client_secret="CLIENT_SECRET",
+        refresh_ratio=0.25,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(endpoint)),
+    ) as token_provider:
+        await token_provider.get_token()
+
+        # the refresh after 1 second fails, and is retried 1 second later
+        await asyncio.sleep(1.5)
+        assert endpoint.requests == 2
+        assert await token_provider.get_access_token() == "token-1"
+        await asyncio.sleep(1)
+        assert endpoint.requests == 3
+        assert await token_provider.get_access_token() == "token-3"
+
+
+def test_sync_failed_background_refresh_is_retried():
+    endpoint = _FlakyTokenEndpoint()
+    with SyncTokenProvider(
+        issuer="your-domain.auth0.com",
+        audience="AUDIENCE",
+        client_id="CLIENT_ID",
+        client_secret="CLIENT_SECRET",
+        refresh_ratio=0.25,
+        http_client=httpx.Client(transport=httpx.MockTransport(endpoint)),
+    ) as token_provider:
+        token_provider.get_token()
+
+        time.sleep(1.5)
+        assert endpoint.requests == 2
+        assert token_provider.get_access_token() == "token-1"
+        time.sleep(1)
+        assert endpoint.requests == 3
+        assert token_provider.get_access_token() == "token-3"
+
+
+@pytest.mark.asyncio
+async def test_token_expiry_follows_the_clock(mock_server: MockServer):
+    mock_server.respond_with_json(
+        r".*",
+        {"access_token": JWT_IO_TOKEN, "expires_in": 60, "token_type": "bearer"},
+    )
+    clock = FakeClock()
+    token_provider = TokenProvider(
+        issuer=mock_server.server_url,
+        audience="AUDIENCE",
+        client_id="CLIENT_ID",
+        client_secret="CLIENT_SECRET",
+        clock=clock,
+    )
+
+    token = await token_provider.get_token()
+    assert not token.is_expired(skew_seconds=59)
+    assert token.is_expired(skew_seconds=60)
+
+    clock.advance(59)
+    await token_provider.get_token()
+    assert len(mock_server.received_requests) == 1
+
+    clock.advance(1)
+    await token_provider.get_token()
+    assert len(mock_server.received_requests) == 2
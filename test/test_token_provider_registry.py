@@ -0,0 +1,93 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from pyauth0 import TokenProviderRegistry
+from test.const import JWT_IO_TOKEN
+from test.testutils.mock_server import MockServer
+
+
+@pytest.fixture
+def token_server(mock_server: MockServer) -> MockServer:
+    mock_server.respond_with_json(
+        r".*",
+        {"access_token": JWT_IO_TOKEN, "expires_in": 60, "token_type": "bearer"},
+    )
+    return mock_server
+
+
+@pytest.mark.asyncio
+async def test_registry_deduplicates_providers(token_server: MockServer):
+    async with TokenProviderRegistry() as registry:
+        args = (token_server.server_url, "AUDIENCE", "CLIENT_ID", "CLIENT_SECRET")
+        authorizations = await asyncio.gather(
+            *(registry.get_authorization(*args) for _ in range(10)),
+            registry.get_authorization(*args, extra_payload={"scope": "read"}),
+        )
+        assert authorizations == [f"bearer {JWT_IO_TOKEN}"] * 11
+        assert len(registry) == 2
+        # one fetch per key
+        assert len(token_server.received_requests) == 2
+        payloads = [json.loads(r.data) for r in token_server.received_requests]
+        assert sorted(payload.get("scope", "") for payload in payloads) == ["", "read"]
+
+        # the providers share the http client of the registry
+        token_provider = registry.get_provider(*args)
+        assert token_provider._http.client is registry._http.client
+
+
+@pytest.mark.asyncio
+async def test_registry_evicts_providers(token_server: MockServer):
+    async with TokenProviderRegistry(max_size=2, idle_timeout=0.1) as registry:
+        server_url = token_server.server_url
+        first = registry.get_provider(server_url, "A", "CLIENT_ID", "CLIENT_SECRET")
+        registry.get_provider(server_url, "B", "CLIENT_ID", "CLIENT_SECRET")
+        registry.get_provider(server_url, "C", "CLIENT_ID", "CLIENT_SECRET")
+        assert len(registry) == 2
+        assert (
+            registry.get_provider(server_url, "A", "CLIENT_ID", "CLIENT_SECRET")
+            is not first
+        )
+
+        time.sleep(0.1)
+        registry.get_provider(server_url, "D", "CLIENT_ID", "CLIENT_SECRET")
+        assert len(registry) == 1
+
+
+@pytest.mark.asyncio
+async def test_registry_closes_evicted_providers_in_background(
+    token_server: MockServer,
+):
+    async with TokenProviderRegistry(max_size=1) as registry:
+        server_url = token_server.server_url
+        first = registry.get_provider(server_url, "A", "CLIENT_ID", "CLIENT_SECRET")
+        # e.g. a slow token request of the first provider
+        fetched = asyncio.Event()
+        first._refresh_task = asyncio.ensure_future(fetched.wait())
+
+        # evicting the first provider does not delay the token of the second one
+        await asyncio.wait_for(
+            registry.get_token(server_url, "B", "CLIENT_ID", "CLIENT_SECRET"),
+            timeout=1,
+        )
+        assert len(registry._closing) == 1
+        fetched.set()
+    assert not registry._closing
+
+
+@pytest.mark.asyncio
+async def test_registry_prefetch(token_server: MockServer):
+    async with TokenProviderRegistry() as registry:
+        for audience in ["A", "B", "C"]:
+            registry.get_provider(
+                token_server.server_url, audience, "CLIENT_ID", "CLIENT_SECRET"
+            )
+        await registry.prefetch()
+        assert len(token_server.received_requests) == 3
+
+        await registry.get_token(
+            token_server.server_url, "B", "CLIENT_ID", "CLIENT_SECRET"
+        )
+        assert len(token_server.received_requests) == 3
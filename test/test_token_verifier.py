@@ -1,7 +1,20 @@
+import asyncio
+import concurrent.futures
+import time
+
+import httpx
 import pytest
 
 from pyauth0 import Auth0Error, TokenVerifier
+from pyauth0.token_creator import Signer, TokenCreator
+from pyauth0.token_verifier import (
+    DecodedToken,
+    VerifiedTokenCache,
+    _JwksProviderCacheDecorator,
+)
 from test.const import JWT_IO_TOKEN
+from test.testutils.fake_clock import FakeClock
+from test.testutils.tokens import StaticJwksProvider, create_token
 
 
 @pytest.fixture
@@ -35,3 +48,364 @@ async def test_malformed_token(token_verifier):
         await token_verifier.verify("gibberish")
     assert info.value.code == "invalid_token"
     assert "Malformed token" in info.value.description
+
+
+@pytest.mark.asyncio
+async def test_key_index_is_reused_until_jwks_changes(token_creator):
+    jwks_provider = StaticJwksProvider({"keys": [token_creator.jwk()]})
+    token_verifier = TokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_provider=jwks_provider,
+    )
+    token = create_token(token_creator)
+
+    decoded_token = await token_verifier.verify(token)
+    assert decoded_token.payload.get("sub") == "nobody"
+    key_index = token_verifier._key_index
+    assert key_index.get(token_creator.kid)
+
+    await token_verifier.verify(token)
+    assert token_verifier._key_index is key_index
+
+    # a new JWKS document (i.e. a refresh) replaces the index
+    jwks_provider.jwks = {"keys": [token_creator.jwk()]}
+    await token_verifier.verify(token)
+    assert token_verifier._key_index is not key_index
+    assert jwks_provider.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid(token_creator):
+    token_verifier = TokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_provider=StaticJwksProvider({"keys": []}),
+    )
+    with pytest.raises(Auth0Error) as info:
+        await token_verifier.verify(create_token(token_creator))
+    assert info.value.code == "invalid_token"
+    assert "Unable to find appropriate key" in info.value.description
+
+
+@pytest.mark.asyncio
+async def test_token_cache(token_creator):
+    jwks_provider = StaticJwksProvider({"keys": [token_creator.jwk()]})
+    token_verifier = TokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_provider=jwks_provider,
+        token_cache_size=1,
+    )
+    token = create_token(token_creator)
+    other_token = create_token(token_creator, subject="somebody")
+
+    decoded_token = await token_verifier.verify(token)
+    assert await token_verifier.verify(token) is decoded_token
+    assert token_verifier.token_cache.hits == 1
+    assert token_verifier.token_cache.misses == 1
+
+    # bounded size, the least recently used token is evicted
+    await token_verifier.verify(other_token)
+    assert len(token_verifier.token_cache) == 1
+    assert await token_verifier.verify(token) is not decoded_token
+
+    # the key that signed the token is gone
+    jwks_provider.jwks = {"keys": []}
+    with pytest.raises(Auth0Error) as info:
+        await token_verifier.verify(token)
+    assert "Unable to find appropriate key" in info.value.description
+    assert len(token_verifier.token_cache) == 0
+
+
+def test_token_cache_evicts_expired_tokens():
+    token_cache = VerifiedTokenCache(10)
+    expired = DecodedToken(header={}, payload={"exp": time.time() - 1})
+    token_cache.put("expired", expired)
+    assert token_cache.get("expired") is None
+    assert len(token_cache) == 0
+
+    # tokens without expiration are not cached
+    token_cache.put("no-exp", DecodedToken(header={}, payload={}))
+    assert len(token_cache) == 0
+
+
+def test_token_cache_expiry_follows_the_clock():
+    clock = FakeClock()
+    token_cache = VerifiedTokenCache(10, clock)
+    decoded_token = DecodedToken(header={}, payload={"exp": time.time() + 60})
+    token_cache.put("token", decoded_token)
+
+    clock.advance(59)
+    assert token_cache.get("token") is decoded_token
+    clock.advance(2)
+    assert token_cache.get("token") is None
+
+
+@pytest.mark.parametrize(
+    "executor_class",
+    [
+        None,
+        concurrent.futures.ThreadPoolExecutor,
+        concurrent.futures.ProcessPoolExecutor,
+    ],
+)
+@pytest.mark.asyncio
+async def test_verify_many(token_creator, executor_class):
+    jwks_provider = StaticJwksProvider({"keys": [token_creator.jwk()]})
+    token_verifier = TokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_provider=jwks_provider,
+    )
+    tokens = [
+        create_token(token_creator, subject="first"),
+        "gibberish",
+        create_token(token_creator, audience="https://another-api.com"),
+        create_token(token_creator, subject="last"),
+    ]
+
+    executor = executor_class(max_workers=2) if executor_class else None
+    try:
+        results = await token_verifier.verify_many(tokens, executor, chunk_size=1)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    assert jwks_provider.calls == 1
+    assert results[0].payload.get("sub") == "first"
+    assert isinstance(results[1], Auth0Error)
+    assert "Malformed token" in results[1].description
+    assert isinstance(results[2], Auth0Error)
+    assert results[2].code == "invalid_claims"
+    assert results[3].payload.get("sub") == "last"
+
+
+@pytest.mark.parametrize(
+    "executor_class",
+    [concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor],
+)
+@pytest.mark.asyncio
+async def test_verify_in_executor(token_creator, executor_class):
+    with executor_class(max_workers=1) as executor:
+        token_verifier = TokenVerifier(
+            issuer="your-domain.auth0.com",
+            audience="https://api.your-domain.com",
+            jwks_provider=StaticJwksProvider({"keys": [token_creator.jwk()]}),
+            executor=executor,
+        )
+        decoded_token = await token_verifier.verify(create_token(token_creator))
+        assert decoded_token.payload.get("sub") == "nobody"
+
+        with pytest.raises(Auth0Error) as info:
+            await token_verifier.verify(create_token(token_creator, expires_in=-60))
+        assert info.value.code == "token_expired"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm", ["ES256", "EdDSA"])
+async def test_verify_algorithms(algorithm):
+    token_creator = TokenCreator(Signer(algorithm=algorithm))
+    jwks_provider = StaticJwksProvider({"keys": [token_creator.jwk()]})
+
+    # keys published for algorithms that are not allowed are ignored
+    token_verifier = TokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_provider=jwks_provider,
+    )
+    with pytest.raises(Auth0Error) as info:
+        await token_verifier.verify(create_token(token_creator))
+    assert info.value.description == "Unable to find appropriate key."
+
+    token_verifier = TokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_provider=jwks_provider,
+        algorithms=["RS256", algorithm],
+    )
+    decoded_token = await token_verifier.verify(create_token(token_creator))
+    assert decoded_token.payload.get("sub") == "nobody"
+
+
+class _RotatingJwksProvider(StaticJwksProvider):
+    """
+    Serves a cached JWKS from `get`, and the latest one from `refresh`
+    """
+
+    def __init__(self, jwks: dict, latest_jwks: dict):
+        super().__init__(jwks)
+        self.latest_jwks = latest_jwks
+        self.refreshes = 0
+
+    async def refresh(self):
+        self.refreshes += 1
+        self.jwks = self.latest_jwks
+        return self.jwks
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_forces_refresh(token_creator):
+    jwks_provider = _RotatingJwksProvider({"keys": []}, {"keys": [token_creator.jwk()]})
+    token_verifier = TokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_provider=jwks_provider,
+        jwks_min_refresh_interval=0.01,
+    )
+
+    # the key was rotated after the JWKS was cached
+    decoded_token = await token_verifier.verify(create_token(token_creator))
+    assert decoded_token.payload.get("sub") == "nobody"
+    assert jwks_provider.refreshes == 1
+
+    bogus_token = create_token(TokenCreator(Signer(algorithm="EdDSA")))
+    for refreshes in [2, 2]:
+        time.sleep(0.02)
+        with pytest.raises(Auth0Error) as info:
+            await token_verifier.verify(bogus_token)
+        assert info.value.description == "Unable to find appropriate key."
+        # the bogus kid is remembered, and does not force another refresh
+        assert jwks_provider.refreshes == refreshes
+
+
+@pytest.mark.asyncio
+async def test_forced_refresh_is_rate_limited(token_creator):
+    jwks_provider = _RotatingJwksProvider({"keys": []}, {"keys": []})
+    token_verifier = TokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_provider=jwks_provider,
+        jwks_min_refresh_interval=60,
+    )
+    tokens = [create_token(TokenCreator(Signer(algorithm="EdDSA"))) for _ in range(10)]
+    results = await asyncio.gather(
+        *(token_verifier.verify(token) for token in tokens), return_exceptions=True
+    )
+    assert all(isinstance(result, Auth0Error) for result in results)
+    assert jwks_provider.refreshes == 1
+
+
+@pytest.mark.asyncio
+async def test_error_answer_does_not_replace_jwks(token_creator):
+    answers = [httpx.Response(200, json={"keys": [token_creator.jwk()]})]
+    transport = httpx.MockTransport(lambda request: answers[-1])
+    clock = FakeClock()
+    token_verifier = TokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_cache_ttl=60,
+        jwks_cache_grace_period=600,
+        http_client=httpx.AsyncClient(transport=transport),
+        token_cache_size=10,
+        jwks_min_refresh_interval=1,
+        clock=clock,
+    )
+    token = create_token(token_creator)
+    await token_verifier.verify(token)
+
+    # rate-limited or unavailable, with a JSON body
+    answers.append(httpx.Response(503, json={"error": "unavailable"}))
+    clock.advance(61)
+    assert (await token_verifier.verify(token)).payload.get("sub") == "nobody"
+    token_verifier.token_cache.clear()
+    assert (await token_verifier.verify(token)).payload.get("sub") == "nobody"
+
+    # nor does a forced refresh answered with an error, or with a document without keys
+    answers.append(httpx.Response(429, json={"keys": []}))
+    bogus_token = create_token(TokenCreator(Signer(algorithm="ES256")))
+    with pytest.raises(Auth0Error):
+        await token_verifier.verify(bogus_token)
+    answers.append(httpx.Response(200, json={"error": "unavailable"}))
+    clock.advance(1)
+    with pytest.raises(Auth0Error):
+        await token_verifier.verify(bogus_token)
+    token_verifier.token_cache.clear()
+    assert (await token_verifier.verify(token)).payload.get("sub") == "nobody"
+
+    # after the grace period the error is propagated
+    answers.append(httpx.Response(503, json={"error": "unavailable"}))
+    clock.advance(600)
+    with pytest.raises(httpx.HTTPStatusError):
+        await token_verifier.verify(token)
+
+
+class _UnavailableJwksProvider(StaticJwksProvider):
+    available = True
+
+    async def get(self):
+        jwks = await super().get()
+        if not self.available:
+            raise httpx.ConnectError("unavailable")
+        return jwks
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_is_retried_with_backoff(token_creator):
+    jwks_provider = _UnavailableJwksProvider({"keys": [token_creator.jwk()]})
+    clock = FakeClock()
+    jwks_cache = _JwksProviderCacheDecorator(
+        jwks_provider, ttl=60, grace_period=600, clock=clock
+    )
+    await jwks_cache.get()
+
+    jwks_provider.available = False
+    clock.advance(60)
+    # the stale JWKS is served, without refreshing by every call
+    for delay in (0, 1, 2, 4):
+        clock.advance(delay)
+        for _ in range(10):
+            assert await jwks_cache.get() == jwks_provider.jwks
+        clock.advance(delay / 2)
+        assert await jwks_cache.get() == jwks_provider.jwks
+    assert jwks_provider.calls == 5
+
+    jwks_provider.available = True
+    clock.advance(8)
+    await jwks_cache.get()
+    assert jwks_provider.calls == 6
+    # the next failure is retried after a second again
+    jwks_provider.available = False
+    clock.advance(60)
+    await jwks_cache.get()
+    clock.advance(1)
+    await jwks_cache.get()
+    assert jwks_provider.calls == 8
+
+
+@pytest.mark.asyncio
+async def test_precheck_rejects_without_jwks_lookup(token_creator):
+    jwks_provider = StaticJwksProvider({"keys": [token_creator.jwk()]})
+    token_verifier = TokenVerifier(
+        issuer="your-domain.auth0.com",
+        audience="https://api.your-domain.com",
+        jwks_provider=jwks_provider,
+        precheck=True,
+        precheck_leeway=30,
+        max_token_length=4096,
+    )
+    invalid_tokens = {
+        "token_expired": create_token(token_creator, expires_in=-60),
+        "invalid_claims": create_token(token_creator, audience="https://other.com"),
+        "invalid_token": create_token(
+            TokenCreator(Signer(algorithm="ES256")), expires_in=60
+        ),
+    }
+    for code, token in invalid_tokens.items():
+        with pytest.raises(Auth0Error) as info:
+            await token_verifier.verify(token)
+        assert info.value.code == code
+
+    with pytest.raises(Auth0Error) as info:
+        await token_verifier.verify("x" * 4097)
+    assert info.value.description == "Token is too large."
+    assert jwks_provider.calls == 0
+
+    # expired within the leeway, left to the full check
+    with pytest.raises(Auth0Error) as info:
+        await token_verifier.verify(create_token(token_creator, expires_in=-10))
+    assert info.value.code == "token_expired"
+    assert jwks_provider.calls == 1
+
+    decoded_token = await token_verifier.verify(create_token(token_creator))
+    assert decoded_token.payload.get("sub") == "nobody"
@@ -0,0 +1,14 @@
+class FakeClock:
+    """
+    Monotonic clock moved forward by the tests, instead of sleeping
+    """
+
+    def __init__(self, now: float = 1000.0):
+        super().__init__()
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
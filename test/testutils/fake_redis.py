@@ -0,0 +1,37 @@
+import threading
+import time
+import typing
+
+
+class FakeRedis:
+    """
+    In-process stand-in for the subset of `redis.Redis` used by `pyauth0.cache.RedisCache`
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._data: typing.Dict[str, typing.Tuple[bytes, typing.Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> typing.Optional[bytes]:
+        with self._lock:
+            value, expires_at = self._data.get(name, (None, None))
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[name]
+                return None
+            return value
+
+    def set(self, name: str, value, px: int = None, nx: bool = False) -> bool:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        expires_at = time.monotonic() + px / 1000 if px else None
+        with self._lock:
+            current = self._data.get(name)
+            if nx and current and (current[1] is None or current[1] > time.monotonic()):
+                return False
+            self._data[name] = (value, expires_at)
+            return True
+
+    def delete(self, name: str) -> int:
+        with self._lock:
+            return 1 if self._data.pop(name, None) else 0
@@ -0,0 +1,34 @@
+from pyauth0.token_creator import TokenCreator
+from pyauth0.token_verifier import JwksProvider
+
+ISSUER = "your-domain.auth0.com"
+AUDIENCE = "https://api.your-domain.com"
+
+
+class StaticJwksProvider(JwksProvider):
+    """
+    Serves the same JWKS, counting the calls
+    """
+
+    def __init__(self, jwks: dict):
+        self.jwks = jwks
+        self.calls = 0
+
+    async def get(self):
+        self.calls += 1
+        return self.jwks
+
+
+def create_token(token_creator: TokenCreator, **kwargs) -> str:
+    """
+    A token valid for `TokenVerifier(ISSUER, AUDIENCE)`, the claims can be overridden by `kwargs`
+    """
+    return token_creator.create_token(
+        **{
+            "issuer": ISSUER,
+            "subject": "nobody",
+            "audience": AUDIENCE,
+            "expires_in": 60,
+            **kwargs,
+        }
+    )